@@ -2,69 +2,743 @@
 Client library for interacting with the Elfa API.
 """
 
+import asyncio
+import logging
 import os
+import time
 import httpx
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
 from urllib.parse import urljoin
 
+from elfa_mcp.cache import (
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_NEGATIVE_CACHE_TTLS,
+    NOT_FOUND,
+    ResponseCache,
+    make_cache_key
+)
+from elfa_mcp.circuit import DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT, CircuitBreaker
+from elfa_mcp.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    no_deadline,
+    time_remaining
+)
+from elfa_mcp.index import DEFAULT_HISTORICAL_MIN_AGE, DEFAULT_MAX_MENTIONS, MentionIndex
+from elfa_mcp.keys import ApiKey, KeyPool, load_api_keys
+from elfa_mcp.latency import DEFAULT_MIN_TIMEOUT, LatencyTracker
+from elfa_mcp.pagination import iter_pages
+from elfa_mcp.ratelimit import DEFAULT_BURST, DEFAULT_MAX_WAIT, QuotaRateLimiter
+from elfa_mcp.retry import (
+    DEFAULT_BASE_DELAY,
+    DEFAULT_MAX_ATTEMPTS,
+    DEFAULT_MAX_DELAY,
+    RetryPolicy,
+    parse_retry_after
+)
+from elfa_mcp.scheduler import (
+    DEFAULT_PRIORITY_CONCURRENCY,
+    Priority,
+    RequestScheduler,
+    current_priority,
+    request_priority
+)
+from elfa_mcp.shared import DEFAULT_LEASE_TIMEOUT, SharedCache, SharedEntry
+from elfa_mcp.singleflight import SingleFlight
+from elfa_mcp.store import DEFAULT_MAX_BYTES, SQLiteStore
+from elfa_mcp.utils import env_bool, env_float, env_int, mention_timestamp, split_time_range
+
+logger = logging.getLogger(__name__)
+
 # Constants
 BASE_URL = "https://api.elfa.ai"
 DEFAULT_TIMEOUT = 30.0  # seconds
 
+# Connection pool defaults, overridable via ELFA_* environment variables
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0  # seconds
+
+KEY_STATUS_ENDPOINT = "/v1/key-status"
+DEFAULT_QUOTA_REFRESH_INTERVAL = 300.0  # seconds
+# Requests accounted for locally before a key's status is re-checked
+DEFAULT_KEY_STATUS_MAX_DRIFT = 200
+
+# Hedged requests go out once the first has not answered by this latency percentile
+DEFAULT_HEDGE_PERCENTILE = 95.0
+
+# Keyword search sharding defaults
+DEFAULT_SEARCH_SHARD_CONCURRENCY = 4
+
+
+class ElfaAPIError(Exception):
+    """Error returned by the Elfa API, with its HTTP status code when there is one."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ShardedSearch(NamedTuple):
+    """Mentions found by a sharded search, and whether its time budget cut it short."""
+    mentions: List[Dict[str, Any]]
+    stopped_early: bool = False
+
 
 class ElfaClient:
     """Client for interacting with the Elfa API."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 max_connections: Optional[int] = None,
+                 max_keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None,
+                 http2: Optional[bool] = None,
+                 cache: Optional[ResponseCache] = None,
+                 coalesce_requests: Optional[bool] = None,
+                 rate_limiter: Optional[QuotaRateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 disk_store: Optional[SQLiteStore] = None,
+                 mention_index: Optional[MentionIndex] = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 shared_cache: Optional[SharedCache] = None):
         """Initialize the Elfa API client.
 
         Args:
-            api_key: Elfa API key. If not provided, will look for ELFA_API_KEY environment variable.
+            api_key: Elfa API key, or several separated by commas. If not provided,
+                keys are read from the ELFA_API_KEY environment variable and the
+                file named by ELFA_API_KEY_FILE (one key per line).
+            max_connections: Maximum number of pooled connections (ELFA_MAX_CONNECTIONS)
+            max_keepalive_connections: Maximum number of idle connections kept open
+                (ELFA_MAX_KEEPALIVE_CONNECTIONS)
+            keepalive_expiry: Seconds an idle connection is kept open (ELFA_KEEPALIVE_EXPIRY)
+            http2: Whether to negotiate HTTP/2, requires the ``h2`` package (ELFA_HTTP2)
+            cache: Response cache to use. Defaults to a ResponseCache sized by
+                ELFA_CACHE_MAX_ENTRIES (0 disables caching) that remembers
+                unknown accounts for ELFA_NEGATIVE_CACHE_TTL seconds and serves
+                expired responses while refreshing them unless
+                ELFA_STALE_WHILE_REVALIDATE is false.
+            coalesce_requests: Whether identical concurrent requests share one
+                upstream call (ELFA_COALESCE_REQUESTS, enabled by default)
+            rate_limiter: Client-side limiter seeded from the key's quota. Defaults to
+                a QuotaRateLimiter configured by ELFA_RATE_LIMIT_BURST and
+                ELFA_RATE_LIMIT_MAX_WAIT; set ELFA_RATE_LIMIT=false to disable it.
+            retry_policy: Backoff policy for transient failures. Defaults to a
+                RetryPolicy configured by ELFA_RETRY_MAX_ATTEMPTS,
+                ELFA_RETRY_BASE_DELAY and ELFA_RETRY_MAX_DELAY.
+            disk_store: Persistent store for historical keyword search pages.
+                Defaults to a SQLiteStore at ELFA_DISK_CACHE_PATH, limited to
+                ELFA_DISK_CACHE_MAX_BYTES; disabled when the path is unset.
+            mention_index: Index of fetched mentions used to answer keyword
+                searches locally. Defaults to a MentionIndex holding
+                ELFA_MENTION_INDEX_SIZE mentions (0 disables it).
+            scheduler: Scheduler granting upstream request slots by priority.
+                Defaults to a RequestScheduler bounded by the connection pool,
+                with per-class caps from ELFA_INTERACTIVE_CONCURRENCY,
+                ELFA_PAGINATION_CONCURRENCY and ELFA_BACKGROUND_CONCURRENCY.
+            shared_cache: Response cache shared with other processes on the
+                host, consulted behind the in-process cache. Defaults to a
+                SharedCache at ELFA_SHARED_CACHE_PATH, limited to
+                ELFA_SHARED_CACHE_MAX_BYTES, whose fetch leases lapse after
+                ELFA_SHARED_CACHE_LEASE_TIMEOUT seconds; disabled when the
+                path is unset.
         """
-        self.api_key = api_key or os.environ.get("ELFA_API_KEY")
-        if not self.api_key:
+        if api_key:
+            keys = load_api_keys(api_key)
+        else:
+            keys = load_api_keys(os.environ.get("ELFA_API_KEY"), os.environ.get("ELFA_API_KEY_FILE"))
+        if not keys:
             raise ValueError(
                 "API key must be provided either directly or via ELFA_API_KEY environment variable")
 
+        # Requests are spread over every key; the first is the primary key
+        # whose status get_api_key_status reports
+        self.key_pool = KeyPool(keys)
+        self.api_key = keys[0]
+        self.key_status_max_drift = env_int("ELFA_KEY_STATUS_MAX_DRIFT", DEFAULT_KEY_STATUS_MAX_DRIFT)
+        self._key_status_checks: Dict[str, "asyncio.Future[None]"] = {}
+
         self.headers = {
             "x-elfa-api-key": self.api_key,
             "Accept": "application/json"
         }
 
-    async def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self.limits = httpx.Limits(
+            max_connections=max_connections if max_connections is not None
+            else env_int("ELFA_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS),
+            max_keepalive_connections=max_keepalive_connections if max_keepalive_connections is not None
+            else env_int("ELFA_MAX_KEEPALIVE_CONNECTIONS", DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+            keepalive_expiry=keepalive_expiry if keepalive_expiry is not None
+            else env_float("ELFA_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)
+        )
+        self.http2 = http2 if http2 is not None else env_bool("ELFA_HTTP2", False)
+        self._http_client: Optional[httpx.AsyncClient] = None
+        if cache is None:
+            negative_ttls = dict(DEFAULT_NEGATIVE_CACHE_TTLS)
+            negative_ttls["/v1/account/smart-stats"] = env_float(
+                "ELFA_NEGATIVE_CACHE_TTL", negative_ttls["/v1/account/smart-stats"])
+            cache = ResponseCache(
+                max_entries=env_int("ELFA_CACHE_MAX_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES),
+                negative_ttls=negative_ttls,
+                max_stale_ages=None if env_bool("ELFA_STALE_WHILE_REVALIDATE", True) else {}
+            )
+        self.cache = cache
+        if coalesce_requests is None:
+            coalesce_requests = env_bool("ELFA_COALESCE_REQUESTS", True)
+        self._in_flight: Optional[SingleFlight] = SingleFlight() if coalesce_requests else None
+        self._revalidating: Dict[str, "asyncio.Future[None]"] = {}
+        if rate_limiter is None and env_bool("ELFA_RATE_LIMIT", True):
+            rate_limiter = QuotaRateLimiter(
+                burst=env_int("ELFA_RATE_LIMIT_BURST", DEFAULT_BURST),
+                max_wait=env_float("ELFA_RATE_LIMIT_MAX_WAIT", DEFAULT_MAX_WAIT)
+            )
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(
+            max_attempts=env_int("ELFA_RETRY_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS),
+            base_delay=env_float("ELFA_RETRY_BASE_DELAY", DEFAULT_BASE_DELAY),
+            max_delay=env_float("ELFA_RETRY_MAX_DELAY", DEFAULT_MAX_DELAY)
+        )
+        if disk_store is None and os.environ.get("ELFA_DISK_CACHE_PATH"):
+            disk_store = SQLiteStore(
+                os.environ["ELFA_DISK_CACHE_PATH"],
+                max_bytes=env_int("ELFA_DISK_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+            )
+        self.disk_store = disk_store
+        if shared_cache is None and os.environ.get("ELFA_SHARED_CACHE_PATH"):
+            shared_cache = SharedCache(
+                SQLiteStore(
+                    os.environ["ELFA_SHARED_CACHE_PATH"],
+                    max_bytes=env_int("ELFA_SHARED_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+                ),
+                lease_timeout=env_float("ELFA_SHARED_CACHE_LEASE_TIMEOUT", DEFAULT_LEASE_TIMEOUT)
+            )
+        self.shared_cache = shared_cache
+        self.historical_min_age = env_float("ELFA_HISTORICAL_MIN_AGE", DEFAULT_HISTORICAL_MIN_AGE)
+        if mention_index is None:
+            index_size = env_int("ELFA_MENTION_INDEX_SIZE", DEFAULT_MAX_MENTIONS)
+            mention_index = MentionIndex(
+                max_mentions=index_size,
+                historical_min_age=self.historical_min_age
+            ) if index_size > 0 else None
+        self.mention_index = mention_index
+        if scheduler is None:
+            max_connections = self.limits.max_connections or DEFAULT_MAX_CONNECTIONS
+            scheduler = RequestScheduler(max_concurrency=max_connections, limits={
+                Priority.INTERACTIVE: env_int("ELFA_INTERACTIVE_CONCURRENCY", max_connections),
+                Priority.PAGINATION: env_int(
+                    "ELFA_PAGINATION_CONCURRENCY", DEFAULT_PRIORITY_CONCURRENCY[Priority.PAGINATION]),
+                Priority.BACKGROUND: env_int(
+                    "ELFA_BACKGROUND_CONCURRENCY", DEFAULT_PRIORITY_CONCURRENCY[Priority.BACKGROUND]),
+            })
+        self.scheduler = scheduler
+        self.circuit_failure_threshold = env_int("ELFA_CIRCUIT_FAILURE_THRESHOLD", DEFAULT_FAILURE_THRESHOLD)
+        self.circuit_reset_timeout = env_float("ELFA_CIRCUIT_RESET_TIMEOUT", DEFAULT_RESET_TIMEOUT)
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.adaptive_timeouts = env_bool("ELFA_ADAPTIVE_TIMEOUTS", True)
+        self.min_timeout = env_float("ELFA_MIN_TIMEOUT", DEFAULT_MIN_TIMEOUT)
+        self.hedge_endpoints = {
+            e.strip() for e in os.environ.get("ELFA_HEDGE_ENDPOINTS", "").split(",") if e.strip()}
+        self.hedge_percentile = env_float("ELFA_HEDGE_PERCENTILE", DEFAULT_HEDGE_PERCENTILE)
+        self._latencies: Dict[str, LatencyTracker] = {}
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._http_client is None or self._http_client.is_closed:
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning(
+                        "HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+                    http2 = False
+
+            self._http_client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=http2,
+                timeout=DEFAULT_TIMEOUT
+            )
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release its connections."""
+        background = list(self._revalidating.values()) + list(self._key_status_checks.values())
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        self._revalidating.clear()
+        self._key_status_checks.clear()
+
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self.disk_store is not None:
+            await asyncio.to_thread(self.disk_store.close)
+            self.disk_store = None
+        if self.shared_cache is not None:
+            await asyncio.to_thread(self.shared_cache.close)
+            self.shared_cache = None
+
+    async def __aenter__(self) -> "ElfaClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _make_request(self,
+                            endpoint: str,
+                            params: Optional[Dict[str, Any]] = None,
+                            refresh: bool = False) -> Dict[str, Any]:
         """Make a request to the Elfa API.
 
+        Repeats are served from the response cache, and identical requests
+        made while one is already in flight wait for its result. An expired
+        response still within its endpoint's maximum stale age is returned
+        at once while a background request refreshes it. While the
+        endpoint's circuit is open, any cached response is served however
+        old it is, and the request fails fast when there is none.
+
+        With a shared cache, responses fetched by other processes are used
+        before going upstream, and only one process at a time fetches a
+        given request while the others wait for its response.
+
         Args:
             endpoint: API endpoint to call (without base URL)
             params: Query parameters to include
+            refresh: Skip the cached response and store a fresh one
 
         Returns:
             API response as a dictionary
         """
-        url = urljoin(BASE_URL, endpoint)
+        key = make_cache_key(endpoint, params)
+        ttl = self.cache.ttl_for(endpoint)
+        negative_ttl = self.cache.negative_ttl_for(endpoint)
 
-        async with httpx.AsyncClient() as client:
+        shared = self.shared_cache if ttl > 0 or negative_ttl > 0 else None
+
+        async def fetch_and_store() -> Dict[str, Any]:
+            leased = False
+            if shared is not None and not refresh:
+                entry, leased = await self._await_shared(key)
+                if entry is not None:
+                    return self._use_shared(key, entry)
             try:
-                response = await client.get(
-                    url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=DEFAULT_TIMEOUT
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 401:
-                    raise Exception("API key is invalid or expired") from e
+                response = await self._fetch(endpoint, params)
+            except ElfaAPIError as e:
+                if e.status_code == 404 and negative_ttl > 0:
+                    self.cache.set(key, NOT_FOUND, negative_ttl)
+                    if shared is not None:
+                        await self._shared("write", shared.set, key, NOT_FOUND, negative_ttl)
+                raise
+            finally:
+                if leased:
+                    await self._shared("release a lease in", shared.release_lease, key)
+            if ttl > 0 and response.get("success", True) is not False:
+                max_stale_age = self.cache.max_stale_age_for(endpoint)
+                self.cache.set(key, response, ttl, max_stale_age)
+                if shared is not None:
+                    await self._shared("write", shared.set, key, response, ttl, max_stale_age)
+            return response
+
+        breaker = self.circuit_breaker(endpoint)
+        if not refresh and breaker is not None and breaker.is_open:
+            cached = self.cache.peek(key)
+            if cached is None and shared is not None:
+                entry = await self._shared("read", shared.lookup, key)
+                cached = entry.value if entry is not None else None
+            if cached is not None and cached is not NOT_FOUND:
+                return cached
+            raise self._circuit_open_error(endpoint, breaker)
+
+        if not refresh and (ttl > 0 or negative_ttl > 0):
+            hit = self.cache.lookup(key)
+            if hit is not None:
+                cached, fresh = hit
+                if fresh and cached is NOT_FOUND:
+                    raise ElfaAPIError("API request failed with status code 404", status_code=404)
+                if fresh:
+                    return cached
+                if cached is not NOT_FOUND:
+                    self._revalidate(key, fetch_and_store)
+                    return cached
+
+        if self._in_flight is None:
+            return await fetch_and_store()
+        while True:
+            try:
+                return await self._in_flight.do(key, fetch_and_store)
+            except DeadlineExceeded as e:
+                # A shared call runs under the budget of the caller that
+                # started it; callers with more time left fetch again
+                own = current_deadline()
+                if e.deadline is None or (own is not None and own <= e.deadline):
+                    raise
+
+    async def _shared(self, action: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking shared cache call, logging failures instead of raising them."""
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            logger.warning("Failed to %s the shared cache: %s", action, e)
+            return None
+
+    async def _await_shared(self, key: str) -> Tuple[Optional[SharedEntry], bool]:
+        """Wait until the shared cache holds a fresh response or this process may fetch it.
+
+        Returns:
+            (fresh entry, None) when another process fetched the response,
+            otherwise (None, whether a lease was taken)
+        """
+        shared = self.shared_cache
+        while True:
+            entry = await self._shared("read", shared.lookup, key)
+            if entry is not None and entry.fresh:
+                return entry, False
+            leased = await self._shared("take a lease in", shared.acquire_lease, key)
+            if leased is None or leased:
+                return None, bool(leased)
+            check_deadline(f"another process finished fetching {key}")
+            await asyncio.sleep(shared.poll_interval)
+
+    def _use_shared(self, key: str, entry: SharedEntry) -> Dict[str, Any]:
+        """Copy a response from the shared cache into the local one and return it."""
+        if entry.value is NOT_FOUND:
+            self.cache.set(key, NOT_FOUND, entry.fresh_for)
+            raise ElfaAPIError("API request failed with status code 404", status_code=404)
+        self.cache.set(key, entry.value, entry.fresh_for, entry.stale_for)
+        return entry.value
+
+    def _revalidate(self, key: str, fetch_and_store: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        """Refresh a stale cache entry in the background, once per key at a time."""
+        if key in self._revalidating:
+            return
+
+        async def refresh() -> None:
+            try:
+                if self._in_flight is None:
+                    await fetch_and_store()
+                else:
+                    await self._in_flight.do(key, fetch_and_store)
+            except Exception as e:
+                logger.info("Background refresh of %s failed: %s", key, e)
+            finally:
+                self._revalidating.pop(key, None)
+
+        # The caller is served already, so the refresh is not bound by its time budget
+        with request_priority(Priority.BACKGROUND), no_deadline():
+            self._revalidating[key] = asyncio.ensure_future(refresh())
+
+    async def _fetch(self,
+                     endpoint: str,
+                     params: Optional[Dict[str, Any]] = None,
+                     api_key: Optional[ApiKey] = None) -> Dict[str, Any]:
+        """Send a request to the Elfa API, retrying transient failures.
+
+        Args:
+            endpoint: API endpoint to call (without base URL)
+            params: Query parameters to include
+            api_key: Key to send the request with instead of one from the pool
+
+        Returns:
+            API response as a dictionary
+        """
+        breaker = self.circuit_breaker(endpoint)
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None and not breaker.allow_request():
+                raise self._circuit_open_error(endpoint, breaker)
+            try:
+                response = await self._send(endpoint, params, api_key)
+            except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                if breaker is not None:
+                    self._record_outcome(breaker, e)
+                delay = None
+                if self.retry_policy.is_retryable("GET", e):
+                    delay = self.retry_policy.next_delay(attempt, e)
+                remaining = time_remaining()
+                if delay is None or (remaining is not None and delay >= remaining):
+                    raise self._translate_error(e) from e
+
+                logger.info("Retrying %s in %.2fs after attempt %d failed: %s",
+                            endpoint, delay, attempt, e)
+                await asyncio.sleep(delay)
+            except BaseException:
+                if breaker is not None:
+                    breaker.release()
+                raise
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return response
+
+    def circuit_breaker(self, endpoint: str) -> Optional[CircuitBreaker]:
+        """Return the circuit breaker guarding an endpoint, None when breaking is disabled."""
+        if self.circuit_failure_threshold <= 0:
+            return None
+        breaker = self._circuit_breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(self.circuit_failure_threshold, self.circuit_reset_timeout)
+            self._circuit_breakers[endpoint] = breaker
+        return breaker
+
+    @staticmethod
+    def _record_outcome(breaker: CircuitBreaker, error: Exception) -> None:
+        """Count timeouts, connection failures and 5xx answers against an endpoint's circuit."""
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            if status_code >= 500:
+                breaker.record_failure()
+            elif status_code == 429:
+                # Throttling says nothing about the upstream's health
+                breaker.release()
+            else:
+                breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    @staticmethod
+    def _circuit_open_error(endpoint: str, breaker: CircuitBreaker) -> "ElfaAPIError":
+        return ElfaAPIError(
+            f"Elfa API is unavailable ({endpoint} failed repeatedly); "
+            f"retrying in {breaker.retry_in():.0f}s", status_code=503)
+
+    async def _send(self,
+                    endpoint: str,
+                    params: Optional[Dict[str, Any]] = None,
+                    api_key: Optional[ApiKey] = None) -> Dict[str, Any]:
+        """Send a GET request, hedging it on slow endpoints.
+
+        For endpoints listed in ELFA_HEDGE_ENDPOINTS, a duplicate request is
+        sent when the first has not answered by the endpoint's
+        ELFA_HEDGE_PERCENTILE latency, provided the rate limiter has a token
+        to spare. Whichever answers first wins and the other is cancelled.
+
+        Args:
+            endpoint: API endpoint to call (without base URL)
+            params: Query parameters to include
+            api_key: Key to send the request with instead of one from the pool
+
+        Returns:
+            API response as a dictionary
+        """
+        hedge_after = None
+        if endpoint in self.hedge_endpoints:
+            hedge_after = self.latency_tracker(endpoint).percentile(self.hedge_percentile)
+        if hedge_after is None:
+            return await self._send_once(endpoint, params, api_key=api_key)
+
+        tasks = [asyncio.ensure_future(self._send_once(endpoint, params, api_key=api_key))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done and (self.rate_limiter is None or self.rate_limiter.try_acquire()):
+                logger.debug("Hedging %s after %.2fs", endpoint, hedge_after)
+                tasks.append(asyncio.ensure_future(
+                    self._send_once(endpoint, params, api_key=api_key, acquire_token=False)))
+            return await self._first_success(tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    @staticmethod
+    async def _first_success(tasks: List["asyncio.Future[Dict[str, Any]]"]) -> Dict[str, Any]:
+        """Return the first successful result, or raise the first error if all fail."""
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = error or task.exception()
+        raise error
+
+    async def _send_once(self,
+                         endpoint: str,
+                         params: Optional[Dict[str, Any]] = None,
+                         api_key: Optional[ApiKey] = None,
+                         acquire_token: bool = True) -> Dict[str, Any]:
+        """Send a single GET request over the pooled connection.
+
+        The request first waits for a scheduler slot of its priority class,
+        then for a rate limiter token, so queued background traffic never
+        holds up interactive calls. Its timeout adapts to the endpoint's
+        observed latency unless ELFA_ADAPTIVE_TIMEOUTS is false, and never
+        runs past the current call's time budget.
+
+        The API key is picked from the key pool; a key answering 401 or 429
+        is taken out of rotation and the request is repeated with another
+        healthy key if there is one.
+
+        Args:
+            endpoint: API endpoint to call (without base URL)
+            params: Query parameters to include
+            api_key: Key to send the request with instead of one from the
+                pool; key status checks default to the primary key
+            acquire_token: Whether to wait for a rate limiter token; hedged
+                requests take theirs up front
+
+        Returns:
+            API response as a dictionary
+        """
+        url = urljoin(BASE_URL, endpoint)
+        latency = self.latency_tracker(endpoint)
+
+        async with self.scheduler.slot():
+            # Key status checks are exempt so the limiter can always be re-seeded
+            if acquire_token and self.rate_limiter is not None and endpoint != KEY_STATUS_ENDPOINT:
+                check_deadline(f"requesting {endpoint}")
+                await self.rate_limiter.acquire(max_wait=time_remaining(), priority=current_priority())
+
+            check_deadline(f"requesting {endpoint}")
+            timeout = DEFAULT_TIMEOUT
+            if self.adaptive_timeouts:
+                timeout = latency.timeout(DEFAULT_TIMEOUT, minimum=self.min_timeout)
+            remaining = time_remaining()
+            limited_by_budget = remaining is not None and remaining < timeout
+            if limited_by_budget:
+                timeout = remaining
+
+            if api_key is None and endpoint == KEY_STATUS_ENDPOINT:
+                api_key = self.key_pool.primary
+            client = self._get_http_client()
+            for _ in range(len(self.key_pool)):
+                key = api_key or self.key_pool.select()
+                started = time.monotonic()
+                try:
+                    response = await client.get(
+                        url,
+                        headers=key.headers,
+                        params=params,
+                        timeout=timeout
+                    )
+                except httpx.TimeoutException as e:
+                    if limited_by_budget:
+                        raise DeadlineExceeded(
+                            f"Time budget exhausted while requesting {endpoint}", current_deadline()) from e
+                    latency.record_timeout(timeout)
+                    raise
+                latency.record(time.monotonic() - started)
+
+                if response.status_code < 400:
+                    if endpoint != KEY_STATUS_ENDPOINT:
+                        self._account_request(key)
+                    break
+                if response.status_code == 401:
+                    self.key_pool.mark_invalid(key)
+                elif response.status_code == 429:
+                    self.key_pool.mark_throttled(key, parse_retry_after(response.headers.get("Retry-After")))
                 else:
-                    raise Exception(
-                        f"API request failed with status code {e.response.status_code}") from e
-            except httpx.RequestError as e:
-                raise Exception(f"Request error: {str(e)}") from e
+                    break
+                if api_key is not None or not self.key_pool.healthy():
+                    break
+        response.raise_for_status()
+        return response.json()
+
+    def _account_request(self, api_key: ApiKey) -> None:
+        """Count a successful request against a key, re-checking its status once drift builds up."""
+        self.key_pool.record_request(api_key)
+        if (self.key_status_max_drift > 0
+                and api_key.requests_since_check >= self.key_status_max_drift
+                and api_key.key not in self._key_status_checks):
+            with request_priority(Priority.BACKGROUND), no_deadline():
+                task = asyncio.ensure_future(self._check_key_status(api_key))
+            self._key_status_checks[api_key.key] = task
+            task.add_done_callback(lambda _: self._key_status_checks.pop(api_key.key, None))
+
+    def throttling_stats(self) -> Dict[str, Any]:
+        """Return the rate limiter's and request scheduler's queue statistics."""
+        return {
+            "rate_limiter": self.rate_limiter.stats() if self.rate_limiter is not None else None,
+            "scheduler": self.scheduler.stats(),
+        }
+
+    def latency_tracker(self, endpoint: str) -> LatencyTracker:
+        """Return the response time tracker of an endpoint."""
+        tracker = self._latencies.get(endpoint)
+        if tracker is None:
+            tracker = LatencyTracker()
+            self._latencies[endpoint] = tracker
+        return tracker
+
+    @staticmethod
+    def _translate_error(error: Exception) -> Exception:
+        """Convert an httpx error into the exception raised to callers."""
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            if status_code == 401:
+                return ElfaAPIError("API key is invalid or expired", status_code=status_code)
+            return ElfaAPIError(
+                f"API request failed with status code {status_code}", status_code=status_code)
+        return ElfaAPIError(f"Request error: {str(error)}")
+
+    async def get_api_key_status(self, max_age: float = 0.0) -> Dict[str, Any]:
+        """Get the current status of the primary API key.
+
+        A successful response also updates the key pool and re-seeds the
+        client-side rate limiter.
+
+        Args:
+            max_age: Serve the locally cached status, with the requests made
+                since it was checked already deducted, if it was checked
+                within this many seconds
+
+        Returns:
+            A /v1/key-status response
+        """
+        primary = self.key_pool.primary
+        age = self.key_pool.status_age(primary)
+        if age is not None and age <= max_age:
+            return {"success": True, "data": primary.status}
 
-    async def get_api_key_status(self) -> Dict[str, Any]:
-        """Get the current status of the API key."""
-        return await self._make_request("/v1/key-status")
+        response = await self._make_request(KEY_STATUS_ENDPOINT)
+        if response.get("success") and isinstance(response.get("data"), dict):
+            self._apply_key_status(primary, response["data"])
+        return response
+
+    async def refresh_key_statuses(self) -> None:
+        """Check the status of every pooled key and re-balance the pool."""
+        await self.get_api_key_status()
+        for api_key in list(self.key_pool)[1:]:
+            await self._check_key_status(api_key)
+
+    async def _check_key_status(self, api_key: ApiKey) -> None:
+        """Reconcile one key's locally accounted status with the server."""
+        try:
+            if api_key is self.key_pool.primary:
+                await self.get_api_key_status()
+                return
+            response = await self._fetch(KEY_STATUS_ENDPOINT, api_key=api_key)
+        except ElfaAPIError as e:
+            logger.warning("Failed to check the status of API key %r: %s", api_key, e)
+            return
+        if response.get("success") and isinstance(response.get("data"), dict):
+            self._apply_key_status(api_key, response["data"])
+
+    def _apply_key_status(self, api_key: ApiKey, key_status: Dict[str, Any]) -> None:
+        """Record a key's status and pace requests to the pool's combined quota."""
+        self.key_pool.update_from_key_status(api_key, key_status)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_rate(self.key_pool.aggregate_rate())
+
+    async def run_quota_refresh(self, interval: Optional[float] = None) -> None:
+        """Re-check every key's quota and re-seed the rate limiter until cancelled.
+
+        Args:
+            interval: Seconds between refreshes (ELFA_QUOTA_REFRESH_INTERVAL)
+        """
+        if interval is None:
+            interval = env_float("ELFA_QUOTA_REFRESH_INTERVAL", DEFAULT_QUOTA_REFRESH_INTERVAL)
+
+        with request_priority(Priority.BACKGROUND):
+            while True:
+                try:
+                    await self.refresh_key_statuses()
+                except Exception as e:
+                    logger.warning("Failed to refresh API key quota: %s", e)
+                await asyncio.sleep(interval)
 
     async def get_mentions(self, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
         """Get mentions with smart engagement."""
@@ -74,21 +748,70 @@ class ElfaClient:
         }
         return await self._make_request("/v1/mentions", params)
 
+    async def iter_mentions(self, limit: int = 100, offset: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over mentions with smart engagement across all pages.
+
+        Pages are fetched by offset, and the next page is requested while the
+        current one is being consumed.
+        """
+        def next_offset(page: Dict[str, Any], current: int) -> Optional[int]:
+            data = page.get("data") or []
+            total = (page.get("metadata") or {}).get("total")
+            following = current + len(data)
+            if len(data) < limit or (total is not None and following >= total):
+                return None
+            return following
+
+        pages = iter_pages(lambda page_offset: self.get_mentions(limit=limit, offset=page_offset),
+                           offset, next_offset)
+        try:
+            async for page in pages:
+                for mention in page.get("data") or []:
+                    yield mention
+        finally:
+            await pages.aclose()
+
     async def get_top_mentions(self,
                                ticker: str,
                                time_window: str = "1h",
                                page: int = 1,
                                page_size: int = 10,
-                               include_account_details: bool = False) -> Dict[str, Any]:
-        """Get top mentions for a specific ticker."""
-        params = {
+                               include_account_details: bool = False,
+                               refresh: bool = False) -> Dict[str, Any]:
+        """Get top mentions for a specific ticker.
+
+        Pass ``refresh=True`` to bypass the cache and store a fresh response.
+        """
+        params = self._top_mentions_params(ticker, time_window, page, page_size, include_account_details)
+        return await self._make_request("/v1/top-mentions", params, refresh=refresh)
+
+    def top_mentions_expires_in(self,
+                                ticker: str,
+                                time_window: str = "1h",
+                                page: int = 1,
+                                page_size: int = 10,
+                                include_account_details: bool = False) -> Optional[float]:
+        """Return the seconds until the cached top mentions for a ticker go stale.
+
+        Returns:
+            Seconds left (negative once stale), or None if nothing is cached
+        """
+        params = self._top_mentions_params(ticker, time_window, page, page_size, include_account_details)
+        return self.cache.expires_in(make_cache_key("/v1/top-mentions", params))
+
+    @staticmethod
+    def _top_mentions_params(ticker: str,
+                             time_window: str,
+                             page: int,
+                             page_size: int,
+                             include_account_details: bool) -> Dict[str, Any]:
+        return {
             "ticker": ticker,
             "timeWindow": time_window,
             "page": page,
             "pageSize": page_size,
             "includeAccountDetails": include_account_details
         }
-        return await self._make_request("/v1/top-mentions", params)
 
     async def search_mentions(self,
                               keywords: str,
@@ -97,7 +820,13 @@ class ElfaClient:
                               limit: int = 20,
                               search_type: Optional[str] = None,
                               cursor: Optional[str] = None) -> Dict[str, Any]:
-        """Search mentions by keywords."""
+        """Search mentions by keywords.
+
+        A first-page search whose complete results are already in the mention
+        index is answered locally. Pages for ranges that ended more than
+        ELFA_HISTORICAL_MIN_AGE seconds ago are served from the on-disk store
+        when one is configured.
+        """
         params = {
             "keywords": keywords,
             "from": from_time,
@@ -111,21 +840,210 @@ class ElfaClient:
         if cursor:
             params["cursor"] = cursor
 
-        return await self._make_request("/v1/mentions/search", params)
+        indexed = self.mention_index is not None and search_type and not cursor
+        if indexed:
+            local = self.mention_index.search(keywords, search_type, from_time, to_time)
+            if local is not None and len(local) <= limit:
+                return {"success": True, "data": local, "metadata": {"total": len(local)}}
+
+        response = await self._search_mentions_page(params, to_time)
+
+        if indexed and response.get("success"):
+            # Only complete result sets are indexed: mentions without a
+            # recorded search can never answer one, and would only push
+            # recorded searches out of the index
+            mentions = response.get("data") or []
+            metadata = response.get("metadata") or {}
+            if not metadata.get("cursor") and (len(mentions) < limit or metadata.get("total") == len(mentions)):
+                self.mention_index.record_search(keywords, search_type, from_time, to_time, mentions)
+        return response
+
+    async def _search_mentions_page(self, params: Dict[str, Any], to_time: int) -> Dict[str, Any]:
+        """Fetch one page of keyword search results.
+
+        Pages of ranges that ended well in the past never change, so they are
+        kept on disk across restarts and shared between processes.
+        """
+        if self.disk_store is None or to_time > time.time() - self.historical_min_age:
+            return await self._make_request("/v1/mentions/search", params)
+
+        key = make_cache_key("/v1/mentions/search", params)
+        try:
+            stored = await asyncio.to_thread(self.disk_store.get, key)
+        except Exception as e:
+            logger.warning("Failed to read search page from disk: %s", e)
+            stored = None
+        if stored is not None:
+            return stored
+
+        response = await self._make_request("/v1/mentions/search", params)
+        if response.get("success"):
+            try:
+                await asyncio.to_thread(self.disk_store.set, key, response)
+            except Exception as e:
+                logger.warning("Failed to store search page on disk: %s", e)
+        return response
+
+    async def iter_search_mentions(self,
+                                   keywords: str,
+                                   from_time: int,
+                                   to_time: int,
+                                   limit: int = 20,
+                                   search_type: Optional[str] = None,
+                                   cursor: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over keyword search results across all pages.
+
+        Pages are chained through ``metadata.cursor``, and the next page is
+        requested while the current one is being consumed. Searches covered
+        by the mention index are answered locally.
+        """
+        def next_cursor(page: Dict[str, Any], current: Optional[str]) -> Optional[str]:
+            following = (page.get("metadata") or {}).get("cursor")
+            if not page.get("data") or not following or following == current:
+                return None
+            return following
+
+        async def fetch(page_cursor: Optional[str]) -> Dict[str, Any]:
+            return await self.search_mentions(
+                keywords=keywords,
+                from_time=from_time,
+                to_time=to_time,
+                limit=limit,
+                search_type=search_type,
+                cursor=page_cursor
+            )
+
+        indexed = self.mention_index is not None and search_type and not cursor
+        if indexed:
+            local = self.mention_index.search(keywords, search_type, from_time, to_time)
+            if local is not None:
+                for mention in local:
+                    yield mention
+                return
+
+        # Results walked from the first page to the last are a complete
+        # result set that later searches can be answered from
+        collected: Optional[List[Dict[str, Any]]] = [] if indexed else None
+        pages = iter_pages(fetch, cursor, next_cursor)
+        try:
+            async for page in pages:
+                for mention in page.get("data") or []:
+                    if collected is not None:
+                        collected.append(mention)
+                        if len(collected) > self.mention_index.max_mentions:
+                            collected = None
+                    yield mention
+        finally:
+            await pages.aclose()
+
+        if collected is not None:
+            self.mention_index.record_search(keywords, search_type, from_time, to_time, collected)
+
+    async def search_mentions_sharded(self,
+                                      keywords: str,
+                                      from_time: int,
+                                      to_time: int,
+                                      shards: int,
+                                      max_results: int,
+                                      limit: int = 20,
+                                      search_type: Optional[str] = None,
+                                      max_concurrency: Optional[int] = None) -> ShardedSearch:
+        """Search a wide time range by querying sub-windows concurrently.
+
+        The range is split into ``shards`` sub-windows, started newest first.
+        Each is paged through until, together with the mentions already
+        collected from newer sub-windows, it has ``max_results`` mentions, or
+        it runs out; older sub-windows not needed any more stop or never
+        start, so the search costs about as many requests as walking the
+        range. The results are merged newest first, de-duplicated by mention
+        id and cut to ``max_results``. Since each sub-window returns its
+        newest mentions first, this gives the same mentions as walking the
+        whole range. Sub-windows cut short by the time budget keep the
+        mentions they collected, and the search is marked as stopped early.
+
+        Args:
+            keywords: Keywords to search for, separated by commas
+            from_time: Start of the range as a Unix timestamp
+            to_time: End of the range as a Unix timestamp
+            shards: Number of sub-windows to split the range into
+            max_results: Maximum number of mentions to return
+            limit: Page size for each sub-window request
+            search_type: Type of search ("and" or "or")
+            max_concurrency: Sub-windows searched at once
+                (ELFA_SEARCH_SHARD_CONCURRENCY)
+
+        Returns:
+            The mentions, newest first, and whether the budget cut the search short
+        """
+        if max_concurrency is None:
+            max_concurrency = env_int("ELFA_SEARCH_SHARD_CONCURRENCY", DEFAULT_SEARCH_SHARD_CONCURRENCY)
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        # Newest sub-window first; counts[i] is how many mentions sub-window i has collected
+        windows = split_time_range(from_time, to_time, shards)[::-1]
+        counts = [0] * len(windows)
+        stopped_early = False
+
+        def enough(shard: int) -> bool:
+            """Return whether sub-window ``shard`` and the newer ones hold max_results mentions."""
+            return sum(counts[:shard + 1]) >= max_results
+
+        async def search_shard(shard: int, shard_from: int, shard_to: int) -> List[Dict[str, Any]]:
+            nonlocal stopped_early
+            mentions: List[Dict[str, Any]] = []
+            async with semaphore:
+                if enough(shard):
+                    return mentions
+                pages = self.iter_search_mentions(
+                    keywords=keywords,
+                    from_time=shard_from,
+                    to_time=shard_to,
+                    limit=limit,
+                    search_type=search_type
+                )
+                try:
+                    async for mention in pages:
+                        mentions.append(mention)
+                        counts[shard] += 1
+                        if enough(shard):
+                            break
+                except DeadlineExceeded:
+                    stopped_early = True
+                finally:
+                    await pages.aclose()
+            return mentions
+
+        tasks = [asyncio.ensure_future(search_shard(shard, shard_from, shard_to))
+                 for shard, (shard_from, shard_to) in enumerate(windows)]
+        try:
+            shard_results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        merged: Dict[Any, Dict[str, Any]] = {}
+        for mention in (m for shard in shard_results for m in shard):
+            merged.setdefault(mention.get("id") or id(mention), mention)
+
+        mentions = sorted(merged.values(), key=mention_timestamp, reverse=True)[:max_results]
+        return ShardedSearch(mentions, stopped_early)
 
     async def get_trending_tokens(self,
                                   time_window: str = "24h",
                                   page: int = 1,
                                   page_size: int = 50,
-                                  min_mentions: int = 5) -> Dict[str, Any]:
-        """Get trending tokens."""
+                                  min_mentions: int = 5,
+                                  refresh: bool = False) -> Dict[str, Any]:
+        """Get trending tokens.
+
+        Pass ``refresh=True`` to bypass the cache and store a fresh response.
+        """
         params = {
             "timeWindow": time_window,
             "page": page,
             "pageSize": page_size,
             "minMentions": min_mentions
         }
-        return await self._make_request("/v1/trending-tokens", params)
+        return await self._make_request("/v1/trending-tokens", params, refresh=refresh)
 
     async def get_account_smart_stats(self, username: str) -> Dict[str, Any]:
         """Get smart stats for an account."""
@@ -145,3 +1063,11 @@ def get_client() -> ElfaClient:
     if _client_instance is None:
         _client_instance = ElfaClient()
     return _client_instance
+
+
+async def close_client() -> None:
+    """Close the singleton client's connection pool, if one was created."""
+    global _client_instance
+    if _client_instance is not None:
+        await _client_instance.aclose()
+        _client_instance = None
@@ -0,0 +1,195 @@
+"""
+In-process response cache for the Elfa API client.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+# Default time-to-live per endpoint, in seconds. Endpoints that are not
+# listed (such as /v1/key-status) are never cached.
+DEFAULT_CACHE_TTLS: Dict[str, float] = {
+    "/v1/trending-tokens": 60.0,
+    "/v1/top-mentions": 60.0,
+    "/v1/mentions": 30.0,
+    "/v1/mentions/search": 60.0,
+    "/v1/account/smart-stats": 3600.0,
+}
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
+# Hard maximum age per endpoint, in seconds, up to which an expired response
+# may still be served while it is refreshed in the background
+DEFAULT_MAX_STALE_AGES: Dict[str, float] = {
+    "/v1/trending-tokens": 600.0,
+    "/v1/top-mentions": 600.0,
+    "/v1/account/smart-stats": 86400.0,
+}
+
+# How long a "not found" (404) answer is remembered per endpoint, in seconds
+DEFAULT_NEGATIVE_CACHE_TTLS: Dict[str, float] = {
+    "/v1/account/smart-stats": 600.0,
+}
+
+# Cached in place of a response when the API answered 404
+NOT_FOUND = object()
+
+
+class CacheEntry(NamedTuple):
+    """A cached value with its storage, expiry and stale-serving deadline times."""
+    value: Any
+    stored_at: float
+    expires_at: float
+    stale_until: float
+
+
+def make_cache_key(endpoint: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Build a cache key from an endpoint and its query parameters.
+
+    Parameters are sorted, ``None`` values dropped and booleans rendered the
+    way httpx sends them, so equivalent requests share one key.
+
+    Args:
+        endpoint: API endpoint (without base URL)
+        params: Query parameters
+
+    Returns:
+        A string key such as ``/v1/top-mentions?page=1&ticker=BTC``
+    """
+    if not params:
+        return endpoint
+
+    normalized = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        normalized.append((name, str(value)))
+
+    return f"{endpoint}?{urlencode(normalized)}" if normalized else endpoint
+
+
+class ResponseCache:
+    """Bounded LRU cache with a time-to-live per endpoint.
+
+    Values are stored as-is and shared between callers, so they must be
+    treated as read-only.
+    """
+
+    def __init__(self,
+                 max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+                 ttls: Optional[Mapping[str, float]] = None,
+                 negative_ttls: Optional[Mapping[str, float]] = None,
+                 max_stale_ages: Optional[Mapping[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before the least
+                recently used one is evicted
+            ttls: Time-to-live per endpoint in seconds; defaults to DEFAULT_CACHE_TTLS
+            negative_ttls: How long a 404 answer is cached per endpoint, in
+                seconds; defaults to DEFAULT_NEGATIVE_CACHE_TTLS
+            max_stale_ages: Hard maximum age per endpoint in seconds up to which
+                expired responses may be served stale; defaults to DEFAULT_MAX_STALE_AGES
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self.negative_ttls = dict(DEFAULT_NEGATIVE_CACHE_TTLS if negative_ttls is None else negative_ttls)
+        self.max_stale_ages = dict(DEFAULT_MAX_STALE_AGES if max_stale_ages is None else max_stale_ages)
+        self._clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Return the time-to-live for an endpoint, 0 when it is not cached."""
+        if self.max_entries <= 0:
+            return 0.0
+        return self.ttls.get(endpoint, 0.0)
+
+    def negative_ttl_for(self, endpoint: str) -> float:
+        """Return how long a 404 from an endpoint is cached, 0 when it is not."""
+        if self.max_entries <= 0:
+            return 0.0
+        return self.negative_ttls.get(endpoint, 0.0)
+
+    def max_stale_age_for(self, endpoint: str) -> float:
+        """Return the age up to which an endpoint's responses may be served stale, 0 for never."""
+        return self.max_stale_ages.get(endpoint, 0.0)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for a key, or None if missing or expired."""
+        hit = self.lookup(key)
+        if hit is None or not hit[1]:
+            return None
+        return hit[0]
+
+    def lookup(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Return the cached value for a key and whether it is still fresh.
+
+        Expired values are returned (as not fresh) until their hard maximum
+        age has passed, so callers can serve them while refreshing.
+
+        Returns:
+            (value, is_fresh), or None if missing or past its maximum age
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        now = self._clock()
+        if entry.stale_until <= now:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.value, entry.expires_at > now
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Return whatever value is held for a key, however old, without touching it."""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """Return the seconds until a cached value stops being fresh.
+
+        Returns:
+            Seconds left (negative once stale), or None if nothing is cached
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.expires_at - self._clock()
+
+    def set(self, key: str, value: Any, ttl: float, max_stale_age: float = 0.0) -> None:
+        """Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Seconds the value is fresh
+            max_stale_age: Seconds after storing up to which the value may
+                still be served stale; values below ``ttl`` are ignored
+        """
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        now = self._clock()
+        self._entries[key] = CacheEntry(value, now, now + ttl, now + max(ttl, max_stale_age))
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Drop a single entry."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
@@ -0,0 +1,98 @@
+"""
+Circuit breaking for a degraded Elfa API.
+"""
+
+import logging
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0  # seconds
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint after repeated failures, then probe it to recover.
+
+    The breaker starts closed. After ``failure_threshold`` consecutive
+    failures it opens and requests fail fast. Once ``reset_timeout`` seconds
+    have passed it turns half-open and lets a single probe request through:
+    a success closes it again, a failure re-opens it for another timeout.
+    """
+
+    def __init__(self,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures after which the circuit opens
+            reset_timeout: Seconds the circuit stays open before a probe is allowed
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open = False
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Return "closed", "open" or "half_open"."""
+        if not self._open:
+            return CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether requests currently fail fast without a probe being possible."""
+        state = self.state
+        return state == OPEN or (state == HALF_OPEN and self._probing)
+
+    def retry_in(self) -> float:
+        """Return the seconds until the next probe is allowed."""
+        if not self._open:
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - self._clock(), 0.0)
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now, claiming the probe when half-open."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a request reached a healthy upstream."""
+        if self._open:
+            logger.info("Circuit closed after a successful probe")
+        self._failures = 0
+        self._open = False
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit when the threshold is hit."""
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            if not self._open or self._probing:
+                logger.warning("Circuit opened after %d consecutive failures", self._failures)
+            self._open = True
+            self._opened_at = self._clock()
+        self._probing = False
+
+    def release(self) -> None:
+        """Give up a claimed probe without an outcome, e.g. when the request was cancelled."""
+        self._probing = False
@@ -0,0 +1,74 @@
+"""
+Per-call time budgets propagated to upstream requests.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("elfa_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call's time budget runs out before its work is done."""
+
+    def __init__(self, message: str, deadline: Optional[float] = None):
+        super().__init__(message)
+        self.deadline = deadline
+
+
+def current_deadline() -> Optional[float]:
+    """Return the monotonic time by which the current call must finish, if any."""
+    return _deadline.get()
+
+
+def time_remaining() -> Optional[float]:
+    """Return the seconds left in the current call's budget, None when unlimited."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline(action: str) -> None:
+    """Raise DeadlineExceeded if the current call's budget has run out.
+
+    Args:
+        action: What was about to happen, for the error message
+    """
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Time budget exhausted before {action}", _deadline.get())
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Limit the work done inside the block, and tasks started from it, to a time budget.
+
+    A budget nested inside another can only shorten it. ``None`` leaves the
+    current budget unchanged.
+    """
+    if seconds is None:
+        yield
+        return
+
+    expires_at = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """Lift the time budget for the block, e.g. to start a background task that outlives its caller."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,236 @@
+"""
+Local inverted index over mentions already fetched from the Elfa API.
+"""
+
+import bisect
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from elfa_mcp.cache import DEFAULT_CACHE_TTLS
+from elfa_mcp.utils import mention_timestamp
+
+DEFAULT_MAX_MENTIONS = 5000
+DEFAULT_MAX_COVERAGE = 256
+DEFAULT_COVERAGE_TTL = DEFAULT_CACHE_TTLS["/v1/mentions/search"]
+
+# Search results for ranges that ended at least this long ago no longer
+# change and may be kept in the on-disk store
+DEFAULT_HISTORICAL_MIN_AGE = 3600.0  # seconds
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Split text into lowercase word tokens, ignoring $, # and @ prefixes."""
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def parse_keywords(keywords: str) -> FrozenSet[str]:
+    """Normalize a comma-separated keyword list into a set of lowercase keywords."""
+    return frozenset(k.strip().lower() for k in keywords.split(",") if k.strip())
+
+
+class Coverage(NamedTuple):
+    """A search whose complete result set is held in the index, and when it was fetched."""
+    keywords: FrozenSet[str]
+    search_type: str
+    from_time: int
+    to_time: int
+    ids: FrozenSet[str]
+    recorded_at: float
+
+
+class MentionIndex:
+    """Bounded in-memory index answering keyword searches from fetched mentions.
+
+    Mentions are indexed by word token and by timestamp. Whenever the full
+    result set of a search is fetched, the search is recorded as coverage. A
+    later search can then be answered locally if a recorded search is
+    guaranteed to contain all of its results:
+
+    - an "and" search is covered by a search over a time range containing its
+      own whose results include all of its matches: an "and" search over a
+      subset of its keywords, or an "or" search sharing one of its keywords;
+    - an "or" search is covered when each of its keywords is covered that way.
+
+    Candidates from the covering searches are then filtered by time range and
+    by matching any keywords the covering search did not already guarantee.
+    Locally, a keyword matches a mention when every word of the keyword
+    occurs in the mention's content.
+
+    Results of recent ranges keep changing as mentions are ingested and
+    engagement grows, so a recorded search only answers others for ``ttl``
+    seconds, like a cached search response. Searches over ranges that had
+    ended ``historical_min_age`` seconds before they were recorded are kept
+    for good.
+    """
+
+    def __init__(self,
+                 max_mentions: int = DEFAULT_MAX_MENTIONS,
+                 max_coverage: int = DEFAULT_MAX_COVERAGE,
+                 ttl: float = DEFAULT_COVERAGE_TTL,
+                 historical_min_age: float = DEFAULT_HISTORICAL_MIN_AGE,
+                 clock: Callable[[], float] = time.time):
+        """Initialize the index.
+
+        Args:
+            max_mentions: Maximum number of mentions kept; the oldest added are evicted first
+            max_coverage: Maximum number of recorded searches kept
+            ttl: Seconds a recorded search over a recent range stays usable
+            historical_min_age: Seconds after which a range's results no
+                longer change
+            clock: Wall-clock time source, replaceable in tests
+        """
+        self.max_mentions = max_mentions
+        self.max_coverage = max_coverage
+        self.ttl = ttl
+        self.historical_min_age = historical_min_age
+        self._clock = clock
+        self._mentions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tokens: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._timeline: List[Tuple[float, str]] = []
+        self._coverage: "OrderedDict[Tuple[FrozenSet[str], str, int, int], Coverage]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._mentions)
+
+    def add_mentions(self, mentions: Iterable[Dict[str, Any]], replace: bool = True) -> None:
+        """Index mentions, keeping at most ``max_mentions``.
+
+        Args:
+            mentions: Mentions with an "id", "content" and a posting date
+            replace: Whether to replace mentions already indexed under the same id
+        """
+        for mention in mentions:
+            mention_id = mention.get("id")
+            if mention_id is None:
+                continue
+            mention_id = str(mention_id)
+
+            if mention_id in self._mentions:
+                if not replace:
+                    continue
+                self._remove(mention_id)
+
+            tokens = tokenize(mention.get("content") or "")
+            self._mentions[mention_id] = mention
+            self._tokens[mention_id] = tokens
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(mention_id)
+            bisect.insort(self._timeline, (mention_timestamp(mention), mention_id))
+
+        while len(self._mentions) > self.max_mentions:
+            oldest = next(iter(self._mentions))
+            self._remove(oldest)
+
+    def record_search(self,
+                      keywords: str,
+                      search_type: str,
+                      from_time: int,
+                      to_time: int,
+                      mentions: List[Dict[str, Any]]) -> None:
+        """Index the complete result set of a search and record it as coverage."""
+        self.add_mentions(mentions)
+        ids = frozenset(str(m["id"]) for m in mentions if m.get("id") is not None)
+        if len(ids) != len(mentions) or not ids <= self._mentions.keys():
+            # Some results could not be indexed, so the set is not complete
+            return
+
+        coverage = Coverage(parse_keywords(keywords), search_type.lower(), from_time, to_time, ids, self._clock())
+        key = coverage[:4]
+        self._coverage.pop(key, None)
+        self._coverage[key] = coverage
+        while len(self._coverage) > self.max_coverage:
+            self._coverage.popitem(last=False)
+
+    def search(self, keywords: str, search_type: str, from_time: int, to_time: int) -> Optional[List[Dict[str, Any]]]:
+        """Answer a search from the index.
+
+        Returns:
+            Matching mentions newest first, or None if the index cannot
+            guarantee a complete answer
+        """
+        wanted = parse_keywords(keywords)
+        search_type = search_type.lower()
+        if not wanted or search_type not in ("and", "or"):
+            return None
+
+        if search_type == "and":
+            matches = self._covered_matches(wanted, from_time, to_time)
+        else:
+            matches = set()
+            for keyword in wanted:
+                keyword_matches = self._covered_matches(frozenset([keyword]), from_time, to_time)
+                if keyword_matches is None:
+                    return None
+                matches |= keyword_matches
+
+        if matches is None:
+            return None
+
+        found = [self._mentions[mention_id] for mention_id in matches]
+        return sorted(found, key=mention_timestamp, reverse=True)
+
+    def _covered_matches(self, wanted: FrozenSet[str], from_time: int, to_time: int) -> Optional[Set[str]]:
+        """Find the mentions matching all of ``wanted`` using a covering search."""
+        now = self._clock()
+        for key, coverage in reversed(list(self._coverage.items())):
+            if self._expired(coverage, now):
+                del self._coverage[key]
+                continue
+            if coverage.from_time > from_time or coverage.to_time < to_time:
+                continue
+
+            if coverage.search_type == "and" and coverage.keywords <= wanted:
+                unverified = wanted - coverage.keywords
+            elif coverage.search_type == "or" and coverage.keywords & wanted:
+                unverified = wanted if len(coverage.keywords) > 1 else wanted - coverage.keywords
+            else:
+                continue
+
+            candidates = coverage.ids & self._ids_between(from_time, to_time)
+            for keyword in unverified:
+                candidates &= self._ids_matching(keyword)
+            return candidates
+
+        return None
+
+    def _expired(self, coverage: Coverage, now: float) -> bool:
+        """Tell whether a recorded search may have missed changes made since."""
+        historical = coverage.to_time <= coverage.recorded_at - self.historical_min_age
+        return not historical and now - coverage.recorded_at > self.ttl
+
+    def _ids_between(self, from_time: int, to_time: int) -> Set[str]:
+        """Look up mentions posted within a time range in the timestamp index."""
+        start = bisect.bisect_left(self._timeline, from_time, key=lambda entry: entry[0])
+        end = bisect.bisect_right(self._timeline, to_time, key=lambda entry: entry[0])
+        return {mention_id for _, mention_id in self._timeline[start:end]}
+
+    def _ids_matching(self, keyword: str) -> Set[str]:
+        """Look up mentions containing every word of a keyword in the token index."""
+        tokens = tokenize(keyword)
+        if not tokens:
+            return set()
+        postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+        return set(postings[0]).intersection(*postings[1:])
+
+    def _remove(self, mention_id: str) -> None:
+        mention = self._mentions.pop(mention_id)
+        for token in self._tokens.pop(mention_id, set()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.discard(mention_id)
+                if not postings:
+                    del self._postings[token]
+
+        entry = (mention_timestamp(mention), mention_id)
+        position = bisect.bisect_left(self._timeline, entry)
+        if position < len(self._timeline) and self._timeline[position] == entry:
+            del self._timeline[position]
+
+        # A recorded search is only complete while all of its results are held
+        for key in [key for key, coverage in self._coverage.items() if mention_id in coverage.ids]:
+            del self._coverage[key]
@@ -0,0 +1,215 @@
+"""
+Pool of Elfa API keys balanced by their remaining quota.
+"""
+
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from elfa_mcp.ratelimit import quota_rate, seconds_until_daily_reset, seconds_until_monthly_reset
+
+logger = logging.getLogger(__name__)
+
+# Seconds a key answering 429 without a Retry-After header is rested
+DEFAULT_THROTTLE_COOLDOWN = 60.0
+
+
+def load_api_keys(value: Optional[str] = None, key_file: Optional[str] = None) -> List[str]:
+    """Collect API keys from a comma-separated value and a key file.
+
+    Args:
+        value: One key, or several separated by commas
+        key_file: Path of a file with one key per line; blank lines and
+            lines starting with # are ignored
+
+    Returns:
+        The distinct keys in the order given
+    """
+    keys = [k.strip() for k in (value or "").split(",")]
+    if key_file:
+        with open(key_file, encoding="utf-8") as f:
+            keys.extend(line.strip() for line in f if not line.lstrip().startswith("#"))
+    return list(dict.fromkeys(k for k in keys if k))
+
+
+class ApiKey:
+    """One API key with its last known status and health."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.headers = {
+            "x-elfa-api-key": key,
+            "Accept": "application/json"
+        }
+        self.status: Optional[Dict[str, Any]] = None
+        self.checked_at: Optional[float] = None
+        self.requests_since_check = 0
+        self.unhealthy_until = 0.0
+        self.unhealthy_reason: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"ApiKey(...{self.key[-4:]})"
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Return the requests left under the stricter of the daily and monthly quotas, if known."""
+        remaining = (self.status or {}).get("remainingRequests") or {}
+        counts = [v for v in (remaining.get("daily"), remaining.get("monthly")) if isinstance(v, (int, float))]
+        return min(counts) if counts else None
+
+
+class KeyPool:
+    """Spread requests over several API keys in proportion to their remaining quota.
+
+    Keys answering 401 are taken out of rotation until a key status check
+    succeeds for them again; keys answering 429 are rested for their
+    Retry-After delay; keys whose status shows an exhausted quota are rested
+    until it resets. When no key is healthy, the one due to recover first is
+    used anyway, so a single-key pool behaves exactly like a plain key.
+    """
+
+    def __init__(self,
+                 keys: List[str],
+                 clock: Callable[[], float] = time.monotonic,
+                 rng: Optional[random.Random] = None):
+        """Initialize the pool.
+
+        Args:
+            keys: API keys; the first one is the primary key
+            clock: Monotonic time source, replaceable in tests
+            rng: Random source used for weighted selection
+        """
+        if not keys:
+            raise ValueError("At least one API key is required")
+        self._keys = [ApiKey(key) for key in keys]
+        self._by_key = {api_key.key: api_key for api_key in self._keys}
+        self._clock = clock
+        self._rng = rng or random.Random()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[ApiKey]:
+        return iter(self._keys)
+
+    @property
+    def primary(self) -> ApiKey:
+        """Return the first configured key."""
+        return self._keys[0]
+
+    def get(self, key: str) -> ApiKey:
+        """Return the pool entry for a key string."""
+        return self._by_key[key]
+
+    def is_healthy(self, api_key: ApiKey) -> bool:
+        """Return whether a key is in rotation."""
+        return api_key.unhealthy_until <= self._clock()
+
+    def healthy(self) -> List[ApiKey]:
+        """Return the keys currently in rotation."""
+        return [api_key for api_key in self._keys if self.is_healthy(api_key)]
+
+    def select(self) -> ApiKey:
+        """Pick a healthy key, weighted by its remaining quota.
+
+        Keys whose quota is not known yet weigh as much as the average known
+        key, or all equally when none is known.
+        """
+        candidates = self.healthy()
+        if not candidates:
+            return min(self._keys, key=lambda api_key: api_key.unhealthy_until)
+        if len(candidates) == 1:
+            return candidates[0]
+
+        known = [api_key.remaining for api_key in candidates if api_key.remaining is not None]
+        default = sum(known) / len(known) if known else 1.0
+        weights = [max(api_key.remaining if api_key.remaining is not None else default, 0.0)
+                   for api_key in candidates]
+        if sum(weights) <= 0:
+            return self._rng.choice(candidates)
+        return self._rng.choices(candidates, weights=weights)[0]
+
+    def mark_invalid(self, api_key: ApiKey) -> None:
+        """Take a key answering 401 out of rotation until its status check succeeds."""
+        if api_key.unhealthy_reason != "invalid":
+            logger.warning("API key %r is invalid or expired; removing it from rotation", api_key)
+        self._mark_unhealthy(api_key, float("inf"), "invalid")
+
+    def mark_throttled(self, api_key: ApiKey, retry_after: Optional[float] = None) -> None:
+        """Rest a key answering 429 for its Retry-After delay."""
+        delay = retry_after if retry_after is not None else DEFAULT_THROTTLE_COOLDOWN
+        self._mark_unhealthy(api_key, self._clock() + delay, "throttled")
+
+    def update_from_key_status(self, api_key: ApiKey, key_status: Dict[str, Any]) -> None:
+        """Record a /v1/key-status payload for a key and update its health."""
+        api_key.status = {
+            name: dict(value) if isinstance(value, dict) else value
+            for name, value in key_status.items()
+        }
+        api_key.checked_at = self._clock()
+        api_key.requests_since_check = 0
+        self._update_health(api_key)
+
+    def record_request(self, api_key: ApiKey) -> None:
+        """Account locally for a successful request made with a key.
+
+        The remaining daily and monthly requests of its last known status
+        are decremented and its usage incremented, so the status stays
+        current between checks.
+        """
+        api_key.requests_since_check += 1
+        if api_key.status is None:
+            return
+
+        remaining = api_key.status.get("remainingRequests")
+        usage = api_key.status.get("usage")
+        for period in ("daily", "monthly"):
+            if isinstance(remaining, dict) and isinstance(remaining.get(period), (int, float)):
+                remaining[period] = max(remaining[period] - 1, 0)
+            if isinstance(usage, dict) and isinstance(usage.get(period), (int, float)):
+                usage[period] += 1
+        if api_key.remaining == 0:
+            self._update_health(api_key)
+
+    def status_age(self, api_key: ApiKey) -> Optional[float]:
+        """Return the seconds since a key's status was last checked, None if never."""
+        if api_key.checked_at is None:
+            return None
+        return self._clock() - api_key.checked_at
+
+    def _update_health(self, api_key: ApiKey) -> None:
+        """Rest a key whose status shows an exhausted quota, or return it to rotation."""
+        remaining = api_key.status.get("remainingRequests") or {}
+        now = self._clock()
+
+        if isinstance(remaining.get("monthly"), (int, float)) and remaining["monthly"] <= 0:
+            self._mark_unhealthy(api_key, now + seconds_until_monthly_reset(), "exhausted")
+        elif isinstance(remaining.get("daily"), (int, float)) and remaining["daily"] <= 0:
+            self._mark_unhealthy(api_key, now + seconds_until_daily_reset(), "exhausted")
+        else:
+            api_key.unhealthy_until = 0.0
+            api_key.unhealthy_reason = None
+
+    def aggregate_rate(self) -> Optional[float]:
+        """Return the combined sustainable request rate of the healthy keys.
+
+        Returns:
+            Requests per second; None while a healthy key's quota is unknown
+            or unlimited, and 0 when every key is out of rotation
+        """
+        healthy = self.healthy()
+        if not healthy:
+            return 0.0 if any(api_key.status is not None for api_key in self._keys) else None
+
+        total = 0.0
+        for api_key in healthy:
+            rate = quota_rate(api_key.status) if api_key.status is not None else None
+            if rate is None:
+                return None
+            total += rate
+        return total
+
+    def _mark_unhealthy(self, api_key: ApiKey, until: float, reason: str) -> None:
+        api_key.unhealthy_until = until
+        api_key.unhealthy_reason = reason
@@ -0,0 +1,82 @@
+"""
+Per-endpoint latency tracking for adaptive timeouts and hedged requests.
+"""
+
+import bisect
+import math
+from collections import deque
+from typing import Deque, List, Optional
+
+DEFAULT_WINDOW = 200
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_TIMEOUT_PERCENTILE = 99.0
+DEFAULT_TIMEOUT_MULTIPLIER = 3.0
+DEFAULT_MIN_TIMEOUT = 5.0  # seconds
+
+
+class LatencyTracker:
+    """Sliding window of recent response times for one endpoint.
+
+    Percentiles are only reported once ``min_samples`` responses have been
+    seen, so a handful of early outliers cannot set the timeouts. Requests
+    that time out count as samples at their timeout, and each one in a row
+    doubles the next timeout, so an upstream that slows down past the
+    learned timeout is still waited for.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, min_samples: int = DEFAULT_MIN_SAMPLES):
+        """Initialize the tracker.
+
+        Args:
+            window: Number of most recent samples kept
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque()
+        self._sorted: List[float] = []
+        self.consecutive_timeouts = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add a response time, dropping the oldest once the window is full."""
+        self.consecutive_timeouts = 0
+        self._add(seconds)
+
+    def record_timeout(self, seconds: float) -> None:
+        """Count a request that gave up after ``seconds`` without a response."""
+        self.consecutive_timeouts += 1
+        self._add(seconds)
+
+    def _add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        bisect.insort(self._sorted, seconds)
+        if len(self._samples) > self.window:
+            oldest = self._samples.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Return a latency percentile (nearest rank), or None with too few samples."""
+        if len(self._sorted) < max(self.min_samples, 1):
+            return None
+        rank = math.ceil(percent / 100 * len(self._sorted))
+        return self._sorted[min(max(rank, 1), len(self._sorted)) - 1]
+
+    def timeout(self,
+                default: float,
+                minimum: float = DEFAULT_MIN_TIMEOUT,
+                percent: float = DEFAULT_TIMEOUT_PERCENTILE,
+                multiplier: float = DEFAULT_TIMEOUT_MULTIPLIER) -> float:
+        """Return a timeout of ``multiplier`` times the latency percentile.
+
+        The result is at least ``minimum``, doubled for every timeout in a
+        row, and capped at ``default``. It is ``default`` until enough
+        samples have been seen.
+        """
+        observed = self.percentile(percent)
+        if observed is None:
+            return default
+        learned = max(observed * multiplier, minimum) * 2 ** self.consecutive_timeouts
+        return min(learned, default)
@@ -0,0 +1,60 @@
+"""
+Pipelined pagination over Elfa API list endpoints.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from elfa_mcp.deadline import DeadlineExceeded, current_deadline, time_remaining
+from elfa_mcp.scheduler import Priority, request_priority
+
+
+async def iter_pages(fetch_page: Callable[[Any], Awaitable[Dict[str, Any]]],
+                     first_token: Any,
+                     next_token: Callable[[Dict[str, Any], Any], Optional[Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield API response pages, prefetching the next page in the background.
+
+    The request for page N+1 is started as soon as page N arrives, so it runs
+    while the caller is consuming page N, in the pagination priority class.
+    Closing the generator early cancels the pending prefetch. Once the
+    current call's time budget has run out no further page is requested,
+    and asking for one raises DeadlineExceeded.
+
+    Args:
+        fetch_page: Coroutine function fetching the page for a token
+        first_token: Token of the first page (e.g. an offset or cursor)
+        next_token: Returns the token of the page after a response, or None
+            when it was the last page
+
+    Returns:
+        An async iterator of successful responses; an unsuccessful response
+        raises an Exception
+    """
+    token = first_token
+    pending: Optional["asyncio.Future[Dict[str, Any]]"] = asyncio.ensure_future(fetch_page(token))
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            if not page.get("success"):
+                raise Exception("API returned an unsuccessful response while paginating")
+
+            token = next_token(page, token)
+            out_of_time = False
+            if token is not None:
+                remaining = time_remaining()
+                if remaining is not None and remaining <= 0:
+                    out_of_time = True
+                else:
+                    with request_priority(Priority.PAGINATION):
+                        pending = asyncio.ensure_future(fetch_page(token))
+            yield page
+            if out_of_time:
+                raise DeadlineExceeded("Time budget exhausted while paginating", current_deadline())
+    finally:
+        if pending is not None:
+            if pending.done():
+                if not pending.cancelled():
+                    pending.exception()
+            else:
+                pending.cancel()
@@ -0,0 +1,139 @@
+"""
+Background prefetching of frequently requested top mentions.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from elfa_mcp.scheduler import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFETCH_TOP_N = 10
+DEFAULT_PREFETCH_INTERVAL = 30.0  # seconds
+DEFAULT_PREFETCH_QUOTA_FRACTION = 0.2
+DEFAULT_PREFETCH_DECAY = 0.5
+# Requests whose decayed score falls below this are forgotten
+MIN_SCORE = 0.1
+
+
+class TopMentionsRequest(NamedTuple):
+    """The arguments of a get_top_mentions call."""
+    ticker: str
+    time_window: str
+    page: int
+    page_size: int
+    include_account_details: bool
+
+
+class HotTickerPrefetcher:
+    """Keep the cache warm for the most requested top-mentions queries.
+
+    Every tool call records its request. Each ``interval`` seconds the
+    ``top_n`` most requested ones are refreshed in the background if their
+    cached response is missing or expires before the next cycle, so callers
+    keep hitting a fresh cache. Scores decay every cycle, so tickers that
+    stop being asked for drop out.
+
+    Prefetching spends at most ``quota_fraction`` of the request rate allowed
+    by the client's rate limiter; without a known rate it is capped at
+    ``top_n`` requests per cycle. The allowance earned per cycle accumulates
+    like a token bucket holding up to ``top_n`` requests, so a low quota
+    still prefetches every few cycles rather than never.
+    """
+
+    def __init__(self,
+                 client: Any,
+                 top_n: int = DEFAULT_PREFETCH_TOP_N,
+                 interval: float = DEFAULT_PREFETCH_INTERVAL,
+                 quota_fraction: float = DEFAULT_PREFETCH_QUOTA_FRACTION,
+                 decay: float = DEFAULT_PREFETCH_DECAY):
+        """Initialize the prefetcher.
+
+        Args:
+            client: ElfaClient used to refresh responses
+            top_n: Number of most requested queries kept warm
+            interval: Seconds between prefetch cycles
+            quota_fraction: Share of the rate-limited request budget prefetching may use
+            decay: Factor applied to every score after each cycle
+        """
+        self.client = client
+        self.top_n = top_n
+        self.interval = interval
+        self.quota_fraction = quota_fraction
+        self.decay = decay
+        self._scores: Dict[TopMentionsRequest, float] = {}
+        # Fractional prefetch allowance carried over between cycles
+        self._credit = 0.0
+
+    def record(self,
+               ticker: str,
+               time_window: str = "1h",
+               page: int = 1,
+               page_size: int = 10,
+               include_account_details: bool = False) -> None:
+        """Count a top-mentions request towards its popularity."""
+        request = TopMentionsRequest(ticker, time_window, page, page_size, include_account_details)
+        self._scores[request] = self._scores.get(request, 0.0) + 1.0
+
+    def hot(self) -> List[TopMentionsRequest]:
+        """Return the ``top_n`` most requested queries, most popular first."""
+        ranked = sorted(self._scores.items(), key=lambda item: item[1], reverse=True)
+        return [request for request, _ in ranked[:self.top_n]]
+
+    def budget(self) -> int:
+        """Return how many requests the next prefetch cycle may make."""
+        earned = self._earned()
+        if earned is None:
+            return self.top_n
+        return min(self.top_n, int(self._credit + earned))
+
+    def _earned(self) -> Optional[float]:
+        """Return the allowance one cycle adds, None when the rate is unlimited."""
+        rate: Optional[float] = getattr(self.client.rate_limiter, "rate", None)
+        if rate is None:
+            return None
+        return rate * self.interval * self.quota_fraction
+
+    async def prefetch_once(self) -> int:
+        """Refresh hot queries expiring before the next cycle, then decay scores.
+
+        Returns:
+            The number of queries refreshed
+        """
+        budget = self.budget()
+        refreshed = 0
+        for request in self.hot():
+            if refreshed >= budget:
+                break
+            expires_in = self.client.top_mentions_expires_in(*request)
+            if expires_in is not None and expires_in > self.interval:
+                continue
+
+            refreshed += 1
+            try:
+                await self.client.get_top_mentions(*request, refresh=True)
+            except Exception as e:
+                logger.warning("Failed to prefetch top mentions for %s: %s", request.ticker, e)
+
+        earned = self._earned()
+        if earned is not None:
+            self._credit = min(max(self._credit + earned - refreshed, 0.0), float(self.top_n))
+        self._decay()
+        return refreshed
+
+    async def run(self) -> None:
+        """Prefetch every ``interval`` seconds until cancelled."""
+        with request_priority(Priority.BACKGROUND):
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.prefetch_once()
+
+    def _decay(self) -> None:
+        for request in list(self._scores):
+            score = self._scores[request] * self.decay
+            if score < MIN_SCORE:
+                del self._scores[request]
+            else:
+                self._scores[request] = score
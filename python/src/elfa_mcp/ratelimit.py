@@ -0,0 +1,233 @@
+"""
+Client-side rate limiting driven by the API key's remaining quota.
+"""
+
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BURST = 10
+DEFAULT_MAX_WAIT = 30.0  # seconds
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the API key's quota is used up until it resets."""
+
+
+def seconds_until_daily_reset(now: Optional[datetime.datetime] = None) -> float:
+    """Return the seconds left until the daily quota resets at midnight UTC."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    tomorrow = (now + datetime.timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0)
+    return max((tomorrow - now).total_seconds(), 1.0)
+
+
+def seconds_until_monthly_reset(now: Optional[datetime.datetime] = None) -> float:
+    """Return the seconds left until the monthly quota resets on the 1st, UTC."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    if now.month == 12:
+        next_month = now.replace(year=now.year + 1, month=1)
+    else:
+        next_month = now.replace(month=now.month + 1)
+    next_month = next_month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return max((next_month - now).total_seconds(), 1.0)
+
+
+def quota_rate(key_status: Dict[str, Any], now: Optional[datetime.datetime] = None) -> Optional[float]:
+    """Derive a sustainable request rate from a /v1/key-status payload.
+
+    The remaining daily and monthly requests are spread evenly over the time
+    left until each quota resets, and the stricter of the two wins. When the
+    remaining counts are missing, the full limits are spread over a day or a
+    30-day month instead.
+
+    Args:
+        key_status: The ``data`` object returned by /v1/key-status
+        now: Current UTC time, for tests
+
+    Returns:
+        Requests per second, or None when the key has no known limits
+    """
+    remaining = key_status.get("remainingRequests") or {}
+    rates = []
+
+    daily = remaining.get("daily")
+    if isinstance(daily, (int, float)):
+        rates.append(max(daily, 0) / seconds_until_daily_reset(now))
+    elif isinstance(key_status.get("dailyRequestLimit"), (int, float)):
+        rates.append(key_status["dailyRequestLimit"] / 86400)
+
+    monthly = remaining.get("monthly")
+    if isinstance(monthly, (int, float)):
+        rates.append(max(monthly, 0) / seconds_until_monthly_reset(now))
+    elif isinstance(key_status.get("monthlyRequestLimit"), (int, float)):
+        rates.append(key_status["monthlyRequestLimit"] / (30 * 86400))
+
+    return min(rates) if rates else None
+
+
+class QuotaRateLimiter:
+    """Async token bucket whose refill rate follows the API key's quota.
+
+    Until it is seeded with a key status the limiter lets every request
+    through. Waiting requests are served by priority, lowest value first,
+    then in arrival order; a request of higher priority arriving while a
+    lower one is already waiting for a token takes its place. Pacing is best
+    effort: a request that would wait longer than ``max_wait`` for a token is
+    sent at once instead, so bursts beyond the bucket still go through while
+    quota is left. Only once the quota is used up (a rate of 0) do requests
+    fail, with RateLimitExceeded.
+    """
+
+    def __init__(self,
+                 burst: int = DEFAULT_BURST,
+                 max_wait: float = DEFAULT_MAX_WAIT,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the limiter.
+
+        Args:
+            burst: Bucket capacity, the number of requests allowed back to back
+            max_wait: Longest time in seconds a request may queue for a token
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.burst = burst
+        self.max_wait = max_wait
+        self.rate: Optional[float] = None
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._changed = asyncio.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+
+        self.queue_depth = 0
+        self.total_requests = 0
+        self.throttled_requests = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.last_wait_time = 0.0
+
+    def update_from_key_status(self, key_status: Dict[str, Any]) -> None:
+        """Re-seed the refill rate from a /v1/key-status payload."""
+        self.update_rate(quota_rate(key_status))
+
+    def update_rate(self, rate: Optional[float]) -> None:
+        """Set the refill rate in requests per second, None for unlimited."""
+        self._refill()
+        self.rate = rate
+        logger.debug("Rate limit set to %s requests/second", self.rate)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self.rate is not None:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _wait_time(self) -> float:
+        if self.rate is None or self._tokens >= 1:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self, max_wait: Optional[float] = None, priority: int = 0) -> float:
+        """Wait for a request token.
+
+        Args:
+            max_wait: Longest time in seconds this request may wait, if
+                shorter than the limiter's own ``max_wait``
+            priority: Lower values are served first (see scheduler.Priority)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: The quota is used up until it resets
+        """
+        if self.rate is not None and self.rate <= 0:
+            raise RateLimitExceeded("API request quota exhausted until it resets")
+        if max_wait is None or max_wait > self.max_wait:
+            max_wait = self.max_wait
+        self.queue_depth += 1
+        started = self._clock()
+        give_up_at = started + max_wait
+        throttled = False
+        entry = (priority, next(self._sequence))
+        try:
+            async with self._changed:
+                heapq.heappush(self._waiters, entry)
+                # A lower-priority request sleeping for a token re-checks its place
+                self._changed.notify_all()
+                try:
+                    while True:
+                        now = self._clock()
+                        if self._waiters[0] == entry:
+                            self._refill()
+                            wait = self._wait_time()
+                            if wait <= 0:
+                                break
+                            if now + wait > give_up_at:
+                                # Quota is left, so send the request rather than fail it
+                                logger.debug("Rate limit would delay a request by %.0fs; sending it now", wait)
+                                break
+                        else:
+                            wait = give_up_at - now
+                            if wait <= 0:
+                                break
+                        throttled = True
+                        try:
+                            await asyncio.wait_for(self._changed.wait(), wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    self._refill()
+                    if self.rate is not None:
+                        self._tokens = max(self._tokens - 1, 0.0)
+                finally:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._changed.notify_all()
+        finally:
+            self.queue_depth -= 1
+
+        waited = self._clock() - started if throttled else 0.0
+        self.total_requests += 1
+        self.last_wait_time = waited
+        if throttled:
+            self.throttled_requests += 1
+            self.total_wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+        return waited
+
+    def try_acquire(self) -> bool:
+        """Take a request token only if one is available right now.
+
+        Returns:
+            Whether a token was taken; never waits
+        """
+        if self._waiters or (self.rate is not None and self.rate <= 0):
+            return False
+        self._refill()
+        if self.rate is not None:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+        self.total_requests += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return throttling statistics for monitoring."""
+        return {
+            "rate_per_second": self.rate,
+            "queue_depth": self.queue_depth,
+            "total_requests": self.total_requests,
+            "throttled_requests": self.throttled_requests,
+            "total_wait_seconds": round(self.total_wait_time, 3),
+            "max_wait_seconds": round(self.max_wait_time, 3),
+            "last_wait_seconds": round(self.last_wait_time, 3),
+        }
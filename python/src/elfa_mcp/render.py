@@ -0,0 +1,108 @@
+"""
+Length-budgeted rendering of tool output.
+"""
+
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Rough size of a token in English text, used to turn token budgets into characters
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_OUTPUT_TOKENS = 5000
+DEFAULT_MAX_CONTENT_CHARS = 1000
+# Content is never cut below this many characters to fit more items
+MIN_CONTENT_CHARS = 80
+# Space kept free for the note on omitted items
+FOOTER_RESERVE = 100
+ELLIPSIS = "…"
+
+
+def truncate(text: Optional[str], limit: Optional[int]) -> str:
+    """Shorten text to at most ``limit`` characters, cutting at a word boundary where possible.
+
+    Args:
+        text: Text to shorten; None is treated as empty
+        limit: Maximum length including the trailing ellipsis; None or 0 for no limit
+
+    Returns:
+        The text, or its start followed by an ellipsis
+    """
+    text = text or ""
+    if not limit or len(text) <= limit:
+        return text
+
+    cut = text[:max(limit - len(ELLIPSIS), 0)]
+    space = cut.rfind(" ")
+    if not text[len(cut)].isspace() and space > len(cut) * 0.6:
+        cut = cut[:space]
+    return cut.rstrip() + ELLIPSIS
+
+
+class Renderer:
+    """Build tool output from parts within an approximate token budget.
+
+    Parts are collected in a list and joined once, so rendering stays linear
+    in the output size. Items are added while they fit, with long content
+    shortened so the items left share the remaining space; once the budget
+    is spent, the rest are summarized in a single line.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_content_chars: Optional[int] = None):
+        """Initialize the renderer.
+
+        Args:
+            max_tokens: Approximate output size limit in tokens; None or 0 for no limit
+            max_content_chars: Longest content shown per item; None or 0 for no limit
+        """
+        self.max_tokens = max_tokens or None
+        self.max_chars = self.max_tokens * CHARS_PER_TOKEN if self.max_tokens else None
+        self.max_content_chars = max_content_chars or None
+        self.omitted = 0
+        self._parts: List[str] = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def text(self, text: str) -> None:
+        """Add text that is always shown, such as a header."""
+        self._parts.append(text)
+        self._length += len(text)
+
+    def items(self,
+              entries: Sequence[T],
+              render: Callable[[int, T, Optional[int]], str],
+              noun: str = "items") -> None:
+        """Add numbered items for as long as they fit.
+
+        Args:
+            entries: Items to render, in order
+            render: Called with the 1-based index, the item and the content
+                length limit it should apply; returns the item's text
+            noun: What the items are, for the note on omitted ones
+        """
+        for idx, entry in enumerate(entries, 1):
+            if self.max_chars is None:
+                self.text(render(idx, entry, self.max_content_chars))
+                continue
+
+            remaining = self.max_chars - FOOTER_RESERVE - self._length
+            share = remaining // (len(entries) - idx + 1)
+            limit = max(share, MIN_CONTENT_CHARS)
+            if self.max_content_chars is not None:
+                limit = min(limit, self.max_content_chars)
+
+            piece = render(idx, entry, limit)
+            overflow = len(piece) - remaining
+            if overflow > 0 and limit - overflow >= MIN_CONTENT_CHARS:
+                piece = render(idx, entry, limit - overflow)
+            if len(piece) > remaining:
+                self.omitted = len(entries) - idx + 1
+                self.text(f"... {self.omitted} more {noun} not shown "
+                          f"(output limited to about {self.max_tokens} tokens)\n")
+                return
+            self.text(piece)
+
+    def render(self) -> str:
+        """Return the output built so far."""
+        return "".join(self._parts)
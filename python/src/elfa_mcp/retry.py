@@ -0,0 +1,106 @@
+"""
+Retry policy for transient Elfa API failures.
+"""
+
+import datetime
+import email.utils
+import random
+from typing import Optional
+
+import httpx
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5  # seconds
+DEFAULT_MAX_DELAY = 8.0  # seconds
+DEFAULT_MAX_RETRY_AFTER = 30.0  # seconds
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime.datetime] = None) -> Optional[float]:
+    """Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+        now: Current UTC time, for tests
+
+    Returns:
+        Seconds to wait, or None if the value is missing or malformed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for idempotent requests.
+
+    Rate limiting (429), server errors (5xx) and connection failures or
+    timeouts are retried up to ``max_attempts`` attempts in total. A
+    Retry-After header sent by the API overrides the computed backoff; if it
+    asks for a longer wait than ``max_retry_after`` the request is not retried.
+    """
+
+    def __init__(self,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 max_retry_after: float = DEFAULT_MAX_RETRY_AFTER):
+        """Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts per request, including the first
+            base_delay: Backoff ceiling in seconds for the first retry, doubled for each retry after
+            max_delay: Upper bound in seconds on the computed backoff
+            max_retry_after: Longest Retry-After in seconds that is honored
+        """
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def is_retryable(self, method: str, error: Exception) -> bool:
+        """Return whether a failed attempt may be retried at all."""
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+    def next_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """Return how long to wait before the next attempt.
+
+        Args:
+            attempt: Number of the attempt that just failed, starting at 1
+            error: The error raised by that attempt
+
+        Returns:
+            Delay in seconds, or None if the request should not be retried
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        if isinstance(error, httpx.HTTPStatusError):
+            headers = getattr(error.response, "headers", None) or {}
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
@@ -0,0 +1,144 @@
+"""
+Priority-aware scheduling of upstream Elfa API requests.
+"""
+
+import asyncio
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Mapping, Optional
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first."""
+    INTERACTIVE = 0  # MCP tool calls an agent is waiting on
+    PAGINATION = 1  # Pages fetched ahead of the consumer
+    BACKGROUND = 2  # Prefetching, stale refreshes, snapshots and quota checks
+
+
+# Per-class concurrency caps; each class is also bounded by the scheduler's total
+DEFAULT_PRIORITY_CONCURRENCY: Dict[Priority, int] = {
+    Priority.INTERACTIVE: 20,
+    Priority.PAGINATION: 4,
+    Priority.BACKGROUND: 2,
+}
+
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "elfa_request_priority", default=Priority.INTERACTIVE)
+
+
+def current_priority() -> Priority:
+    """Return the priority class of requests made from the current context."""
+    return _current_priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Make requests issued inside the block, and tasks started from it, use a priority class."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class RequestScheduler:
+    """Hand out upstream request slots by priority class.
+
+    Each class has its own concurrency cap, and all classes together are
+    bounded by ``max_concurrency`` (normally the connection pool size). When
+    a slot frees up it goes to the oldest waiter of the most urgent class
+    that still has room, so interactive calls overtake queued background
+    traffic while requests within a class are served in arrival order.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 20,
+                 limits: Optional[Mapping[Priority, int]] = None):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Total requests in flight across all classes
+            limits: Concurrency cap per class; defaults to DEFAULT_PRIORITY_CONCURRENCY
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        limits = dict(DEFAULT_PRIORITY_CONCURRENCY if limits is None else limits)
+        self.limits = {priority: max(limits.get(priority, self.max_concurrency), 1) for priority in Priority}
+        self._active: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._waiters: Dict[Priority, Deque["asyncio.Future[None]"]] = {priority: deque() for priority in Priority}
+
+    @property
+    def active(self) -> int:
+        """Return the number of requests holding a slot."""
+        return sum(self._active.values())
+
+    def _has_room(self, priority: Priority) -> bool:
+        return self.active < self.max_concurrency and self._active[priority] < self.limits[priority]
+
+    async def acquire(self, priority: Optional[Priority] = None) -> Priority:
+        """Wait for a request slot.
+
+        Args:
+            priority: Class of the request; defaults to the current context's
+
+        Returns:
+            The class the slot was taken for, to pass to ``release``
+        """
+        if priority is None:
+            priority = current_priority()
+
+        queue = self._waiters[priority]
+        if not queue and self._has_room(priority):
+            self._active[priority] += 1
+            return priority
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just as the caller went away
+                self.release(priority)
+            else:
+                queue.remove(waiter)
+            raise
+        return priority
+
+    def release(self, priority: Priority) -> None:
+        """Return a slot and hand it to the next eligible waiter."""
+        self._active[priority] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[Priority] = None) -> AsyncIterator[None]:
+        """Hold a request slot for the duration of the block."""
+        taken = await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(taken)
+
+    def _dispatch(self) -> None:
+        for priority in Priority:
+            queue = self._waiters[priority]
+            while queue and self._has_room(priority):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._active[priority] += 1
+                waiter.set_result(None)
+            if self.active >= self.max_concurrency:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Return in-flight and queued requests per class for monitoring."""
+        return {
+            priority.name.lower(): {
+                "active": self._active[priority],
+                "queued": len(self._waiters[priority]),
+                "limit": self.limits[priority],
+            }
+            for priority in Priority
+        }
@@ -2,39 +2,323 @@
 MCP server implementation for Elfa API.
 """
 
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import math
 import os
-import time
-from typing import Any, Dict, List, Optional
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
 
+import anyio
 from mcp.server.fastmcp import FastMCP
-
-from elfa_mcp.api_client import get_client
+from mcp.server.transport_security import TransportSecuritySettings
+from mcp.types import CallToolResult, TextContent
+
+from elfa_mcp.api_client import DEFAULT_QUOTA_REFRESH_INTERVAL, close_client, get_client
+from elfa_mcp.deadline import DeadlineExceeded, deadline
+from elfa_mcp.prefetch import DEFAULT_PREFETCH_INTERVAL, DEFAULT_PREFETCH_QUOTA_FRACTION, HotTickerPrefetcher
+from elfa_mcp.render import DEFAULT_MAX_CONTENT_CHARS, DEFAULT_MAX_OUTPUT_TOKENS, Renderer, truncate
+from elfa_mcp.trending import DEFAULT_MIN_MENTIONS_FLOOR, DEFAULT_REFRESH_INTERVAL, TrendingSnapshotEngine
 from elfa_mcp.utils import (
     format_date,
     format_engagement_stats,
     convert_timestamp_to_unix,
+    env_bool,
+    env_float,
+    env_int,
     validate_time_window
 )
 
+logger = logging.getLogger(__name__)
+
+# Wide keyword searches are split into sub-windows of at least this many
+# seconds, searched concurrently (see ElfaClient.search_mentions_sharded)
+DEFAULT_SEARCH_SHARD_SECONDS = 86400
+DEFAULT_SEARCH_MAX_SHARDS = 8
+
+# Batch tools fetch at most this many items concurrently
+DEFAULT_BATCH_CONCURRENCY = 5
+MAX_BATCH_TICKERS = 25
+MAX_BATCH_ACCOUNTS = 50
+
+# Transports selectable from the elfa-mcp entry point
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+DEFAULT_HOST = "127.0.0.1"
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+DEFAULT_PORT = 8000
+
 # Initialize FastMCP server
 mcp = FastMCP("elfa-api")
 
+# A tool returns readable text, or compact JSON as structured content
+ToolResult = Union[str, CallToolResult]
+
+# Serves get_trending_tokens from memory while the server runs, when
+# ELFA_TRENDING_WINDOWS is set
+trending_engine: Optional[TrendingSnapshotEngine] = None
+
+# Keeps the most requested top mentions cached while the server runs, when
+# ELFA_PREFETCH_TOP_N is set
+prefetcher: Optional[HotTickerPrefetcher] = None
+
+
+@asynccontextmanager
+async def server_resources() -> AsyncIterator[None]:
+    """Own the process-wide resources shared by every tool call.
+
+    The pooled API client lives for the whole process and is closed here,
+    inside the event loop, once the transport shuts down. Background tasks
+    such as the quota refresh, trending snapshots and hot-ticker prefetching
+    run for as long as the server does.
+    """
+    global trending_engine, prefetcher
+
+    tasks = []
+    try:
+        client = get_client()
+    except ValueError as e:
+        logger.warning("Background tasks disabled: %s", e)
+    else:
+        if client.rate_limiter is not None:
+            tasks.append(asyncio.create_task(client.run_quota_refresh()))
+
+        trending_windows = [w.strip() for w in os.environ.get("ELFA_TRENDING_WINDOWS", "").split(",") if w.strip()]
+        if trending_windows:
+            trending_engine = TrendingSnapshotEngine(
+                client,
+                [validate_time_window(w) for w in trending_windows],
+                interval=env_float("ELFA_TRENDING_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL),
+                min_mentions_floor=env_int("ELFA_TRENDING_MIN_MENTIONS", DEFAULT_MIN_MENTIONS_FLOOR)
+            )
+            tasks.append(asyncio.create_task(trending_engine.run()))
+
+        prefetch_top_n = env_int("ELFA_PREFETCH_TOP_N", 0)
+        if prefetch_top_n > 0:
+            prefetcher = HotTickerPrefetcher(
+                client,
+                top_n=prefetch_top_n,
+                interval=env_float("ELFA_PREFETCH_INTERVAL", DEFAULT_PREFETCH_INTERVAL),
+                quota_fraction=env_float("ELFA_PREFETCH_QUOTA_FRACTION", DEFAULT_PREFETCH_QUOTA_FRACTION)
+            )
+            tasks.append(asyncio.create_task(prefetcher.run()))
+
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        trending_engine = None
+        prefetcher = None
+        await close_client()
+
+
+def _transport_security(host: str) -> Optional[TransportSecuritySettings]:
+    """Return the Host and Origin checks for a server listening on ``host``.
+
+    FastMCP picks these when it is created, so a server built for the
+    default loopback address would turn away every client reaching it
+    under another name. This mirrors its choice for the address actually
+    used: a loopback server only accepts local Host and Origin headers,
+    while one listening on another address accepts any.
+
+    Args:
+        host: Address the network transports listen on
+
+    Returns:
+        DNS rebinding protection settings, or None to leave it off
+    """
+    if host not in LOOPBACK_HOSTS:
+        return None
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=["127.0.0.1:*", "localhost:*", "[::1]:*"],
+        allowed_origins=["http://127.0.0.1:*", "http://localhost:*", "http://[::1]:*"],
+    )
+
+
+async def serve(transport: str = "stdio", host: Optional[str] = None, port: Optional[int] = None) -> None:
+    """Run the MCP server with shared resources set up.
+
+    With a network transport one long-lived process serves every connected
+    MCP client, which all share its connection pool, caches and background
+    tasks.
+
+    Args:
+        transport: "stdio", "streamable-http" or "sse"
+        host: Address the network transports listen on
+        port: Port the network transports listen on
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {transport!r}; expected one of {', '.join(TRANSPORTS)}")
+    if host is not None:
+        mcp.settings.host = host
+        mcp.settings.transport_security = _transport_security(host)
+    if port is not None:
+        mcp.settings.port = port
+
+    async with server_resources():
+        if transport == "streamable-http":
+            logger.info("Serving MCP over streamable HTTP on %s:%d%s",
+                        mcp.settings.host, mcp.settings.port, mcp.settings.streamable_http_path)
+            await mcp.run_streamable_http_async()
+        elif transport == "sse":
+            logger.info("Serving MCP over SSE on %s:%d%s",
+                        mcp.settings.host, mcp.settings.port, mcp.settings.sse_path)
+            await mcp.run_sse_async()
+        else:
+            await mcp.run_stdio_async()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the MCP server.
+
+    The transport, host and port come from the command line, falling back
+    to ELFA_MCP_TRANSPORT, ELFA_MCP_HOST and ELFA_MCP_PORT.
+    """
+    parser = argparse.ArgumentParser(prog="elfa-mcp", description="MCP server for the Elfa API")
+    parser.add_argument("--transport", choices=TRANSPORTS,
+                        default=os.environ.get("ELFA_MCP_TRANSPORT", "stdio"),
+                        help="How MCP clients connect (default: stdio)")
+    parser.add_argument("--host", default=os.environ.get("ELFA_MCP_HOST", DEFAULT_HOST),
+                        help=f"Address for network transports to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=env_int("ELFA_MCP_PORT", DEFAULT_PORT),
+                        help=f"Port for network transports to listen on (default: {DEFAULT_PORT})")
+    args = parser.parse_args(argv)
 
-def main():
-    """Run the MCP server."""
     # Initialize and run the server
-    mcp.run(transport='stdio')
+    anyio.run(serve, args.transport, args.host, args.port)
+
+
+def _time_budgeted(tool: Callable[..., Awaitable[ToolResult]]) -> Callable[..., Awaitable[ToolResult]]:
+    """Run a tool within the limit given by its optional ``time_budget`` argument.
+
+    Upstream requests, retries and pagination started by the tool see the
+    deadline and stop short of it; anything still running when it passes is
+    cancelled, which releases its connections.
+    """
+    @functools.wraps(tool)
+    async def run(*args: Any, **kwargs: Any) -> ToolResult:
+        time_budget = kwargs.get("time_budget")
+        if time_budget is None:
+            return await tool(*args, **kwargs)
+
+        with deadline(time_budget):
+            try:
+                return await asyncio.wait_for(tool(*args, **kwargs), time_budget)
+            except asyncio.TimeoutError:
+                return f"Error: time budget of {time_budget}s exceeded"
+
+    return run
+
+
+def _structured(requested: Optional[bool]) -> bool:
+    """Return whether a tool call should answer with structured JSON.
+
+    Args:
+        requested: The call's ``structured`` argument; None uses ELFA_STRUCTURED_OUTPUT
+    """
+    if requested is not None:
+        return requested
+    return env_bool("ELFA_STRUCTURED_OUTPUT", False)
+
+
+def _json_result(data: Dict[str, Any]) -> CallToolResult:
+    """Return data as MCP structured content, with its compact JSON text for older clients."""
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return CallToolResult(content=[TextContent(type="text", text=text)], structuredContent=data)
+
 
+def _renderer(max_tokens: Optional[int], parts: int = 1) -> Renderer:
+    """Return a renderer for a call's output budget.
 
-@mcp.tool()
-async def get_api_key_info() -> str:
-    """Get information about your Elfa API key, including usage limits and remaining requests."""
+    Args:
+        max_tokens: The call's ``max_tokens`` argument; None uses ELFA_MAX_OUTPUT_TOKENS
+        parts: Number of sections sharing the budget equally
+    """
+    if max_tokens is None:
+        max_tokens = env_int("ELFA_MAX_OUTPUT_TOKENS", DEFAULT_MAX_OUTPUT_TOKENS)
+    return Renderer(max(max_tokens, 0) // max(parts, 1),
+                    env_int("ELFA_MAX_CONTENT_CHARS", DEFAULT_MAX_CONTENT_CHARS))
+
+
+def _compact(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the fields of a result that carry no value."""
+    return {name: value for name, value in data.items() if value is not None and value != {}}
+
+
+def _compact_mention(mention: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim a mention from any endpoint to the fields the text output shows, unformatted."""
+    account = mention.get("account") or mention.get("twitter_account_info") or {}
+    metrics = mention.get("metrics")
+    if metrics is None:
+        metrics = {
+            'like_count': mention.get('likeCount'),
+            'reply_count': mention.get('replyCount'),
+            'repost_count': mention.get('repostCount'),
+            'view_count': mention.get('viewCount')
+        }
+
+    return _compact({
+        "username": account.get("username"),
+        "content": mention.get("content"),
+        "type": mention.get("type"),
+        "mentioned_at": mention.get("mentioned_at") or mention.get("mentionedAt"),
+        "metrics": _compact(metrics),
+        "url": mention.get("originalUrl"),
+    })
+
+
+def _format_throttling(stats: Dict[str, Any]) -> str:
+    """Describe the client's local rate limiting and request queues."""
+    lines = ["Local Throttling:"]
+    limiter = stats.get("rate_limiter")
+    if limiter is None:
+        lines.append("- Rate limiter: disabled")
+    else:
+        rate = limiter["rate_per_second"]
+        pace = "unlimited" if rate is None else f"{rate * 86400:.0f} requests/day"
+        lines.append(f"- Rate limiter: {pace}, {limiter['queue_depth']} waiting")
+        lines.append(f"- Throttled: {limiter['throttled_requests']} of {limiter['total_requests']} requests, "
+                     f"waited {limiter['total_wait_seconds']}s in total (longest {limiter['max_wait_seconds']}s)")
+    for name, queue in stats.get("scheduler", {}).items():
+        lines.append(f"- {name.capitalize()} requests: {queue['active']} in flight "
+                     f"(limit {queue['limit']}), {queue['queued']} queued")
+    return "\n".join(lines) + "\n"
+
+
+@mcp.tool(structured_output=False)
+@_time_budgeted
+async def get_api_key_info(time_budget: Optional[float] = None, structured: Optional[bool] = None) -> ToolResult:
+    """
+    Get information about your Elfa API key, including usage limits and remaining requests.
+
+    Args:
+        time_budget: Overall time limit in seconds for this call (optional)
+        structured: Return compact JSON instead of text (optional)
+    """
     try:
         client = get_client()
-        response = await client.get_api_key_status()
+        # Usage since the last check is accounted for locally, so a recent
+        # status is as good as a fresh one and costs no request
+        response = await client.get_api_key_status(
+            max_age=env_float("ELFA_KEY_STATUS_MAX_AGE", DEFAULT_QUOTA_REFRESH_INTERVAL))
 
         if response["success"]:
             data = response["data"]
+            throttling = client.throttling_stats()
+
+            if _structured(structured):
+                info = {
+                    name: data.get(name) for name in (
+                        "name", "status", "createdAt", "expiresAt", "usage",
+                        "monthlyRequestLimit", "dailyRequestLimit", "remainingRequests")
+                }
+                info["throttling"] = throttling
+                return _json_result(_compact(info))
 
             return f"""
 API Key Information:
@@ -51,7 +335,8 @@ Usage:
 Remaining Requests:
 - Monthly: {data.get('remainingRequests', {}).get('monthly', 'N/A')}
 - Daily: {data.get('remainingRequests', {}).get('daily', 'N/A')}
-"""
+
+{_format_throttling(throttling)}"""
         else:
             return "Failed to retrieve API key information."
 
@@ -59,14 +344,24 @@ Remaining Requests:
         return f"Error retrieving API key information: {str(e)}"
 
 
-@mcp.tool()
-async def get_smart_engagement_mentions(limit: int = 100, offset: int = 0) -> str:
+@mcp.tool(structured_output=False)
+@_time_budgeted
+async def get_smart_engagement_mentions(
+    limit: int = 100,
+    offset: int = 0,
+    time_budget: Optional[float] = None,
+    structured: Optional[bool] = None,
+    max_tokens: Optional[int] = None
+) -> ToolResult:
     """
     Get tweets by smart accounts with significant engagement.
 
     Args:
         limit: Number of results to return (max 100)
         offset: Pagination offset
+        time_budget: Overall time limit in seconds for this call (optional)
+        structured: Return compact JSON instead of text (optional)
+        max_tokens: Approximate limit on the length of the text output (optional)
     """
     try:
         client = get_client()
@@ -78,16 +373,17 @@ async def get_smart_engagement_mentions(limit: int = 100, offset: int = 0) -> st
         mentions = response["data"]
         metadata = response["metadata"]
 
-        result = f"Found {metadata['total']} mentions (showing {limit} from offset {offset}):\n\n"
+        if _structured(structured):
+            return _json_result({
+                "total": metadata.get("total"),
+                "offset": offset,
+                "mentions": [_compact_mention(mention) for mention in mentions]
+            })
 
-        for idx, mention in enumerate(mentions, 1):
+        def render_mention(idx: int, mention: Dict[str, Any], content_limit: Optional[int]) -> str:
             account = mention.get("account", {})
             username = account.get("username", "Unknown")
 
-            result += f"{idx}. @{username}: {mention.get('content', 'No content')}\n"
-            result += f"   Type: {mention.get('type', 'N/A')} | "
-            result += f"Posted: {format_date(mention.get('mentionedAt', 'N/A'))}\n"
-
             metrics = {
                 'like_count': mention.get('likeCount', 0),
                 'reply_count': mention.get('replyCount', 0),
@@ -95,23 +391,78 @@ async def get_smart_engagement_mentions(limit: int = 100, offset: int = 0) -> st
                 'view_count': mention.get('viewCount', 0)
             }
 
-            result += f"   {format_engagement_stats(metrics)}\n"
-            result += f"   URL: {mention.get('originalUrl', 'N/A')}\n\n"
+            return (f"{idx}. @{username}: {truncate(mention.get('content') or 'No content', content_limit)}\n"
+                    f"   Type: {mention.get('type', 'N/A')} | "
+                    f"Posted: {format_date(mention.get('mentionedAt', 'N/A'))}\n"
+                    f"   {format_engagement_stats(metrics)}\n"
+                    f"   URL: {mention.get('originalUrl', 'N/A')}\n\n")
 
-        return result
+        renderer = _renderer(max_tokens)
+        renderer.text(f"Found {metadata['total']} mentions (showing {limit} from offset {offset}):\n\n")
+        renderer.items(mentions, render_mention, "mentions")
+
+        return renderer.render()
 
     except Exception as e:
         return f"Error retrieving mentions: {str(e)}"
 
 
-@mcp.tool()
+def _render_top_mention(idx: int, mention: Dict[str, Any], content_limit: Optional[int]) -> str:
+    """Render one mention from a /v1/top-mentions response."""
+    return (f"{idx}. {truncate(mention.get('content') or 'No content', content_limit)}\n"
+            f"   Posted: {format_date(mention.get('mentioned_at', 'N/A'))}\n"
+            f"   {format_engagement_stats(mention.get('metrics', {}))}\n\n")
+
+
+def _format_top_mentions(ticker: str,
+                         time_window: str,
+                         page: int,
+                         response: Dict[str, Any],
+                         renderer: Renderer) -> str:
+    """Render a /v1/top-mentions response for one ticker."""
+    if not response["success"]:
+        return f"Failed to retrieve top mentions for {ticker}."
+
+    data = response["data"]
+    mentions = data.get("data", [])
+
+    total_pages = (data['total'] // data['pageSize']) + 1
+    renderer.text(f"Top mentions for {ticker} (time window: {time_window}, page {page}/{total_pages}):\n\n")
+    renderer.items(mentions, _render_top_mention, "mentions")
+
+    if not mentions:
+        renderer.text(f"No mentions found for {ticker} in the {time_window} time window.")
+
+    return renderer.render()
+
+
+def _top_mentions_json(ticker: str, time_window: str, page: int, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim a /v1/top-mentions response for one ticker to compact JSON."""
+    if not response["success"]:
+        return {"ticker": ticker, "error": f"Failed to retrieve top mentions for {ticker}."}
+
+    data = response["data"]
+    return {
+        "ticker": ticker,
+        "time_window": time_window,
+        "page": page,
+        "total_pages": (data['total'] // data['pageSize']) + 1,
+        "mentions": [_compact_mention(mention) for mention in data.get("data", [])]
+    }
+
+
+@mcp.tool(structured_output=False)
+@_time_budgeted
 async def get_top_ticker_mentions(
     ticker: str,
     time_window: str = "1h",
     page: int = 1,
     page_size: int = 10,
-    include_account_details: bool = False
-) -> str:
+    include_account_details: bool = False,
+    time_budget: Optional[float] = None,
+    structured: Optional[bool] = None,
+    max_tokens: Optional[int] = None
+) -> ToolResult:
     """
     Get the most significant mentions for a ticker symbol, ranked by relevance.
 
@@ -121,11 +472,17 @@ async def get_top_ticker_mentions(
         page: Page number for pagination
         page_size: Number of items per page (max 50)
         include_account_details: Whether to include account details
+        time_budget: Overall time limit in seconds for this call (optional)
+        structured: Return compact JSON instead of text (optional)
+        max_tokens: Approximate limit on the length of the text output (optional)
     """
     try:
         # Validate time window
         validated_time_window = validate_time_window(time_window)
 
+        if prefetcher is not None:
+            prefetcher.record(ticker, validated_time_window, page, page_size, include_account_details)
+
         client = get_client()
         response = await client.get_top_mentions(
             ticker=ticker,
@@ -135,40 +492,106 @@ async def get_top_ticker_mentions(
             include_account_details=include_account_details
         )
 
-        if not response["success"]:
-            return f"Failed to retrieve top mentions for {ticker}."
+        if _structured(structured):
+            top_mentions = _top_mentions_json(ticker, validated_time_window, page, response)
+            if "error" in top_mentions:
+                return top_mentions["error"]
+            return _json_result(top_mentions)
+        return _format_top_mentions(ticker, validated_time_window, page, response, _renderer(max_tokens))
 
-        data = response["data"]
-        mentions = data.get("data", [])
+    except Exception as e:
+        return f"Error retrieving top mentions: {str(e)}"
 
-        total_pages = (data['total'] // data['pageSize']) + 1
-        result = f"Top mentions for {ticker} (time window: {validated_time_window}, page {page}/{total_pages}):\n\n"
 
-        for idx, mention in enumerate(mentions, 1):
-            metrics = mention.get("metrics", {})
+@mcp.tool(structured_output=False)
+@_time_budgeted
+async def get_top_mentions_for_tickers(
+    tickers: List[str],
+    time_window: str = "1h",
+    page_size: int = 5,
+    include_account_details: bool = False,
+    time_budget: Optional[float] = None,
+    structured: Optional[bool] = None,
+    max_tokens: Optional[int] = None
+) -> ToolResult:
+    """
+    Get the most significant mentions for several ticker symbols in one call.
+
+    Args:
+        tickers: Ticker symbols to look up (e.g., ["BTC", "ETH", "SOL"]), at most 25
+        time_window: Time window for mentions (e.g., "1h", "24h", "7d")
+        page_size: Number of mentions per ticker (max 50)
+        include_account_details: Whether to include account details
+        time_budget: Overall time limit in seconds for this call (optional)
+        structured: Return compact JSON instead of text (optional)
+        max_tokens: Approximate limit on the length of the text output, shared
+            equally between the tickers (optional)
+    """
+    try:
+        validated_time_window = validate_time_window(time_window)
+        as_json = _structured(structured)
 
-            result += f"{idx}. {mention.get('content', 'No content')}\n"
-            result += f"   Posted: {format_date(mention.get('mentioned_at', 'N/A'))}\n"
-            result += f"   {format_engagement_stats(metrics)}\n\n"
+        # Keep the first occurrence of each ticker, in the order given
+        tickers = list(dict.fromkeys(t.strip() for t in tickers if t and t.strip()))
+        if not tickers:
+            return "No tickers provided."
+        if len(tickers) > MAX_BATCH_TICKERS:
+            return f"Too many tickers: {len(tickers)} given, at most {MAX_BATCH_TICKERS} allowed."
 
-        if not mentions:
-            result += f"No mentions found for {ticker} in the {validated_time_window} time window."
+        if prefetcher is not None:
+            for ticker in tickers:
+                prefetcher.record(ticker, validated_time_window, 1, page_size, include_account_details)
 
-        return result
+        client = get_client()
+        semaphore = asyncio.Semaphore(max(env_int("ELFA_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY), 1))
+
+        async def fetch_section(ticker: str) -> Union[str, Dict[str, Any]]:
+            try:
+                async with semaphore:
+                    response = await client.get_top_mentions(
+                        ticker=ticker,
+                        time_window=validated_time_window,
+                        page=1,
+                        page_size=page_size,
+                        include_account_details=include_account_details
+                    )
+                if as_json:
+                    return _top_mentions_json(ticker, validated_time_window, 1, response)
+                return _format_top_mentions(
+                    ticker, validated_time_window, 1, response, _renderer(max_tokens, len(tickers)))
+            except Exception as e:
+                message = f"Error retrieving top mentions for {ticker}: {str(e)}"
+                return {"ticker": ticker, "error": message} if as_json else message
+
+        sections = await asyncio.gather(*(fetch_section(ticker) for ticker in tickers))
+
+        if as_json:
+            return _json_result({"time_window": validated_time_window, "results": sections})
+
+        parts = [f"Top mentions for {len(tickers)} tickers (time window: {validated_time_window}):\n\n"]
+        for ticker, section in zip(tickers, sections):
+            parts.append(f"=== {ticker} ===\n{section.rstrip()}\n\n")
+
+        return "".join(parts)
 
     except Exception as e:
         return f"Error retrieving top mentions: {str(e)}"
 
 
-@mcp.tool()
+@mcp.tool(structured_output=False)
+@_time_budgeted
 async def search_keyword_mentions(
     keywords: str,
     from_time: str,
     to_time: str,
     limit: int = 20,
     search_type: str = "and",
-    cursor: str = None
-) -> str:
+    cursor: str = None,
+    max_results: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    structured: Optional[bool] = None,
+    max_tokens: Optional[int] = None
+) -> ToolResult:
     """
     Search for mentions containing specific keywords within a time range.
 
@@ -179,66 +602,134 @@ async def search_keyword_mentions(
         limit: Number of results to return (max 30)
         search_type: Type of search ("and" or "or")
         cursor: Cursor for pagination (optional)
+        max_results: Collect up to this many mentions by following the pagination
+            cursor automatically, fetching `limit` per page (optional). Ranges
+            wider than a day are split into sub-windows searched in parallel.
+        time_budget: Overall time limit in seconds for this call (optional)
+        structured: Return compact JSON instead of text (optional)
+        max_tokens: Approximate limit on the length of the text output (optional)
     """
     try:
-        # Convert time strings to unix timestamps
-        from_timestamp = convert_timestamp_to_unix(
-            from_time) if from_time != "now" else int(time.time())
-        to_timestamp = convert_timestamp_to_unix(
-            to_time) if to_time != "now" else int(time.time())
+        # Convert time strings to unix timestamps, optionally aligned to
+        # time buckets so repeated relative queries hit the same cache entries
+        bucket_seconds = env_int("ELFA_TIME_BUCKET_SECONDS", 0)
+        from_timestamp = convert_timestamp_to_unix(from_time, bucket_seconds)
+        to_timestamp = convert_timestamp_to_unix(to_time, bucket_seconds)
 
         client = get_client()
-        response = await client.search_mentions(
-            keywords=keywords,
-            from_time=from_timestamp,
-            to_time=to_timestamp,
-            limit=limit,
-            search_type=search_type,
-            cursor=cursor
-        )
 
-        if not response["success"]:
-            return f"Failed to search mentions for keywords: {keywords}."
+        stopped_early = False
+        shards = 1
+        if max_results and not cursor:
+            shard_seconds = max(env_int("ELFA_SEARCH_SHARD_SECONDS", DEFAULT_SEARCH_SHARD_SECONDS), 1)
+            shards = min(env_int("ELFA_SEARCH_MAX_SHARDS", DEFAULT_SEARCH_MAX_SHARDS),
+                         math.ceil((to_timestamp - from_timestamp) / shard_seconds))
+
+        if max_results and shards > 1:
+            mentions, stopped_early = await client.search_mentions_sharded(
+                keywords=keywords,
+                from_time=from_timestamp,
+                to_time=to_timestamp,
+                shards=shards,
+                max_results=max_results,
+                limit=limit,
+                search_type=search_type
+            )
+
+            total = len(mentions)
+            next_cursor = ""
+        elif max_results:
+            mentions = []
+            async with aclosing(client.iter_search_mentions(
+                keywords=keywords,
+                from_time=from_timestamp,
+                to_time=to_timestamp,
+                limit=limit,
+                search_type=search_type,
+                cursor=cursor
+            )) as pages:
+                try:
+                    async for mention in pages:
+                        mentions.append(mention)
+                        if len(mentions) >= max_results:
+                            break
+                except DeadlineExceeded:
+                    # Return what was collected within the time budget
+                    stopped_early = True
+
+            total = len(mentions)
+            next_cursor = ""
+        else:
+            response = await client.search_mentions(
+                keywords=keywords,
+                from_time=from_timestamp,
+                to_time=to_timestamp,
+                limit=limit,
+                search_type=search_type,
+                cursor=cursor
+            )
+
+            if not response["success"]:
+                return f"Failed to search mentions for keywords: {keywords}."
+
+            mentions = response["data"]
+            metadata = response["metadata"]
+            total = metadata.get("total", 0)
+            next_cursor = metadata.get("cursor", "")
+
+        if _structured(structured):
+            return _json_result(_compact({
+                "keywords": keywords,
+                "from_time": from_timestamp,
+                "to_time": to_timestamp,
+                "total": total,
+                "next_cursor": next_cursor or None,
+                "stopped_early": stopped_early or None,
+                "mentions": [_compact_mention(mention) for mention in mentions]
+            }))
+
+        def render_mention(idx: int, mention: Dict[str, Any], content_limit: Optional[int]) -> str:
+            account_info = mention.get("twitter_account_info", {})
+            username = account_info.get("username", "Unknown")
 
-        mentions = response["data"]
-        metadata = response["metadata"]
-        total = metadata.get("total", 0)
-        next_cursor = metadata.get("cursor", "")
+            return (f"{idx}. @{username}: {truncate(mention.get('content') or 'No content', content_limit)}\n"
+                    f"   Type: {mention.get('type', 'N/A')} | "
+                    f"Posted: {format_date(mention.get('mentioned_at', 'N/A'))}\n"
+                    f"   {format_engagement_stats(mention.get('metrics', {}))}\n\n")
 
-        result = f"Found {total} mentions for keywords: {keywords}\n"
-        result += f"Search period: {from_time} to {to_time}\n"
+        renderer = _renderer(max_tokens)
+        renderer.text(f"Found {total} mentions for keywords: {keywords}\n")
+        renderer.text(f"Search period: {from_time} to {to_time}\n")
 
         if next_cursor:
-            result += f"Next cursor for pagination: {next_cursor}\n"
+            renderer.text(f"Next cursor for pagination: {next_cursor}\n")
 
-        result += "\n"
-
-        for idx, mention in enumerate(mentions, 1):
-            metrics = mention.get("metrics", {})
-            account_info = mention.get("twitter_account_info", {})
-            username = account_info.get("username", "Unknown")
+        if stopped_early:
+            renderer.text("Stopped early: the time budget ran out before max_results was reached\n")
 
-            result += f"{idx}. @{username}: {mention.get('content', 'No content')}\n"
-            result += f"   Type: {mention.get('type', 'N/A')} | "
-            result += f"Posted: {format_date(mention.get('mentioned_at', 'N/A'))}\n"
-            result += f"   {format_engagement_stats(metrics)}\n\n"
+        renderer.text("\n")
+        renderer.items(mentions, render_mention, "mentions")
 
         if not mentions:
-            result += "No mentions found matching your search criteria."
+            renderer.text("No mentions found matching your search criteria.")
 
-        return result
+        return renderer.render()
 
     except Exception as e:
         return f"Error searching mentions: {str(e)}"
 
 
-@mcp.tool()
+@mcp.tool(structured_output=False)
+@_time_budgeted
 async def get_trending_tokens(
     time_window: str = "24h",
     page: int = 1,
     page_size: int = 20,
-    min_mentions: int = 5
-) -> str:
+    min_mentions: int = 5,
+    time_budget: Optional[float] = None,
+    structured: Optional[bool] = None,
+    max_tokens: Optional[int] = None
+) -> ToolResult:
     """
     Get trending tokens based on mention count over a specified time period.
 
@@ -247,18 +738,31 @@ async def get_trending_tokens(
         page: Page number for pagination
         page_size: Number of items per page (max 50)
         min_mentions: Minimum number of mentions required
+        time_budget: Overall time limit in seconds for this call (optional)
+        structured: Return compact JSON instead of text (optional)
+        max_tokens: Approximate limit on the length of the text output (optional)
     """
     try:
         # Validate time window
         validated_time_window = validate_time_window(time_window)
 
-        client = get_client()
-        response = await client.get_trending_tokens(
-            time_window=validated_time_window,
-            page=page,
-            page_size=page_size,
-            min_mentions=min_mentions
-        )
+        response = None
+        if trending_engine is not None:
+            response = trending_engine.get_page(
+                time_window=validated_time_window,
+                page=page,
+                page_size=page_size,
+                min_mentions=min_mentions
+            )
+
+        if response is None:
+            client = get_client()
+            response = await client.get_trending_tokens(
+                time_window=validated_time_window,
+                page=page,
+                page_size=page_size,
+                min_mentions=min_mentions
+            )
 
         if not response["success"]:
             return "Failed to retrieve trending tokens."
@@ -267,30 +771,80 @@ async def get_trending_tokens(
         tokens = data.get("data", [])
 
         total_pages = (data['total'] // data['pageSize']) + 1
-        result = f"Trending tokens (time window: {validated_time_window}, page {page}/{total_pages}):\n\n"
 
-        for idx, token in enumerate(tokens, 1):
-            result += f"{idx}. {token.get('token', 'Unknown')}\n"
-            result += f"   Current mentions: {token.get('current_count', 0)}\n"
-            result += f"   Previous mentions: {token.get('previous_count', 0)}\n"
-            result += f"   Change: {token.get('change_percent', 0):.2f}%\n\n"
+        if _structured(structured):
+            return _json_result({
+                "time_window": validated_time_window,
+                "page": page,
+                "total_pages": total_pages,
+                "tokens": [_compact({
+                    name: token.get(name)
+                    for name in ("token", "current_count", "previous_count", "change_percent")
+                }) for token in tokens]
+            })
+
+        def render_token(idx: int, token: Dict[str, Any], content_limit: Optional[int]) -> str:
+            return (f"{idx}. {token.get('token', 'Unknown')}\n"
+                    f"   Current mentions: {token.get('current_count', 0)}\n"
+                    f"   Previous mentions: {token.get('previous_count', 0)}\n"
+                    f"   Change: {token.get('change_percent', 0):.2f}%\n\n")
+
+        renderer = _renderer(max_tokens)
+        renderer.text(f"Trending tokens (time window: {validated_time_window}, page {page}/{total_pages}):\n\n")
+        renderer.items(tokens, render_token, "tokens")
 
         if not tokens:
-            result += f"No trending tokens found in the {validated_time_window} time window with at least {min_mentions} mentions."
+            renderer.text(f"No trending tokens found in the {validated_time_window} time window with at least {min_mentions} mentions.")
 
-        return result
+        return renderer.render()
 
     except Exception as e:
         return f"Error retrieving trending tokens: {str(e)}"
 
 
-@mcp.tool()
-async def get_account_stats(username: str) -> str:
+def _format_account_stats(username: str, response: Dict[str, Any]) -> str:
+    """Render a /v1/account/smart-stats response for one account."""
+    if not response["success"]:
+        return f"Failed to retrieve account stats for @{username}."
+
+    data = response["data"]
+
+    result = f"Smart stats for @{username}:\n\n"
+    result += f"Smart Following Count: {data.get('smartFollowingCount', 'N/A')}\n"
+    result += f"Average Engagement: {data.get('averageEngagement', 'N/A')}\n"
+    result += f"Follower Engagement Ratio: {data.get('followerEngagementRatio', 'N/A')}\n"
+
+    return result
+
+
+def _account_stats_json(username: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim a /v1/account/smart-stats response for one account to compact JSON."""
+    if not response["success"]:
+        return {"username": username, "error": f"Failed to retrieve account stats for @{username}."}
+
+    data = response["data"]
+    return _compact({
+        "username": username,
+        "smartFollowingCount": data.get("smartFollowingCount"),
+        "averageEngagement": data.get("averageEngagement"),
+        "followerEngagementRatio": data.get("followerEngagementRatio")
+    })
+
+
+@mcp.tool(structured_output=False)
+@_time_budgeted
+async def get_account_stats(
+    username: str,
+    time_budget: Optional[float] = None,
+    structured: Optional[bool] = None
+) -> ToolResult:
     """
     Get smart stats and social metrics for a Twitter account.
 
     Args:
         username: Twitter username (without @)
+        time_budget: Overall time limit in seconds for this call (optional)
+        structured: Return compact JSON instead of text (optional)
     """
     try:
         # Remove @ if present
@@ -299,21 +853,67 @@ async def get_account_stats(username: str) -> str:
         client = get_client()
         response = await client.get_account_smart_stats(username=username)
 
-        if not response["success"]:
-            return f"Failed to retrieve account stats for @{username}."
+        if _structured(structured):
+            stats = _account_stats_json(username, response)
+            return stats["error"] if "error" in stats else _json_result(stats)
+        return _format_account_stats(username, response)
 
-        data = response["data"]
+    except Exception as e:
+        if getattr(e, "status_code", None) == 404:
+            return f"Account @{username} not found."
+        return f"Error retrieving account stats: {str(e)}"
+
+
+@mcp.tool(structured_output=False)
+@_time_budgeted
+async def get_account_stats_batch(
+    usernames: List[str],
+    time_budget: Optional[float] = None,
+    structured: Optional[bool] = None
+) -> ToolResult:
+    """
+    Get smart stats and social metrics for several Twitter accounts in one call.
+
+    Args:
+        usernames: Twitter usernames (with or without @), at most 50
+        time_budget: Overall time limit in seconds for this call (optional)
+        structured: Return compact JSON instead of text (optional)
+    """
+    try:
+        as_json = _structured(structured)
+
+        # Normalize like get_account_stats and keep the first occurrence of each
+        usernames = list(dict.fromkeys(u.strip().lstrip('@') for u in usernames if u and u.strip().lstrip('@')))
+        if not usernames:
+            return "No usernames provided."
+        if len(usernames) > MAX_BATCH_ACCOUNTS:
+            return f"Too many usernames: {len(usernames)} given, at most {MAX_BATCH_ACCOUNTS} allowed."
+
+        client = get_client()
+        semaphore = asyncio.Semaphore(max(env_int("ELFA_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY), 1))
+
+        async def fetch_section(username: str) -> Union[str, Dict[str, Any]]:
+            try:
+                async with semaphore:
+                    response = await client.get_account_smart_stats(username=username)
+                if as_json:
+                    return _account_stats_json(username, response)
+                return _format_account_stats(username, response)
+            except Exception as e:
+                if getattr(e, "status_code", None) == 404:
+                    message = f"Account @{username} not found."
+                else:
+                    message = f"Error retrieving account stats for @{username}: {str(e)}"
+                return {"username": username, "error": message} if as_json else message + "\n"
 
-        result = f"Smart stats for @{username}:\n\n"
-        result += f"Smart Following Count: {data.get('smartFollowingCount', 'N/A')}\n"
-        result += f"Average Engagement: {data.get('averageEngagement', 'N/A')}\n"
-        result += f"Follower Engagement Ratio: {data.get('followerEngagementRatio', 'N/A')}\n"
+        sections = await asyncio.gather(*(fetch_section(username) for username in usernames))
 
-        return result
+        if as_json:
+            return _json_result({"accounts": sections})
+
+        return "\n".join(sections)
 
     except Exception as e:
-        if "404" in str(e):
-            return f"Account @{username} not found."
         return f"Error retrieving account stats: {str(e)}"
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""
+Response cache shared between elfa-mcp processes on one host.
+"""
+
+import os
+import time
+import uuid
+from typing import Any, NamedTuple, Optional
+
+from elfa_mcp.cache import NOT_FOUND
+from elfa_mcp.store import SQLiteStore
+
+DEFAULT_LEASE_TIMEOUT = 15.0  # seconds
+DEFAULT_POLL_INTERVAL = 0.05  # seconds
+
+_RESPONSE_PREFIX = "response:"
+_LEASE_PREFIX = "lease:"
+
+
+class SharedEntry(NamedTuple):
+    """A response found in the shared cache and the seconds it stays fresh and servable."""
+    value: Any
+    fresh_for: float
+    stale_for: float
+
+    @property
+    def fresh(self) -> bool:
+        return self.fresh_for > 0
+
+
+class SharedCache:
+    """Response cache and request leases kept in a SQLite file shared by several processes.
+
+    Every process caching responses here sees what the others fetched, so
+    one worker refreshing trending tokens or top mentions saves the rest a
+    request. A process about to fetch a response takes a lease on its key;
+    the others wait for the response to show up instead of fetching it too.
+    A lease lapses after ``lease_timeout`` seconds, so a process that dies
+    mid-request only holds the others up that long.
+
+    Expiry times are wall-clock times, as processes share no monotonic
+    clock. All methods block; call them through ``asyncio.to_thread`` from
+    async code.
+    """
+
+    def __init__(self,
+                 store: SQLiteStore,
+                 lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """Initialize the cache.
+
+        Args:
+            store: SQLite store shared with the other processes
+            lease_timeout: Seconds after which an unreleased lease lapses
+            poll_interval: Seconds between checks while waiting on another
+                process's lease
+        """
+        self.store = store
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+
+    def lookup(self, key: str) -> Optional[SharedEntry]:
+        """Return the response stored for a cache key, or None if there is none."""
+        stored = self.store.get(_RESPONSE_PREFIX + key)
+        if not isinstance(stored, dict):
+            return None
+
+        now = time.time()
+        value = NOT_FOUND if stored.get("not_found") else stored.get("value")
+        return SharedEntry(value, stored["expires_at"] - now, stored["stale_until"] - now)
+
+    def set(self, key: str, value: Any, ttl: float, max_stale_age: float = 0.0) -> None:
+        """Store a response for the other processes.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable response, or NOT_FOUND for a 404 answer
+            ttl: Seconds the response is fresh
+            max_stale_age: Seconds after storing up to which the response
+                may still be served stale; values below ``ttl`` are ignored
+        """
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        stale_for = max(ttl, max_stale_age)
+        stored = {"expires_at": now + ttl, "stale_until": now + stale_for}
+        if value is NOT_FOUND:
+            stored["not_found"] = True
+        else:
+            stored["value"] = value
+        self.store.set(_RESPONSE_PREFIX + key, stored, stale_for)
+
+    def acquire_lease(self, key: str) -> bool:
+        """Claim the right to fetch a key, unless another process holds it."""
+        return self.store.add(_LEASE_PREFIX + key, self.owner, self.lease_timeout)
+
+    def release_lease(self, key: str) -> None:
+        """Give up a lease taken by this process."""
+        self.store.compare_and_delete(_LEASE_PREFIX + key, self.owner)
+
+    def close(self) -> None:
+        """Close the underlying store."""
+        self.store.close()
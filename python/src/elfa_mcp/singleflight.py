@@ -0,0 +1,60 @@
+"""
+Coalescing of identical concurrent requests.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    """A shared in-flight call and the number of callers awaiting it."""
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its result.
+
+    Callers that arrive while a call for the same key is in flight await that
+    call instead of starting their own. A caller being cancelled does not
+    affect the others; the shared call is only cancelled once every caller
+    awaiting it has gone away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+
+    def __len__(self) -> int:
+        """Return the number of calls currently in flight."""
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` for ``key``, or join the call already in flight for it.
+
+        Args:
+            key: Identity of the call, e.g. a cache key
+            fn: Coroutine function producing the result
+
+        Returns:
+            The result of the shared call; its exception is raised to every caller
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,164 @@
+"""
+Persistent on-disk store for Elfa API responses.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+BUSY_TIMEOUT_MS = 5000
+
+
+class SQLiteStore:
+    """Size-bounded key/value store backed by a SQLite database file.
+
+    Values are stored as JSON. The database runs in WAL mode with a busy
+    timeout, so several ``elfa-mcp`` processes can share one file. When the
+    stored values grow past ``max_bytes`` the least recently read entries are
+    evicted.
+
+    All methods block; call them through ``asyncio.to_thread`` from async code.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Open (and create if needed) the store.
+
+        Args:
+            path: Path of the SQLite database file
+            max_bytes: Total size of stored values above which entries are evicted
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value for a key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting old entries if the store grows too large.
+
+        Args:
+            key: Entry key
+            value: JSON-serializable value
+            ttl: Seconds until the entry expires; None keeps it until evicted
+        """
+        encoded = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), expires_at, now))
+            self._evict()
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key holds none, or only an expired one.
+
+        The check and the write are one statement, so across processes
+        exactly one caller adding a key wins.
+
+        Returns:
+            Whether the value was stored
+        """
+        encoded = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size,"
+                " expires_at = excluded.expires_at, accessed_at = excluded.accessed_at "
+                "WHERE entries.expires_at IS NOT NULL AND entries.expires_at <= ?",
+                (key, encoded, len(encoded), expires_at, now, now))
+            return cursor.rowcount > 0
+
+    def compare_and_delete(self, key: str, value: Any) -> bool:
+        """Remove an entry only if it still holds the given value.
+
+        Returns:
+            Whether the entry was removed
+        """
+        encoded = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM entries WHERE key = ? AND value = ?", (key, encoded))
+            return cursor.rowcount > 0
+
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def size(self) -> int:
+        """Return the total size in bytes of the stored values."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently read ones, until under the size limit."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+            # Evict down to 90% of the limit so every write does not trigger eviction
+            target = self.max_bytes * 0.9
+            stale = []
+            for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+                if total <= target:
+                    break
+                stale.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
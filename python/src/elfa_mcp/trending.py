@@ -0,0 +1,144 @@
+"""
+Background snapshots of trending tokens.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from elfa_mcp.scheduler import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_INTERVAL = 300.0  # seconds
+DEFAULT_MIN_MENTIONS_FLOOR = 1
+SNAPSHOT_PAGE_SIZE = 50
+MAX_SNAPSHOT_PAGES = 20
+MAX_SNAPSHOT_TOKENS = SNAPSHOT_PAGE_SIZE * MAX_SNAPSHOT_PAGES
+
+
+class Snapshot(NamedTuple):
+    """All trending tokens for one time window, sorted for serving.
+
+    ``complete`` is False when the poll stopped at MAX_SNAPSHOT_PAGES before
+    fetching every token; such a snapshot is not served.
+    """
+    tokens: List[Dict[str, Any]]
+    fetched_at: float
+    complete: bool = True
+
+
+class TrendingSnapshotEngine:
+    """Keep in-memory snapshots of /v1/trending-tokens for a set of time windows.
+
+    A background task polls every configured time window on a fixed interval,
+    fetching all pages with a low ``min_mentions`` floor. Tokens are sorted by
+    ``change_percent`` and then ``current_count``, both descending, so any
+    page, page size or higher ``min_mentions`` filter can be served from the
+    snapshot without calling the API.
+    """
+
+    def __init__(self,
+                 client: Any,
+                 time_windows: Iterable[str],
+                 interval: float = DEFAULT_REFRESH_INTERVAL,
+                 min_mentions_floor: int = DEFAULT_MIN_MENTIONS_FLOOR,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the engine.
+
+        Args:
+            client: ElfaClient used to poll the API
+            time_windows: Time windows to keep snapshots for (e.g. ["24h", "7d"])
+            interval: Seconds between polls
+            min_mentions_floor: ``min_mentions`` used when polling; lower
+                filters cannot be served from the snapshot
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.client = client
+        self.time_windows = list(dict.fromkeys(time_windows))
+        self.interval = interval
+        self.min_mentions_floor = min_mentions_floor
+        self._clock = clock
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._truncated: Set[str] = set()
+
+    async def refresh(self, time_window: str) -> None:
+        """Fetch every page of trending tokens for a time window and replace its snapshot.
+
+        A window whose first page reports more tokens than a snapshot can
+        hold is not paged through, as the snapshot could not be served.
+        """
+        tokens: List[Dict[str, Any]] = []
+        complete = False
+        for page in range(1, MAX_SNAPSHOT_PAGES + 1):
+            response = await self.client.get_trending_tokens(
+                time_window=time_window,
+                page=page,
+                page_size=SNAPSHOT_PAGE_SIZE,
+                min_mentions=self.min_mentions_floor,
+                refresh=True
+            )
+            if not response.get("success"):
+                raise Exception(f"Failed to retrieve trending tokens for {time_window}")
+
+            data = response["data"]
+            page_tokens = data.get("data", [])
+            tokens.extend(page_tokens)
+            if len(page_tokens) < SNAPSHOT_PAGE_SIZE or len(tokens) >= data.get("total", 0):
+                complete = True
+                break
+            if data.get("total", 0) > MAX_SNAPSHOT_TOKENS:
+                break
+
+        if complete:
+            self._truncated.discard(time_window)
+        elif time_window not in self._truncated:
+            self._truncated.add(time_window)
+            logger.warning("Trending tokens for %s exceed %d; serving them from the API instead "
+                           "(raise ELFA_TRENDING_MIN_MENTIONS to snapshot fewer)",
+                           time_window, MAX_SNAPSHOT_TOKENS)
+        tokens.sort(key=lambda t: (t.get("change_percent", 0), t.get("current_count", 0)), reverse=True)
+        self._snapshots[time_window] = Snapshot(tokens, self._clock(), complete)
+
+    async def run(self) -> None:
+        """Refresh all time windows every ``interval`` seconds until cancelled."""
+        with request_priority(Priority.BACKGROUND):
+            while True:
+                for time_window in self.time_windows:
+                    try:
+                        await self.refresh(time_window)
+                    except Exception as e:
+                        logger.warning("Failed to refresh trending tokens for %s: %s", time_window, e)
+                await asyncio.sleep(self.interval)
+
+    def get_page(self,
+                 time_window: str,
+                 page: int = 1,
+                 page_size: int = 20,
+                 min_mentions: int = 5) -> Optional[Dict[str, Any]]:
+        """Serve a page of trending tokens from the snapshot.
+
+        Returns:
+            A response shaped like /v1/trending-tokens, or None when there is
+            no usable snapshot: the window is not polled, the last successful
+            poll is older than three intervals or could not fetch every token,
+            or ``min_mentions`` is below the polling floor
+        """
+        snapshot = self._snapshots.get(time_window)
+        if snapshot is None or not snapshot.complete or min_mentions < self.min_mentions_floor:
+            return None
+        if self._clock() - snapshot.fetched_at > 3 * self.interval:
+            return None
+
+        tokens = [t for t in snapshot.tokens if t.get("current_count", 0) >= min_mentions]
+        start = (max(page, 1) - 1) * page_size
+        return {
+            "success": True,
+            "data": {
+                "data": tokens[start:start + page_size],
+                "total": len(tokens),
+                "page": page,
+                "pageSize": page_size
+            }
+        }
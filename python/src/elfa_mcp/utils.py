@@ -2,9 +2,10 @@
 Utility functions for the Elfa MCP server.
 """
 
+import os
 import time
 import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 
 def format_date(date_string: str) -> str:
@@ -53,33 +54,57 @@ def format_engagement_stats(metrics: Dict[str, Any]) -> str:
     return " | ".join(stats)
 
 
-def convert_timestamp_to_unix(timestamp: str) -> int:
+def align_timestamp(timestamp: float, bucket_seconds: int = 0) -> int:
+    """Snap a Unix timestamp down to the start of its time bucket.
+
+    Args:
+        timestamp: Unix timestamp (seconds since epoch)
+        bucket_seconds: Bucket size in seconds; 0 keeps second resolution
+
+    Returns:
+        The aligned Unix timestamp
+    """
+    if bucket_seconds <= 0:
+        return int(timestamp)
+    return int(timestamp // bucket_seconds * bucket_seconds)
+
+
+def convert_timestamp_to_unix(timestamp: str, bucket_seconds: int = 0) -> int:
     """Convert a human-readable time description to a Unix timestamp.
 
+    Relative times are measured from the current time. When ``bucket_seconds``
+    is set they are snapped down to a bucket boundary, so the same relative
+    range asked for moments apart maps to identical timestamps and can be
+    served from caches. ISO dates are never snapped.
+
     Args:
-        timestamp: String like "24h", "7d", "30d" or ISO date
+        timestamp: String like "now", "24h", "7d", "30d" or ISO date
+        bucket_seconds: Bucket size in seconds for relative times; 0 disables alignment
 
     Returns:
         Unix timestamp (seconds since epoch)
     """
     now = time.time()
 
+    if timestamp == "now":
+        return align_timestamp(now, bucket_seconds)
+
     # Check if it's a relative time
     if timestamp.endswith('h'):
         hours = int(timestamp[:-1])
-        return int(now - (hours * 3600))
+        return align_timestamp(now - (hours * 3600), bucket_seconds)
 
     if timestamp.endswith('d'):
         days = int(timestamp[:-1])
-        return int(now - (days * 86400))
+        return align_timestamp(now - (days * 86400), bucket_seconds)
 
     if timestamp.endswith('w'):
         weeks = int(timestamp[:-1])
-        return int(now - (weeks * 7 * 86400))
+        return align_timestamp(now - (weeks * 7 * 86400), bucket_seconds)
 
     if timestamp.endswith('m'):
         months = int(timestamp[:-1])
-        return int(now - (months * 30 * 86400))  # Approximation
+        return align_timestamp(now - (months * 30 * 86400), bucket_seconds)  # Approximation
 
     # Try to parse as ISO date
     try:
@@ -89,6 +114,45 @@ def convert_timestamp_to_unix(timestamp: str) -> int:
         raise ValueError(f"Cannot parse timestamp: {timestamp}")
 
 
+def mention_timestamp(mention: Dict[str, Any]) -> float:
+    """Get the time a mention was posted as a Unix timestamp.
+
+    Args:
+        mention: Mention from /v1/mentions ("mentionedAt") or
+            /v1/mentions/search ("mentioned_at")
+
+    Returns:
+        Unix timestamp, or 0 if the mention has no parseable date
+    """
+    value = mention.get("mentioned_at") or mention.get("mentionedAt")
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        dt = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return 0.0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+
+def split_time_range(from_time: int, to_time: int, parts: int) -> List[Tuple[int, int]]:
+    """Split a Unix time range into contiguous, non-overlapping sub-ranges.
+
+    Args:
+        from_time: Start of the range (inclusive)
+        to_time: End of the range
+        parts: Number of sub-ranges wanted
+
+    Returns:
+        List of (from, to) pairs covering the range in ascending order
+    """
+    parts = max(1, min(parts, to_time - from_time))
+    step = (to_time - from_time) / parts
+    bounds = [from_time + round(step * i) for i in range(parts)] + [to_time]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts)]
+
+
 def validate_time_window(time_window: str) -> str:
     """Validate the time window format.
 
@@ -110,3 +174,57 @@ def validate_time_window(time_window: str) -> str:
         raise ValueError(
             f"Invalid time window format: {time_window}. Expected formats: {', '.join(valid_formats)}")
     return time_window
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment.
+
+    Args:
+        name: Environment variable name
+        default: Value to use when the variable is unset or empty
+
+    Returns:
+        The parsed integer, or raises ValueError
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got: {value}")
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment.
+
+    Args:
+        name: Environment variable name
+        default: Value to use when the variable is unset or empty
+
+    Returns:
+        The parsed float, or raises ValueError
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got: {value}")
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting from the environment.
+
+    Args:
+        name: Environment variable name
+        default: Value to use when the variable is unset or empty
+
+    Returns:
+        True for "1", "true", "yes" or "on" (case-insensitive), False otherwise
+    """
+    value = os.environ.get(name, "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
@@ -7,6 +7,23 @@ from unittest.mock import AsyncMock, patch, MagicMock
 
 # Make sure we're using test environment
 os.environ["ELFA_API_KEY"] = "test-api-key"
+os.environ["ELFA_RETRY_BASE_DELAY"] = "0"
+
+
+class FakeClock:
+    """Monotonic time source moved forward by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Create a fake clock for components taking a ``clock`` argument."""
+    return FakeClock()
 
 
 @pytest.fixture
@@ -26,9 +43,10 @@ def mock_api_response():
 def mock_httpx_response():
     """Create a mock httpx response."""
     class MockResponse:
-        def __init__(self, status_code=200, json_data=None):
+        def __init__(self, status_code=200, json_data=None, headers=None):
             self.status_code = status_code
             self._json_data = json_data or {}
+            self.headers = headers or {}
 
         def json(self):
             return self._json_data
@@ -1,11 +1,21 @@
 """Tests for the Elfa API client."""
 
+import asyncio
 import os
+import time
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 
 import httpx
-from elfa_mcp.api_client import ElfaClient, get_client
+from elfa_mcp import api_client
+from elfa_mcp.api_client import ElfaAPIError, ElfaClient, close_client, get_client
+from elfa_mcp.cache import ResponseCache
+from elfa_mcp.deadline import DeadlineExceeded, current_deadline, deadline
+from elfa_mcp.index import MentionIndex
+from elfa_mcp.retry import RetryPolicy
+from elfa_mcp.scheduler import Priority, request_priority
+from elfa_mcp.shared import SharedCache
+from elfa_mcp.store import SQLiteStore
 
 class TestElfaClient:
     def test_init_with_api_key(self):
@@ -21,6 +31,17 @@ class TestElfaClient:
             assert client.api_key == "env-key"
             assert client.headers["x-elfa-api-key"] == "env-key"
 
+    def test_init_with_several_keys(self, tmp_path):
+        """Test that keys from ELFA_API_KEY and ELFA_API_KEY_FILE form one pool."""
+        key_file = tmp_path / "keys.txt"
+        key_file.write_text("key-c\n")
+
+        with patch.dict(os.environ, {"ELFA_API_KEY": "key-a,key-b", "ELFA_API_KEY_FILE": str(key_file)}):
+            client = ElfaClient()
+            assert client.api_key == "key-a"
+            assert client.headers["x-elfa-api-key"] == "key-a"
+            assert [k.key for k in client.key_pool] == ["key-a", "key-b", "key-c"]
+
     def test_init_without_api_key_raises_error(self):
         """Test that initialization without API key raises error."""
         with patch.dict(os.environ, {}, clear=True):
@@ -78,6 +99,247 @@ class TestElfaClient:
             
             assert "Request error" in str(exc_info.value)
 
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, monkeypatch):
+        """Test that repeated upstream failures open the endpoint's circuit."""
+        monkeypatch.setenv("ELFA_CIRCUIT_FAILURE_THRESHOLD", "2")
+        mock_get = AsyncMock(side_effect=httpx.ReadTimeout("timed out", request=MagicMock()))
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key", retry_policy=RetryPolicy(max_attempts=5, base_delay=0))
+            with pytest.raises(ElfaAPIError) as exc_info:
+                await client._make_request("/v1/mentions")
+            assert exc_info.value.status_code == 503
+            assert mock_get.call_count == 2
+
+            with pytest.raises(ElfaAPIError, match="unavailable"):
+                await client._make_request("/v1/mentions", {"limit": 5})
+            assert mock_get.call_count == 2
+
+            # Other endpoints have their own circuit
+            with pytest.raises(ElfaAPIError):
+                await client._make_request("/v1/top-mentions")
+            assert mock_get.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_serves_expired_cache(self, monkeypatch, mock_httpx_response):
+        """Test that any cached response is served, however old, while the circuit is open."""
+        monkeypatch.setenv("ELFA_CIRCUIT_FAILURE_THRESHOLD", "1")
+        now = [1000.0]
+        cache = ResponseCache(max_stale_ages={}, clock=lambda: now[0])
+        mock_get = AsyncMock(side_effect=[
+            mock_httpx_response(status_code=200, json_data={"success": True, "data": "cached"}),
+            mock_httpx_response(status_code=503),
+        ])
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key", cache=cache, retry_policy=RetryPolicy(max_attempts=1))
+            await client._make_request("/v1/mentions", {"limit": 5})
+            with pytest.raises(ElfaAPIError):
+                await client._make_request("/v1/mentions", {"limit": 10})
+
+            now[0] += 3600
+            response = await client._make_request("/v1/mentions", {"limit": 5})
+
+            assert response["data"] == "cached"
+            assert mock_get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_timeouts_adapt_to_observed_latency(self, mock_httpx_response):
+        """Test that the request timeout follows the endpoint's latency percentiles."""
+        mock_get = AsyncMock(return_value=mock_httpx_response(status_code=200, json_data={"success": True}))
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key")
+            await client._send("/v1/mentions")
+            assert mock_get.call_args.kwargs["timeout"] == api_client.DEFAULT_TIMEOUT
+
+            for _ in range(20):
+                client.latency_tracker("/v1/mentions").record(2.0)
+            await client._send("/v1/mentions")
+            assert mock_get.call_args.kwargs["timeout"] == 6.0
+
+    @pytest.mark.asyncio
+    async def test_timeouts_widen_when_latency_rises(self, clock, mock_httpx_response):
+        """Test that requests recover once the upstream slows past the learned timeout."""
+        upstream_latency = 12.0
+
+        async def get(*args, timeout, **kwargs):
+            if upstream_latency > timeout:
+                clock.now += timeout
+                raise httpx.ReadTimeout("timed out", request=MagicMock())
+            clock.now += upstream_latency
+            return mock_httpx_response(status_code=200, json_data={"success": True, "data": "slow"})
+
+        fake_time = MagicMock(wraps=time, monotonic=clock)
+        with patch("httpx.AsyncClient.get", get), patch("elfa_mcp.api_client.time", fake_time):
+            client = ElfaClient(api_key="test-key")
+            tracker = client.latency_tracker("/v1/mentions")
+            for _ in range(tracker.window):
+                tracker.record(0.5)
+
+            outcomes = []
+            for _ in range(4):
+                try:
+                    outcomes.append((await client._send("/v1/mentions"))["data"])
+                except httpx.ReadTimeout:
+                    outcomes.append("timeout")
+
+            assert outcomes == ["timeout", "timeout", "slow", "slow"]
+            assert tracker.timeout(api_client.DEFAULT_TIMEOUT) > upstream_latency
+
+    @pytest.mark.asyncio
+    async def test_slow_requests_are_hedged(self, monkeypatch, mock_httpx_response):
+        """Test that a duplicate request wins when the first is slower than the hedge percentile."""
+        monkeypatch.setenv("ELFA_HEDGE_ENDPOINTS", "/v1/mentions/search")
+        first_cancelled = asyncio.Event()
+        calls = 0
+
+        async def get(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    first_cancelled.set()
+                    raise
+            return mock_httpx_response(status_code=200, json_data={"success": True, "data": "hedged"})
+
+        with patch("httpx.AsyncClient.get", get):
+            client = ElfaClient(api_key="test-key")
+            for _ in range(20):
+                client.latency_tracker("/v1/mentions/search").record(0.01)
+
+            response = await asyncio.wait_for(client._send("/v1/mentions/search"), 1)
+
+            assert response["data"] == "hedged"
+            assert calls == 2
+            await asyncio.wait_for(first_cancelled.wait(), 1)
+
+    @pytest.mark.asyncio
+    async def test_hedging_respects_rate_limit(self, monkeypatch, mock_httpx_response):
+        """Test that no hedge is sent when the rate limiter has no token to spare."""
+        monkeypatch.setenv("ELFA_HEDGE_ENDPOINTS", "/v1/mentions/search")
+        calls = 0
+
+        async def get(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return mock_httpx_response(status_code=200, json_data={"success": True})
+
+        with patch("httpx.AsyncClient.get", get):
+            client = ElfaClient(api_key="test-key")
+            client.rate_limiter.try_acquire = MagicMock(return_value=False)
+            for _ in range(20):
+                client.latency_tracker("/v1/mentions/search").record(0.01)
+
+            await client._send("/v1/mentions/search")
+
+            assert calls == 1
+            client.rate_limiter.try_acquire.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_retries_stop_at_the_time_budget(self, mock_httpx_response):
+        """Test that a retry whose backoff would outlast the budget is not attempted."""
+        mock_get = AsyncMock(return_value=mock_httpx_response(status_code=503))
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key", retry_policy=RetryPolicy(base_delay=5, max_delay=5))
+            with patch("elfa_mcp.retry.random.uniform", return_value=5.0), deadline(1.0):
+                with pytest.raises(ElfaAPIError, match="503"):
+                    await client._make_request("/v1/mentions")
+
+            assert mock_get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_request_timeout_is_capped_by_budget(self, mock_httpx_response):
+        """Test that requests time out with the budget and fail once it is spent."""
+        mock_get = AsyncMock(side_effect=httpx.ReadTimeout("timed out", request=MagicMock()))
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key")
+            with deadline(2.0):
+                with pytest.raises(DeadlineExceeded):
+                    await client._send("/v1/mentions")
+            assert mock_get.call_args.kwargs["timeout"] <= 2.0
+
+            with deadline(0):
+                with pytest.raises(DeadlineExceeded):
+                    await client._send("/v1/mentions")
+            assert mock_get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesced_caller_outlives_starters_budget(self, mock_httpx_response):
+        """Test that a caller joining a shared call refetches when only the starter's budget ran out."""
+        client = ElfaClient(api_key="test-key")
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch(endpoint, params=None):
+            calls.append(endpoint)
+            if len(calls) == 1:
+                await release.wait()
+                raise DeadlineExceeded("Time budget exhausted", current_deadline())
+            return {"success": True}
+
+        with patch.object(client, "_fetch", side_effect=fetch):
+            with deadline(60.0):
+                starter = asyncio.ensure_future(client._make_request("/v1/mentions"))
+            await asyncio.sleep(0)
+            joiner = asyncio.ensure_future(client._make_request("/v1/mentions"))
+            await asyncio.sleep(0)
+            release.set()
+
+            with pytest.raises(DeadlineExceeded):
+                await starter
+            assert await joiner == {"success": True}
+            assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_make_request_retries_transient_errors(self, mock_httpx_response):
+        """Test that transient failures are retried until a request succeeds."""
+        mock_get = AsyncMock(side_effect=[
+            mock_httpx_response(status_code=503),
+            httpx.ReadTimeout("timed out", request=MagicMock()),
+            mock_httpx_response(status_code=200, json_data={"success": True})
+        ])
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key")
+            result = await client._make_request("/test-endpoint")
+
+            assert result == {"success": True}
+            assert mock_get.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_make_request_gives_up_after_max_attempts(self, mock_httpx_response):
+        """Test that retries stop once the attempt budget is spent."""
+        mock_get = AsyncMock(return_value=mock_httpx_response(status_code=502))
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key", retry_policy=RetryPolicy(max_attempts=2, base_delay=0))
+
+            with pytest.raises(Exception) as exc_info:
+                await client._make_request("/test-endpoint")
+
+            assert "API request failed with status code 502" in str(exc_info.value)
+            assert mock_get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_make_request_does_not_retry_client_errors(self, mock_httpx_response):
+        """Test that 401 and 404 responses fail without retrying."""
+        mock_get = AsyncMock(return_value=mock_httpx_response(status_code=404))
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key")
+
+            with pytest.raises(Exception):
+                await client._make_request("/test-endpoint")
+
+            assert mock_get.call_count == 1
+
     @pytest.mark.asyncio
     async def test_get_api_key_status(self, mock_api_response):
         """Test get_api_key_status method."""
@@ -89,6 +351,115 @@ class TestElfaClient:
         client._make_request.assert_called_once_with("/v1/key-status")
         assert result == mock_api_response({"key": "value"})
 
+    @pytest.mark.asyncio
+    async def test_get_api_key_status_seeds_rate_limiter(self, mock_api_response, api_key_status_data):
+        """Test that a key status response re-seeds the rate limiter."""
+        client = ElfaClient(api_key="test-key")
+        client._make_request = AsyncMock(return_value=mock_api_response(api_key_status_data))
+
+        assert client.rate_limiter.rate is None
+        await client.get_api_key_status()
+        assert client.rate_limiter.rate > 0
+
+    @pytest.mark.asyncio
+    async def test_rejected_key_fails_over_to_another(self, mock_httpx_response):
+        """Test that a request answered 401 is repeated with another key, which takes over."""
+        used = []
+
+        async def get(http_client, url, headers=None, **kwargs):
+            used.append(headers["x-elfa-api-key"])
+            if headers["x-elfa-api-key"] == "bad":
+                return mock_httpx_response(status_code=401)
+            return mock_httpx_response(status_code=200, json_data={"success": True})
+
+        with patch("httpx.AsyncClient.get", get):
+            client = ElfaClient(api_key="bad,good")
+            for _ in range(5):
+                assert await client._send("/v1/mentions") == {"success": True}
+
+            assert used.count("bad") <= 1
+            assert used.count("good") == 5
+            assert not client.key_pool.is_healthy(client.key_pool.get("bad"))
+
+    @pytest.mark.asyncio
+    async def test_refresh_key_statuses_paces_to_combined_quota(self, mock_httpx_response):
+        """Test that every key's status is checked and the limiter uses their combined rate."""
+        remaining = {"key-a": 1000, "key-b": 3000}
+
+        async def get(http_client, url, headers=None, **kwargs):
+            data = {"remainingRequests": {"daily": remaining[headers["x-elfa-api-key"]]}}
+            return mock_httpx_response(status_code=200, json_data={"success": True, "data": data})
+
+        with patch("httpx.AsyncClient.get", get):
+            client = ElfaClient(api_key="key-a,key-b")
+            await client.refresh_key_statuses()
+
+            assert client.key_pool.get("key-b").remaining == 3000
+            single = ElfaClient(api_key="key-a")
+            await single.refresh_key_statuses()
+            assert client.rate_limiter.rate == pytest.approx(4 * single.rate_limiter.rate, rel=1e-3)
+
+    @pytest.mark.asyncio
+    async def test_key_status_is_cached_and_accounted(self, mock_httpx_response, api_key_status_data):
+        """Test that a recent key status is served locally with requests since deducted."""
+        urls = []
+
+        async def get(http_client, url, headers=None, **kwargs):
+            urls.append(url)
+            if url.endswith("/v1/key-status"):
+                return mock_httpx_response(status_code=200, json_data={"success": True, "data": api_key_status_data})
+            return mock_httpx_response(status_code=200, json_data={"success": True})
+
+        with patch("httpx.AsyncClient.get", get):
+            client = ElfaClient(api_key="test-key")
+            await client.get_api_key_status(max_age=60)
+            await client._make_request("/v1/mentions")
+            await client._make_request("/v1/top-mentions")
+
+            status = await client.get_api_key_status(max_age=60)
+
+            assert status["data"]["remainingRequests"] == {"monthly": 9498, "daily": 948}
+            assert status["data"]["usage"] == {"monthly": 502, "daily": 52}
+            assert len(urls) == 3
+
+    @pytest.mark.asyncio
+    async def test_key_status_reconciles_after_drift(self, monkeypatch, mock_httpx_response, api_key_status_data):
+        """Test that the key status is re-checked in the background once enough requests were counted."""
+        monkeypatch.setenv("ELFA_KEY_STATUS_MAX_DRIFT", "2")
+        checked = asyncio.Event()
+
+        async def get(http_client, url, headers=None, **kwargs):
+            if url.endswith("/v1/key-status"):
+                checked.set()
+                return mock_httpx_response(status_code=200, json_data={"success": True, "data": api_key_status_data})
+            return mock_httpx_response(status_code=200, json_data={"success": True})
+
+        with patch("httpx.AsyncClient.get", get):
+            client = ElfaClient(api_key="test-key")
+            await client._make_request("/v1/mentions", {"limit": 1})
+            assert not checked.is_set()
+            await client._make_request("/v1/mentions", {"limit": 2})
+
+            await asyncio.wait_for(checked.wait(), 1)
+            await asyncio.sleep(0)
+            assert client.key_pool.primary.requests_since_check == 0
+            assert client.key_pool.primary.remaining == 950
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_key_status_bypasses_rate_limiter(self, mock_httpx_response):
+        """Test that key status requests never wait on the limiter."""
+        mock_response = mock_httpx_response(status_code=200, json_data={"success": True})
+
+        with patch("httpx.AsyncClient.get", AsyncMock(return_value=mock_response)):
+            client = ElfaClient(api_key="test-key")
+            client.rate_limiter.acquire = AsyncMock()
+            await client._make_request("/v1/key-status")
+            client.rate_limiter.acquire.assert_not_called()
+
+            await client._make_request("/v1/mentions", {"limit": 1})
+            client.rate_limiter.acquire.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_get_mentions(self, mock_api_response):
         """Test get_mentions method."""
@@ -100,8 +471,451 @@ class TestElfaClient:
         client._make_request.assert_called_once_with("/v1/mentions", {"limit": 50, "offset": 10})
         assert result == mock_api_response([{"id": "123"}])
 
+    @pytest.mark.asyncio
+    async def test_get_top_mentions(self, mock_api_response):
+        """Test that get_top_mentions passes its refresh flag through."""
+        client = ElfaClient(api_key="test-key")
+        client._make_request = AsyncMock(return_value=mock_api_response([]))
+        params = {"ticker": "BTC", "timeWindow": "1h", "page": 1, "pageSize": 10, "includeAccountDetails": False}
+
+        await client.get_top_mentions("BTC")
+        client._make_request.assert_called_with("/v1/top-mentions", params, refresh=False)
+
+        await client.get_top_mentions("BTC", refresh=True)
+        client._make_request.assert_called_with("/v1/top-mentions", params, refresh=True)
+
     # Add similar tests for other API methods...
 
+    @pytest.mark.asyncio
+    async def test_iter_search_mentions_follows_cursor(self, mock_api_response):
+        """Test that search results are followed across cursor pages."""
+        client = ElfaClient(api_key="test-key")
+        client.search_mentions = AsyncMock(side_effect=[
+            mock_api_response([{"id": "1"}, {"id": "2"}], metadata={"total": 3, "cursor": "next"}),
+            mock_api_response([{"id": "3"}], metadata={"total": 3})
+        ])
+
+        mentions = [m async for m in client.iter_search_mentions("btc", 100, 200, limit=2)]
+
+        assert [m["id"] for m in mentions] == ["1", "2", "3"]
+        assert client.search_mentions.call_args_list[1].kwargs["cursor"] == "next"
+
+    @pytest.mark.asyncio
+    async def test_search_mentions_sharded_merges_windows(self, mock_api_response):
+        """Test that sub-window results are merged newest first without duplicates."""
+        shard_results = {
+            0: [{"id": "b", "mentioned_at": "2024-01-01T02:00:00Z"},
+                {"id": "a", "mentioned_at": "2024-01-01T01:00:00Z"}],
+            50: [{"id": "d", "mentioned_at": "2024-01-02T02:00:00Z"},
+                 {"id": "b", "mentioned_at": "2024-01-01T02:00:00Z"},
+                 {"id": "c", "mentioned_at": "2024-01-02T01:00:00Z"}],
+        }
+
+        async def search_mentions(**kwargs):
+            return mock_api_response(shard_results[kwargs["from_time"]], metadata={})
+
+        client = ElfaClient(api_key="test-key")
+        client.search_mentions = AsyncMock(side_effect=search_mentions)
+
+        mentions, stopped_early = await client.search_mentions_sharded("btc", 0, 100, shards=2, max_results=3)
+
+        assert [m["id"] for m in mentions] == ["d", "c", "b"]
+        assert not stopped_early
+        assert client.search_mentions.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_search_mentions_sharded_stops_older_windows(self, mock_api_response):
+        """Test that older sub-windows are not paged once newer ones hold max_results mentions."""
+        async def search_mentions(**kwargs):
+            page = [{"id": f"{kwargs['from_time']}-{kwargs.get('cursor')}-{i}",
+                     "mentioned_at": "2024-01-01T00:00:00Z"} for i in range(5)]
+            return mock_api_response(page, metadata={"cursor": f"{kwargs.get('cursor')}+"})
+
+        client = ElfaClient(api_key="test-key")
+        client.search_mentions = AsyncMock(side_effect=search_mentions)
+
+        mentions, _ = await client.search_mentions_sharded(
+            "btc", 0, 800, shards=8, max_results=5, limit=5, max_concurrency=1)
+
+        assert len(mentions) == 5
+        assert {c.kwargs["from_time"] for c in client.search_mentions.call_args_list} == {700}
+        assert client.search_mentions.call_count <= 2
+
+    @pytest.mark.asyncio
+    async def test_search_mentions_sharded_keeps_results_on_budget(self, mock_api_response):
+        """Test that sub-windows cut short by the time budget keep what they collected."""
+        async def search_mentions(**kwargs):
+            if kwargs.get("cursor"):
+                raise DeadlineExceeded("Time budget exhausted while paginating")
+            page = [{"id": f"{kwargs['from_time']}-{i}", "mentioned_at": "2024-01-01T00:00:00Z"}
+                    for i in range(2)]
+            return mock_api_response(page, metadata={"cursor": "next"})
+
+        client = ElfaClient(api_key="test-key")
+        client.search_mentions = AsyncMock(side_effect=search_mentions)
+
+        mentions, stopped_early = await client.search_mentions_sharded(
+            "btc", 0, 200, shards=2, max_results=10, limit=2)
+
+        assert sorted(m["id"] for m in mentions) == ["0-0", "0-1", "100-0", "100-1"]
+        assert stopped_early
+
+    @pytest.mark.asyncio
+    async def test_historical_search_pages_are_stored_on_disk(self, tmp_path, mock_api_response):
+        """Test that fully past search ranges are served from the on-disk store."""
+        store = SQLiteStore(str(tmp_path / "cache.db"))
+        response = mock_api_response([{"id": "1"}], metadata={"total": 1})
+
+        client = ElfaClient(api_key="test-key", disk_store=store)
+        client._make_request = AsyncMock(return_value=response)
+        await client.search_mentions("btc", 1_600_000_000, 1_600_086_400)
+
+        restarted = ElfaClient(api_key="test-key", disk_store=store)
+        restarted._make_request = AsyncMock()
+        result = await restarted.search_mentions("btc", 1_600_000_000, 1_600_086_400)
+
+        assert result == response
+        restarted._make_request.assert_not_called()
+        await restarted.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_serves_other_processes(self, tmp_path, mock_api_response):
+        """Test that a response fetched by one worker is served to another from the shared cache."""
+        path = str(tmp_path / "shared.db")
+        response = mock_api_response([{"symbol": "BTC"}])
+        worker = ElfaClient(api_key="test-key", shared_cache=SharedCache(SQLiteStore(path)))
+        other = ElfaClient(api_key="test-key", shared_cache=SharedCache(SQLiteStore(path)))
+        worker._fetch = AsyncMock(return_value=response)
+        other._fetch = AsyncMock()
+
+        await worker._make_request("/v1/trending-tokens", {"timeWindow": "24h"})
+        result = await other._make_request("/v1/trending-tokens", {"timeWindow": "24h"})
+        await other._make_request("/v1/trending-tokens", {"timeWindow": "24h"})
+
+        assert result == response
+        other._fetch.assert_not_called()
+        await worker.aclose()
+        await other.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_waits_for_other_process_fetch(self, tmp_path, mock_api_response):
+        """Test that a worker waits on another worker's lease instead of fetching too."""
+        path = str(tmp_path / "shared.db")
+        shared = SharedCache(SQLiteStore(path), poll_interval=0.01)
+        other = SharedCache(SQLiteStore(path))
+        client = ElfaClient(api_key="test-key", shared_cache=shared)
+        client._fetch = AsyncMock()
+        key = "/v1/top-mentions?ticker=BTC"
+        assert other.acquire_lease(key)
+
+        waiting = asyncio.ensure_future(client._make_request("/v1/top-mentions", {"ticker": "BTC"}))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+
+        response = mock_api_response([{"id": 1}])
+        other.set(key, response, ttl=60)
+        other.release_lease(key)
+
+        assert await waiting == response
+        client._fetch.assert_not_called()
+        other.close()
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_lapsed_lease_is_taken_over(self, tmp_path, mock_api_response):
+        """Test that a worker fetches itself once a dead worker's lease lapses."""
+        path = str(tmp_path / "shared.db")
+        dead = SharedCache(SQLiteStore(path), lease_timeout=0.05)
+        client = ElfaClient(api_key="test-key",
+                            shared_cache=SharedCache(SQLiteStore(path), poll_interval=0.01))
+        response = mock_api_response([{"id": 1}])
+        client._fetch = AsyncMock(return_value=response)
+        assert dead.acquire_lease("/v1/top-mentions?ticker=BTC")
+
+        assert await client._make_request("/v1/top-mentions", {"ticker": "BTC"}) == response
+        client._fetch.assert_awaited_once()
+        assert dead.acquire_lease("/v1/top-mentions?ticker=BTC")  # released after the fetch
+        dead.close()
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_shares_not_found(self, tmp_path):
+        """Test that an unknown account found by one worker is not looked up again by another."""
+        path = str(tmp_path / "shared.db")
+        worker = ElfaClient(api_key="test-key", shared_cache=SharedCache(SQLiteStore(path)))
+        other = ElfaClient(api_key="test-key", shared_cache=SharedCache(SQLiteStore(path)))
+        worker._fetch = AsyncMock(side_effect=ElfaAPIError("not found", status_code=404))
+        other._fetch = AsyncMock()
+
+        for client in (worker, other):
+            with pytest.raises(ElfaAPIError) as exc_info:
+                await client._make_request("/v1/account/smart-stats", {"username": "nobody"})
+            assert exc_info.value.status_code == 404
+
+        other._fetch.assert_not_called()
+        await worker.aclose()
+        await other.aclose()
+
+    @pytest.mark.asyncio
+    async def test_recent_search_pages_are_not_stored(self, tmp_path, mock_api_response):
+        """Test that ranges reaching up to now bypass the on-disk store."""
+        store = SQLiteStore(str(tmp_path / "cache.db"))
+        client = ElfaClient(api_key="test-key", disk_store=store)
+        client._make_request = AsyncMock(return_value=mock_api_response([], metadata={}))
+
+        now = int(time.time())
+        await client.search_mentions("btc", now - 3600, now)
+
+        assert store.size() == 0
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_refined_search_is_answered_from_index(self, mock_api_response):
+        """Test that narrowing a fully fetched search needs no upstream call."""
+        client = ElfaClient(api_key="test-key")
+        client._make_request = AsyncMock(return_value=mock_api_response([
+            {"id": "1", "content": "bitcoin etf news", "mentioned_at": "2024-01-01T01:00:00Z"},
+            {"id": "2", "content": "bitcoin price", "mentioned_at": "2024-01-01T02:00:00Z"}
+        ], metadata={"total": 2}))
+
+        await client.search_mentions("bitcoin", 1704067200, 1704153600, search_type="and")
+        result = await client.search_mentions("bitcoin,etf", 1704067200, 1704153600, search_type="and")
+
+        assert client._make_request.call_count == 1
+        assert [m["id"] for m in result["data"]] == ["1"]
+        assert result["metadata"]["total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_tokens_follow_request_priority(self, mock_httpx_response):
+        """Test that requests ask the rate limiter for a token at their own priority."""
+        limiter = MagicMock()
+        limiter.acquire = AsyncMock(return_value=0.0)
+        client = ElfaClient(api_key="test-key", rate_limiter=limiter, cache=ResponseCache(max_entries=0))
+
+        with patch("httpx.AsyncClient.get", AsyncMock(return_value=mock_httpx_response(json_data={"success": True}))):
+            with request_priority(Priority.BACKGROUND):
+                await client._make_request("/v1/trending-tokens")
+            await client._make_request("/v1/top-mentions")
+
+        assert [c.kwargs["priority"] for c in limiter.acquire.call_args_list] == [
+            Priority.BACKGROUND, Priority.INTERACTIVE]
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_engagement_mentions_do_not_evict_recorded_searches(self, mock_api_response):
+        """Test that get_mentions results, which cover no search, stay out of the index."""
+        client = ElfaClient(api_key="test-key", mention_index=MentionIndex(max_mentions=2))
+        search_page = mock_api_response([
+            {"id": "1", "content": "bitcoin etf news", "mentioned_at": "2024-01-01T01:00:00Z"}
+        ], metadata={"total": 1})
+        client._make_request = AsyncMock(return_value=search_page)
+        await client.search_mentions("bitcoin", 1704067200, 1704153600, search_type="and")
+
+        client._make_request = AsyncMock(return_value=mock_api_response([
+            {"id": str(i), "content": "gm", "mentionedAt": "2024-01-01T03:00:00Z"} for i in range(10, 15)
+        ], metadata={"total": 5}))
+        await client.get_mentions(limit=5)
+
+        client._make_request = AsyncMock()
+        result = await client.search_mentions("bitcoin,etf", 1704067200, 1704153600, search_type="and")
+
+        client._make_request.assert_not_called()
+        assert [m["id"] for m in result["data"]] == ["1"]
+
+    @pytest.mark.asyncio
+    async def test_iter_mentions_pages_by_offset(self, mock_api_response):
+        """Test that mentions are paged by offset until the total is reached."""
+        client = ElfaClient(api_key="test-key")
+        client.get_mentions = AsyncMock(side_effect=[
+            mock_api_response([{"id": "1"}, {"id": "2"}], metadata={"total": 3}),
+            mock_api_response([{"id": "3"}], metadata={"total": 3})
+        ])
+
+        mentions = [m async for m in client.iter_mentions(limit=2)]
+
+        assert [m["id"] for m in mentions] == ["1", "2", "3"]
+        client.get_mentions.assert_called_with(limit=2, offset=2)
+
+    @pytest.mark.asyncio
+    async def test_make_request_serves_repeats_from_cache(self, mock_httpx_response):
+        """Test that a repeated cacheable request is answered from the cache."""
+        mock_response = mock_httpx_response(status_code=200, json_data={"success": True, "data": []})
+        mock_get = AsyncMock(return_value=mock_response)
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key")
+            first = await client._make_request("/v1/trending-tokens", {"timeWindow": "24h"})
+            second = await client._make_request("/v1/trending-tokens", {"timeWindow": "24h"})
+
+            assert first == second
+            assert mock_get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_bypasses_and_updates_cache(self, mock_httpx_response):
+        """Test that a refreshing request reaches the API and replaces the cached response."""
+        mock_get = AsyncMock(side_effect=[
+            mock_httpx_response(status_code=200, json_data={"success": True, "data": "old"}),
+            mock_httpx_response(status_code=200, json_data={"success": True, "data": "new"}),
+        ])
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key")
+            assert client.top_mentions_expires_in("BTC") is None
+            await client.get_top_mentions("BTC")
+            await client.get_top_mentions("BTC", refresh=True)
+            response = await client.get_top_mentions("BTC")
+
+            assert response["data"] == "new"
+            assert mock_get.call_count == 2
+            assert client.top_mentions_expires_in("BTC") > 0
+
+    @pytest.mark.asyncio
+    async def test_make_request_does_not_cache_key_status(self, mock_httpx_response):
+        """Test that uncached endpoints always reach the API."""
+        mock_response = mock_httpx_response(status_code=200, json_data={"success": True})
+        mock_get = AsyncMock(return_value=mock_response)
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key")
+            await client._make_request("/v1/key-status")
+            await client._make_request("/v1/key-status")
+
+            assert mock_get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_make_request_coalesces_concurrent_calls(self, mock_httpx_response):
+        """Test that identical concurrent requests share one upstream call."""
+        mock_response = mock_httpx_response(status_code=200, json_data={"success": True})
+
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return mock_response
+
+        mock_get = AsyncMock(side_effect=slow_get)
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key", cache=ResponseCache(max_entries=0))
+            results = await asyncio.gather(*[
+                client._make_request("/v1/trending-tokens", {"timeWindow": "24h"})
+                for _ in range(5)
+            ])
+
+            assert mock_get.call_count == 1
+            assert all(result == {"success": True} for result in results)
+
+    @pytest.mark.asyncio
+    async def test_not_found_accounts_are_negatively_cached(self, mock_httpx_response):
+        """Test that a 404 for an account is remembered and not re-requested."""
+        mock_get = AsyncMock(return_value=mock_httpx_response(status_code=404))
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            client = ElfaClient(api_key="test-key")
+
+            for _ in range(3):
+                with pytest.raises(ElfaAPIError) as exc_info:
+                    await client.get_account_smart_stats("ghost")
+                assert exc_info.value.status_code == 404
+                assert "404" in str(exc_info.value)
+
+            assert mock_get.call_count == 1
+
+    def test_negative_cache_ttl_from_environment(self):
+        """Test that the negative cache period is configurable."""
+        with patch.dict(os.environ, {"ELFA_NEGATIVE_CACHE_TTL": "0"}):
+            client = ElfaClient(api_key="test-key")
+            assert client.cache.negative_ttl_for("/v1/account/smart-stats") == 0
+
+    @pytest.mark.asyncio
+    async def test_stale_response_is_served_while_refreshing(self):
+        """Test that an expired response is returned at once and refreshed in the background."""
+        clock = [1000.0]
+        client = ElfaClient(api_key="test-key", cache=ResponseCache(clock=lambda: clock[0]))
+        client._fetch = AsyncMock(side_effect=[{"success": True, "data": "old"},
+                                               {"success": True, "data": "new"}])
+        params = {"ticker": "BTC", "timeWindow": "1h"}
+
+        await client._make_request("/v1/top-mentions", params)
+        clock[0] += 120  # past the 60s TTL, within the maximum stale age
+
+        stale = await client._make_request("/v1/top-mentions", params)
+        assert stale["data"] == "old"
+
+        await asyncio.gather(*client._revalidating.values())
+        fresh = await client._make_request("/v1/top-mentions", params)
+        assert fresh["data"] == "new"
+        assert client._fetch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_outlives_the_callers_budget(self):
+        """Test that a stale-while-revalidate refresh does not inherit the caller's time budget."""
+        clock = [1000.0]
+        client = ElfaClient(api_key="test-key", cache=ResponseCache(clock=lambda: clock[0]))
+        budgets = []
+
+        async def fetch(endpoint, params):
+            budgets.append(current_deadline())
+            return {"success": True, "data": "old" if len(budgets) == 1 else "new"}
+
+        client._fetch = fetch
+        params = {"ticker": "BTC", "timeWindow": "1h"}
+        await client._make_request("/v1/top-mentions", params)
+        clock[0] += 120
+
+        with deadline(5.0):
+            assert (await client._make_request("/v1/top-mentions", params))["data"] == "old"
+        await asyncio.gather(*client._revalidating.values())
+
+        assert budgets == [None, None]
+
+    @pytest.mark.asyncio
+    async def test_response_past_max_stale_age_blocks(self):
+        """Test that a response older than its maximum stale age is fetched inline."""
+        clock = [1000.0]
+        client = ElfaClient(api_key="test-key", cache=ResponseCache(clock=lambda: clock[0]))
+        client._fetch = AsyncMock(side_effect=[{"success": True, "data": "old"},
+                                               {"success": True, "data": "new"}])
+        params = {"ticker": "BTC", "timeWindow": "1h"}
+
+        await client._make_request("/v1/top-mentions", params)
+        clock[0] += 3600
+
+        result = await client._make_request("/v1/top-mentions", params)
+        assert result["data"] == "new"
+        assert not client._revalidating
+
+    def test_pool_limits_from_environment(self):
+        """Test that connection pool settings are read from the environment."""
+        with patch.dict(os.environ, {"ELFA_MAX_CONNECTIONS": "5", "ELFA_KEEPALIVE_EXPIRY": "12.5"}):
+            client = ElfaClient(api_key="test-key")
+            assert client.limits.max_connections == 5
+            assert client.limits.keepalive_expiry == 12.5
+
+    @pytest.mark.asyncio
+    async def test_requests_share_pooled_client(self, mock_httpx_response):
+        """Test that consecutive requests reuse one pooled HTTP client."""
+        mock_response = mock_httpx_response(status_code=200, json_data={"success": True})
+
+        with patch("httpx.AsyncClient.get", AsyncMock(return_value=mock_response)):
+            client = ElfaClient(api_key="test-key")
+            await client._make_request("/test-endpoint")
+            pooled = client._http_client
+            await client._make_request("/test-endpoint")
+
+            assert pooled is not None
+            assert client._http_client is pooled
+
+            await client.aclose()
+            assert pooled.is_closed
+            assert client._http_client is None
+
+    @pytest.mark.asyncio
+    async def test_http2_without_h2_falls_back(self):
+        """Test that HTTP/2 falls back to HTTP/1.1 when h2 is missing."""
+        client = ElfaClient(api_key="test-key", http2=True)
+        with patch.dict("sys.modules", {"h2": None}):
+            http_client = client._get_http_client()
+        assert not http_client.is_closed
+        await client.aclose()
+
 class TestGetClient:
     def test_get_client_creates_singleton(self):
         """Test that get_client creates a singleton instance."""
@@ -117,4 +931,16 @@ class TestGetClient:
             mock_client_class.reset_mock()
             client2 = get_client()
             assert client2 == "test-client-instance"
-            mock_client_class.assert_not_called()
\ No newline at end of file
+            mock_client_class.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_close_client_resets_singleton(self, monkeypatch):
+        """Test that close_client closes the pool and drops the singleton."""
+        monkeypatch.setattr(api_client, "_client_instance", None)
+        client = get_client()
+        client._get_http_client()
+
+        await close_client()
+
+        assert api_client._client_instance is None
+        assert client._http_client is None
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""Tests for the response cache."""
+
+from elfa_mcp.cache import ResponseCache, make_cache_key
+
+
+class TestMakeCacheKey:
+    def test_param_order_does_not_matter(self):
+        """Test that equivalent params produce the same key."""
+        key1 = make_cache_key("/v1/top-mentions", {"ticker": "BTC", "page": 1})
+        key2 = make_cache_key("/v1/top-mentions", {"page": 1, "ticker": "BTC"})
+        assert key1 == key2
+
+    def test_normalizes_values(self):
+        """Test that booleans and None values are normalized."""
+        key = make_cache_key("/v1/top-mentions", {"includeAccountDetails": False, "cursor": None})
+        assert key == "/v1/top-mentions?includeAccountDetails=false"
+
+    def test_no_params(self):
+        """Test key for an endpoint without params."""
+        assert make_cache_key("/v1/key-status") == "/v1/key-status"
+
+
+class TestResponseCache:
+    def test_get_returns_fresh_value(self, clock):
+        """Test that a stored value is returned before it expires."""
+        cache = ResponseCache(clock=clock)
+        cache.set("k", {"success": True}, ttl=10)
+
+        clock.now += 9
+        assert cache.get("k") == {"success": True}
+
+    def test_expired_value_is_dropped(self, clock):
+        """Test that expired entries are not returned."""
+        cache = ResponseCache(clock=clock)
+        cache.set("k", "value", ttl=10)
+
+        clock.now += 10
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_lookup_serves_stale_until_max_age(self, clock):
+        """Test that expired values are returned as stale until their maximum age."""
+        cache = ResponseCache(clock=clock)
+        cache.set("k", "value", ttl=10, max_stale_age=60)
+
+        assert cache.lookup("k") == ("value", True)
+        clock.now += 30
+        assert cache.lookup("k") == ("value", False)
+        assert cache.get("k") is None
+        clock.now += 30
+        assert cache.lookup("k") is None
+
+    def test_expires_in(self, clock):
+        """Test that the time left before expiry is reported, negative once stale."""
+        cache = ResponseCache(clock=clock)
+        assert cache.expires_in("k") is None
+
+        cache.set("k", "value", ttl=10, max_stale_age=60)
+        clock.now += 4
+        assert cache.expires_in("k") == 6
+        clock.now += 10
+        assert cache.expires_in("k") == -4
+
+    def test_max_stale_age_per_endpoint(self):
+        """Test the per-endpoint maximum stale age."""
+        cache = ResponseCache()
+        assert cache.max_stale_age_for("/v1/top-mentions") > 0
+        assert cache.max_stale_age_for("/v1/key-status") == 0
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_ttl_per_endpoint(self):
+        """Test endpoint TTL lookup and that uncached endpoints return 0."""
+        cache = ResponseCache(ttls={"/v1/trending-tokens": 30})
+        assert cache.ttl_for("/v1/trending-tokens") == 30
+        assert cache.ttl_for("/v1/key-status") == 0
+
+    def test_disabled_cache(self):
+        """Test that max_entries=0 disables caching."""
+        cache = ResponseCache(max_entries=0)
+        assert cache.ttl_for("/v1/trending-tokens") == 0
+        cache.set("k", 1, ttl=60)
+        assert cache.get("k") is None
@@ -0,0 +1,59 @@
+"""Tests for the circuit breaker."""
+
+from elfa_mcp.circuit import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self, clock):
+        """Test that the circuit opens only once the failure threshold is reached."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.is_open
+        assert not breaker.allow_request()
+        assert breaker.retry_in() == 30
+
+    def test_half_open_allows_single_probe(self, clock):
+        """Test that one probe is let through after the reset timeout and success closes the circuit."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now += 30
+        assert breaker.state == "half_open"
+        assert not breaker.is_open
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        assert breaker.is_open
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow_request()
+
+    def test_failed_probe_reopens(self, clock):
+        """Test that a failed probe re-opens the circuit for another timeout."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.retry_in() == 30
+
+    def test_released_probe_can_be_retried(self, clock):
+        """Test that a probe given up without an outcome does not block the next one."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+        assert breaker.allow_request()
+
+        breaker.release()
+        assert breaker.allow_request()
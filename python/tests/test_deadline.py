@@ -0,0 +1,60 @@
+"""Tests for per-call time budgets."""
+
+import asyncio
+
+import pytest
+
+from elfa_mcp.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    deadline,
+    no_deadline,
+    time_remaining
+)
+
+
+class TestDeadline:
+    def test_unlimited_by_default(self):
+        """Test that there is no budget outside a deadline block."""
+        assert current_deadline() is None
+        assert time_remaining() is None
+        check_deadline("testing")
+
+    def test_nested_budgets_only_shorten(self):
+        """Test that an inner budget cannot extend the outer one."""
+        with deadline(1.0):
+            outer = current_deadline()
+            with deadline(60.0):
+                assert current_deadline() == outer
+            with deadline(None):
+                assert current_deadline() == outer
+            with deadline(0.5):
+                assert current_deadline() < outer
+        assert current_deadline() is None
+
+    def test_check_deadline_raises_once_expired(self):
+        """Test that an exhausted budget raises with its deadline."""
+        with deadline(0):
+            with pytest.raises(DeadlineExceeded) as exc_info:
+                check_deadline("requesting /v1/mentions")
+            assert exc_info.value.deadline == current_deadline()
+            assert "/v1/mentions" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_tasks_inherit_the_budget(self):
+        """Test that tasks started inside a deadline block see its budget."""
+        async def remaining():
+            return time_remaining()
+
+        with deadline(10.0):
+            task = asyncio.ensure_future(remaining())
+        assert 0 < await task <= 10.0
+
+    def test_no_deadline_lifts_the_budget(self):
+        """Test that the budget is lifted inside the block and restored after it."""
+        with deadline(1.0):
+            outer = current_deadline()
+            with no_deadline():
+                assert current_deadline() is None
+            assert current_deadline() == outer
@@ -0,0 +1,97 @@
+"""Tests for the local mention index."""
+
+from elfa_mcp.index import MentionIndex, parse_keywords, tokenize
+
+
+def mention(mention_id, content, hour):
+    return {"id": mention_id, "content": content, "mentioned_at": f"2024-01-01T{hour:02d}:00:00Z"}
+
+
+DAY_START = 1704067200  # 2024-01-01T00:00:00Z
+DAY_END = DAY_START + 86400
+
+MENTIONS = [
+    mention("1", "Bitcoin ETF approved, $BTC pumping", 1),
+    mention("2", "ETH and BTC both green today", 5),
+    mention("3", "Bitcoin miners selling", 10),
+]
+
+
+class TestTokenize:
+    def test_ignores_symbols_and_case(self):
+        """Test that cashtags and hashtags tokenize to plain words."""
+        assert tokenize("$BTC #Bitcoin") == {"btc", "bitcoin"}
+
+    def test_parse_keywords(self):
+        """Test keyword list normalization."""
+        assert parse_keywords(" BTC, bitcoin etf ,") == frozenset({"btc", "bitcoin etf"})
+
+
+class TestMentionIndex:
+    def test_uncovered_search_returns_none(self):
+        """Test that searches never fetched in full are not answered locally."""
+        index = MentionIndex()
+        index.add_mentions(MENTIONS)
+        assert index.search("bitcoin", "and", DAY_START, DAY_END) is None
+
+    def test_narrowing_and_search(self):
+        """Test that an "and" search adding keywords is answered from a broader one."""
+        index = MentionIndex()
+        index.record_search("bitcoin", "and", DAY_START, DAY_END, [MENTIONS[0], MENTIONS[2]])
+
+        result = index.search("bitcoin,etf", "and", DAY_START, DAY_END)
+        assert [m["id"] for m in result] == ["1"]
+
+    def test_narrower_time_range(self):
+        """Test that a narrower time range is answered and filtered by timestamp."""
+        index = MentionIndex()
+        index.record_search("btc,eth", "or", DAY_START, DAY_END, MENTIONS[:2])
+
+        result = index.search("btc", "and", DAY_START + 4 * 3600, DAY_END)
+        assert [m["id"] for m in result] == ["2"]
+
+    def test_recent_searches_expire(self, clock):
+        """Test that a recorded search over a recent range stops answering after the TTL."""
+        clock.now = DAY_END + 60
+        index = MentionIndex(ttl=60, historical_min_age=3600, clock=clock)
+        index.record_search("bitcoin", "and", DAY_START, DAY_END, [MENTIONS[0], MENTIONS[2]])
+
+        clock.now += 60
+        assert [m["id"] for m in index.search("bitcoin", "and", DAY_START, DAY_END)] == ["3", "1"]
+
+        clock.now += 1
+        assert index.search("bitcoin", "and", DAY_START, DAY_END) is None
+
+    def test_historical_searches_do_not_expire(self, clock):
+        """Test that a search over a range that had long ended keeps answering."""
+        clock.now = DAY_END + 3600
+        index = MentionIndex(ttl=60, historical_min_age=3600, clock=clock)
+        index.record_search("bitcoin", "and", DAY_START, DAY_END, [MENTIONS[0], MENTIONS[2]])
+
+        clock.now += 86400
+        assert [m["id"] for m in index.search("bitcoin", "and", DAY_START, DAY_END)] == ["3", "1"]
+
+    def test_wider_time_range_not_covered(self):
+        """Test that a time range beyond the recorded one goes upstream."""
+        index = MentionIndex()
+        index.record_search("bitcoin", "and", DAY_START, DAY_END, [MENTIONS[0], MENTIONS[2]])
+        assert index.search("bitcoin", "and", DAY_START - 1, DAY_END) is None
+
+    def test_or_search_needs_every_keyword_covered(self):
+        """Test that an "or" search is only answered when each keyword is covered."""
+        index = MentionIndex()
+        index.record_search("bitcoin", "and", DAY_START, DAY_END, [MENTIONS[0], MENTIONS[2]])
+        assert index.search("bitcoin,eth", "or", DAY_START, DAY_END) is None
+
+        index.record_search("eth", "and", DAY_START, DAY_END, [MENTIONS[1]])
+        result = index.search("bitcoin,eth", "or", DAY_START, DAY_END)
+        assert [m["id"] for m in result] == ["3", "2", "1"]
+
+    def test_eviction_drops_coverage(self):
+        """Test that evicting a result invalidates the searches that returned it."""
+        index = MentionIndex(max_mentions=2)
+        index.record_search("bitcoin", "and", DAY_START, DAY_END, [MENTIONS[0], MENTIONS[2]])
+        index.add_mentions([MENTIONS[1]])
+
+        assert len(index) == 2
+        assert index.search("bitcoin", "and", DAY_START, DAY_END) is None
@@ -0,0 +1,104 @@
+"""Tests for the API key pool."""
+
+import random
+
+import pytest
+
+from elfa_mcp.keys import KeyPool, load_api_keys
+from elfa_mcp.ratelimit import quota_rate
+
+
+def status(daily, monthly=100000):
+    return {"remainingRequests": {"daily": daily, "monthly": monthly}}
+
+
+class TestLoadApiKeys:
+    def test_comma_separated_and_file(self, tmp_path):
+        """Test that keys are read from both sources, de-duplicated and in order."""
+        key_file = tmp_path / "keys.txt"
+        key_file.write_text("# team keys\nkey-b\n\nkey-c\n")
+
+        assert load_api_keys(" key-a , key-b,", str(key_file)) == ["key-a", "key-b", "key-c"]
+        assert load_api_keys(None) == []
+
+
+class TestKeyPool:
+    def test_requires_a_key(self):
+        """Test that an empty pool is rejected."""
+        with pytest.raises(ValueError):
+            KeyPool([])
+
+    def test_selection_follows_remaining_quota(self):
+        """Test that keys are picked in proportion to their remaining requests."""
+        pool = KeyPool(["a", "b"], rng=random.Random(1))
+        pool.update_from_key_status(pool.get("a"), status(900))
+        pool.update_from_key_status(pool.get("b"), status(100))
+
+        picks = [pool.select().key for _ in range(1000)]
+        assert 800 < picks.count("a") < 980
+
+    def test_invalid_keys_leave_rotation_until_checked(self):
+        """Test that a 401 key is skipped until its status check succeeds again."""
+        pool = KeyPool(["a", "b"])
+        pool.mark_invalid(pool.get("a"))
+
+        assert {pool.select().key for _ in range(20)} == {"b"}
+
+        pool.update_from_key_status(pool.get("a"), status(10))
+        assert pool.is_healthy(pool.get("a"))
+
+    def test_throttled_and_exhausted_keys_rest(self, clock):
+        """Test that throttled keys rest for Retry-After and exhausted keys until reset."""
+        pool = KeyPool(["a", "b", "c"], clock=clock)
+        pool.mark_throttled(pool.get("a"), 30)
+        pool.update_from_key_status(pool.get("b"), status(0))
+
+        assert [k.key for k in pool.healthy()] == ["c"]
+        clock.now += 30
+        assert [k.key for k in pool.healthy()] == ["a", "c"]
+
+    def test_falls_back_when_no_key_is_healthy(self, clock):
+        """Test that the key due to recover first is used when all are out of rotation."""
+        pool = KeyPool(["a", "b"], clock=clock)
+        pool.mark_throttled(pool.get("a"), 60)
+        pool.mark_throttled(pool.get("b"), 10)
+
+        assert pool.select().key == "b"
+
+    def test_aggregate_rate(self):
+        """Test that the healthy keys' quota rates are summed."""
+        pool = KeyPool(["a", "b"])
+        assert pool.aggregate_rate() is None
+
+        pool.update_from_key_status(pool.get("a"), status(1000))
+        assert pool.aggregate_rate() is None
+
+        pool.update_from_key_status(pool.get("b"), status(500))
+        expected = quota_rate(status(1000)) + quota_rate(status(500))
+        assert pool.aggregate_rate() == pytest.approx(expected, rel=1e-3)
+
+        pool.update_from_key_status(pool.get("a"), status(0))
+        pool.update_from_key_status(pool.get("b"), status(0))
+        assert pool.aggregate_rate() == 0.0
+
+    def test_requests_are_accounted_locally(self, clock):
+        """Test that successful requests are deducted from the cached status."""
+        pool = KeyPool(["a"], clock=clock)
+        api_key = pool.get("a")
+        pool.record_request(api_key)
+        assert api_key.requests_since_check == 1
+
+        payload = {"remainingRequests": {"daily": 2, "monthly": 50}, "usage": {"daily": 8, "monthly": 950}}
+        pool.update_from_key_status(api_key, payload)
+        clock.now += 5
+        assert api_key.requests_since_check == 0
+        assert pool.status_age(api_key) == 5
+
+        pool.record_request(api_key)
+        assert api_key.status["remainingRequests"] == {"daily": 1, "monthly": 49}
+        assert api_key.status["usage"] == {"daily": 9, "monthly": 951}
+        assert payload["remainingRequests"]["daily"] == 2
+        assert pool.is_healthy(api_key)
+
+        pool.record_request(api_key)
+        assert not pool.is_healthy(api_key)
@@ -0,0 +1,56 @@
+"""Tests for per-endpoint latency tracking."""
+
+from elfa_mcp.latency import LatencyTracker
+
+
+class TestLatencyTracker:
+    def test_percentiles_need_enough_samples(self):
+        """Test that no percentile is reported before min_samples responses."""
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record(1.0)
+        tracker.record(2.0)
+        assert tracker.percentile(50) is None
+
+        tracker.record(3.0)
+        assert tracker.percentile(50) == 2.0
+        assert tracker.percentile(100) == 3.0
+
+    def test_window_drops_oldest_samples(self):
+        """Test that only the most recent samples count."""
+        tracker = LatencyTracker(window=3, min_samples=1)
+        for seconds in [10.0, 1.0, 2.0, 3.0]:
+            tracker.record(seconds)
+
+        assert len(tracker) == 3
+        assert tracker.percentile(100) == 3.0
+
+    def test_timeout_is_clamped(self):
+        """Test that the learned timeout stays between the minimum and the default."""
+        tracker = LatencyTracker(min_samples=1)
+        assert tracker.timeout(30.0) == 30.0
+
+        tracker.record(0.1)
+        assert tracker.timeout(30.0, minimum=5.0) == 5.0
+
+        tracker.record(4.0)
+        assert tracker.timeout(30.0, minimum=5.0, percent=99, multiplier=3) == 12.0
+
+        tracker.record(20.0)
+        assert tracker.timeout(30.0, minimum=5.0) == 30.0
+
+    def test_timeouts_widen_the_timeout(self):
+        """Test that each timeout in a row doubles the timeout until a response arrives."""
+        tracker = LatencyTracker()
+        for _ in range(tracker.window):
+            tracker.record(0.1)
+
+        tracker.record_timeout(5.0)
+        assert tracker.timeout(30.0, minimum=5.0) == 10.0
+        tracker.record_timeout(10.0)
+        assert tracker.timeout(30.0, minimum=5.0) == 20.0
+        tracker.record_timeout(20.0)
+        assert tracker.timeout(30.0, minimum=5.0) == 30.0
+
+        tracker.record(12.0)
+        assert tracker.consecutive_timeouts == 0
+        assert tracker.timeout(30.0, minimum=5.0) == 30.0
@@ -0,0 +1,117 @@
+"""Tests for pipelined pagination."""
+
+import asyncio
+import pytest
+
+from elfa_mcp.deadline import DeadlineExceeded, deadline
+from elfa_mcp.pagination import iter_pages
+from elfa_mcp.scheduler import Priority, current_priority
+
+
+def make_fetch(pages, started):
+    async def fetch(token):
+        started.append(token)
+        await asyncio.sleep(0)
+        return pages[token]
+    return fetch
+
+
+def follow_next(page, token):
+    return page["metadata"].get("next")
+
+
+class TestIterPages:
+    @pytest.mark.asyncio
+    async def test_follows_tokens_until_last_page(self):
+        """Test that pages are chained until no next token is returned."""
+        pages = {
+            0: {"success": True, "data": [1, 2], "metadata": {"next": 1}},
+            1: {"success": True, "data": [3], "metadata": {}},
+        }
+        started = []
+
+        result = [page["data"] async for page in iter_pages(make_fetch(pages, started), 0, follow_next)]
+
+        assert result == [[1, 2], [3]]
+        assert started == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_prefetched_pages_use_pagination_priority(self):
+        """Test that only pages fetched ahead of the consumer are marked as pagination traffic."""
+        pages = {
+            0: {"success": True, "data": [1], "metadata": {"next": 1}},
+            1: {"success": True, "data": [2], "metadata": {}},
+        }
+        priorities = []
+
+        async def fetch(token):
+            priorities.append(current_priority())
+            return pages[token]
+
+        [page async for page in iter_pages(fetch, 0, follow_next)]
+
+        assert priorities == [Priority.INTERACTIVE, Priority.PAGINATION]
+
+    @pytest.mark.asyncio
+    async def test_stops_paginating_when_budget_runs_out(self):
+        """Test that no page is requested past the deadline and asking for one raises."""
+        pages = {
+            0: {"success": True, "data": [1], "metadata": {"next": 1}},
+            1: {"success": True, "data": [2], "metadata": {}},
+        }
+        started = []
+
+        received = []
+        with deadline(0):
+            with pytest.raises(DeadlineExceeded):
+                async for page in iter_pages(make_fetch(pages, started), 0, follow_next):
+                    received.append(page["data"])
+
+        assert received == [[1]]
+        assert started == [0]
+
+    @pytest.mark.asyncio
+    async def test_prefetches_next_page(self):
+        """Test that the next page is requested before the current one is consumed."""
+        pages = {
+            0: {"success": True, "data": [1], "metadata": {"next": 1}},
+            1: {"success": True, "data": [2], "metadata": {}},
+        }
+        started = []
+        iterator = iter_pages(make_fetch(pages, started), 0, follow_next)
+
+        await iterator.__anext__()
+        await asyncio.sleep(0)
+        assert started == [0, 1]
+        await iterator.aclose()
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_prefetch(self):
+        """Test that closing early cancels the pending page request."""
+        cancelled = asyncio.Event()
+
+        async def fetch(token):
+            if token == 0:
+                return {"success": True, "data": [1], "metadata": {"next": 1}}
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        iterator = iter_pages(fetch, 0, follow_next)
+        await iterator.__anext__()
+        await asyncio.sleep(0)
+        await iterator.aclose()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_unsuccessful_page_raises(self):
+        """Test that an unsuccessful response stops iteration with an error."""
+        async def fetch(token):
+            return {"success": False}
+
+        with pytest.raises(Exception):
+            async for _ in iter_pages(fetch, 0, follow_next):
+                pass
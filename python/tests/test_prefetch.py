@@ -0,0 +1,91 @@
+"""Tests for the hot-ticker prefetcher."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from elfa_mcp.prefetch import HotTickerPrefetcher
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.rate_limiter = None
+    client.get_top_mentions = AsyncMock(return_value={"success": True})
+    client.top_mentions_expires_in = MagicMock(return_value=None)
+    return client
+
+
+def refreshed_tickers(client):
+    return [call.args[0] for call in client.get_top_mentions.call_args_list]
+
+
+class TestHotTickerPrefetcher:
+    def test_hot_ranks_by_request_count(self, client):
+        """Test that the most requested queries come first."""
+        prefetcher = HotTickerPrefetcher(client, top_n=2)
+        for ticker in ["ETH", "BTC", "BTC", "SOL", "BTC", "ETH"]:
+            prefetcher.record(ticker)
+
+        assert [request.ticker for request in prefetcher.hot()] == ["BTC", "ETH"]
+
+    @pytest.mark.asyncio
+    async def test_refreshes_only_entries_expiring_soon(self, client):
+        """Test that fresh entries are skipped and expiring or missing ones are refreshed."""
+        expiry = {"BTC": 50.0, "ETH": 10.0, "SOL": None}
+        client.top_mentions_expires_in.side_effect = lambda ticker, *args: expiry[ticker]
+        prefetcher = HotTickerPrefetcher(client, top_n=3, interval=30)
+        for ticker in expiry:
+            prefetcher.record(ticker)
+
+        assert await prefetcher.prefetch_once() == 2
+        assert sorted(refreshed_tickers(client)) == ["ETH", "SOL"]
+        assert all(call.kwargs == {"refresh": True} for call in client.get_top_mentions.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_budget_follows_rate_limit(self, client):
+        """Test that prefetching spends only a fraction of the allowed request rate."""
+        client.rate_limiter = MagicMock(rate=0.1)
+        prefetcher = HotTickerPrefetcher(client, top_n=10, interval=100, quota_fraction=0.2)
+        for ticker in ["BTC", "BTC", "ETH", "SOL"]:
+            prefetcher.record(ticker)
+
+        assert prefetcher.budget() == 2
+        await prefetcher.prefetch_once()
+        assert refreshed_tickers(client)[0] == "BTC"
+        assert len(refreshed_tickers(client)) == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("daily_quota, expected", [(1000, 1), (10000, 13)])
+    async def test_low_quota_budget_carries_over(self, client, daily_quota, expected):
+        """Test that a budget below one request per cycle accumulates instead of rounding to zero."""
+        client.rate_limiter = MagicMock(rate=daily_quota / 86400)
+        prefetcher = HotTickerPrefetcher(client, top_n=10, interval=30, quota_fraction=0.2)
+        assert prefetcher.budget() == 0
+
+        for _ in range(20):
+            prefetcher.record("BTC")
+            await prefetcher.prefetch_once()
+
+        assert len(refreshed_tickers(client)) == expected
+
+    @pytest.mark.asyncio
+    async def test_scores_decay(self, client):
+        """Test that queries no longer requested are forgotten."""
+        prefetcher = HotTickerPrefetcher(client, decay=0.5)
+        prefetcher.record("BTC")
+
+        for _ in range(4):
+            await prefetcher.prefetch_once()
+
+        assert prefetcher.hot() == []
+
+    @pytest.mark.asyncio
+    async def test_failures_do_not_stop_the_cycle(self, client):
+        """Test that a failed refresh is logged and the next query is still refreshed."""
+        client.get_top_mentions.side_effect = [Exception("boom"), {"success": True}]
+        prefetcher = HotTickerPrefetcher(client)
+        prefetcher.record("BTC")
+        prefetcher.record("ETH")
+
+        assert await prefetcher.prefetch_once() == 2
+        assert client.get_top_mentions.call_count == 2
@@ -0,0 +1,138 @@
+"""Tests for the quota-aware rate limiter."""
+
+import asyncio
+import datetime
+import pytest
+
+from elfa_mcp.ratelimit import (
+    QuotaRateLimiter,
+    RateLimitExceeded,
+    quota_rate,
+    seconds_until_daily_reset,
+    seconds_until_monthly_reset
+)
+
+NOON = datetime.datetime(2024, 3, 15, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+class TestQuotaRate:
+    def test_reset_times(self):
+        """Test the time left until the daily and monthly resets."""
+        assert seconds_until_daily_reset(NOON) == 12 * 3600
+        december = datetime.datetime(2024, 12, 31, 0, 0, tzinfo=datetime.timezone.utc)
+        assert seconds_until_monthly_reset(december) == 86400
+
+    def test_stricter_quota_wins(self, api_key_status_data):
+        """Test that the rate follows the stricter of daily and monthly quota."""
+        rate = quota_rate(api_key_status_data, now=NOON)
+        # 9500 monthly requests over 16.5 days is stricter than 950 over 12 hours
+        assert rate == pytest.approx(9500 / (16.5 * 86400))
+
+        api_key_status_data["remainingRequests"]["daily"] = 100
+        assert quota_rate(api_key_status_data, now=NOON) == pytest.approx(100 / (12 * 3600))
+
+    def test_falls_back_to_limits(self):
+        """Test that limits are used when remaining counts are missing."""
+        assert quota_rate({"dailyRequestLimit": 86400}) == pytest.approx(1.0)
+
+    def test_unknown_limits(self):
+        """Test that a key without limits is not throttled."""
+        assert quota_rate({"name": "key"}) is None
+
+
+class TestQuotaRateLimiter:
+    @pytest.mark.asyncio
+    async def test_unseeded_limiter_does_not_wait(self):
+        """Test that requests pass straight through before seeding."""
+        limiter = QuotaRateLimiter(burst=1)
+        for _ in range(5):
+            assert await limiter.acquire() == 0
+        assert limiter.stats()["throttled_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_requests_queue_once_burst_is_spent(self):
+        """Test that requests wait for tokens once the burst is used up."""
+        limiter = QuotaRateLimiter(burst=1)
+        limiter.rate = 50.0
+
+        await limiter.acquire()
+        waited = await limiter.acquire()
+
+        assert waited > 0
+        stats = limiter.stats()
+        assert stats["throttled_requests"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["max_wait_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_exhausted_quota_fails_fast(self):
+        """Test that requests fail once the quota is used up."""
+        limiter = QuotaRateLimiter(burst=1, max_wait=1.0)
+        limiter.update_from_key_status({"remainingRequests": {"daily": 0}})
+
+        with pytest.raises(RateLimitExceeded, match="exhausted until it resets"):
+            await limiter.acquire()
+        assert not limiter.try_acquire()
+
+    @pytest.mark.asyncio
+    async def test_bursts_beyond_bucket_go_through_while_quota_is_left(self):
+        """Test that a burst larger than the bucket is sent instead of failing."""
+        limiter = QuotaRateLimiter(burst=10, max_wait=30.0)
+        limiter.rate = 990 / 86400  # 990 requests left for the day
+
+        for _ in range(20):
+            assert await limiter.acquire() == 0
+
+    def test_try_acquire_never_waits(self):
+        """Test that a token is only taken when one is available right now."""
+        limiter = QuotaRateLimiter(burst=1, clock=lambda: 0.0)
+        assert limiter.try_acquire()
+
+        limiter.rate = 1.0
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+
+    @pytest.mark.asyncio
+    async def test_acquire_respects_shorter_max_wait(self):
+        """Test that a caller's own limit on waiting is honoured."""
+        limiter = QuotaRateLimiter(burst=1, max_wait=30.0)
+        limiter.rate = 0.5
+
+        await limiter.acquire()
+        assert await limiter.acquire(max_wait=1.0) == 0
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_overtakes_waiting_request(self):
+        """Test that an interactive request is served before a background one already waiting."""
+        limiter = QuotaRateLimiter(burst=1)
+        limiter.rate = 20.0
+        await limiter.acquire()
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority=priority)
+            order.append(name)
+
+        background = asyncio.ensure_future(request("background", 2))
+        await asyncio.sleep(0.01)  # background is now sleeping for a token
+        interactive = asyncio.ensure_future(request("interactive", 0))
+        await asyncio.gather(background, interactive)
+
+        assert order == ["interactive", "background"]
+        assert limiter.stats()["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        """Test that a cancelled request does not block those behind it."""
+        limiter = QuotaRateLimiter(burst=1)
+        limiter.rate = 20.0
+        await limiter.acquire()
+
+        waiting = asyncio.ensure_future(limiter.acquire(priority=0))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert await asyncio.wait_for(limiter.acquire(), 1.0) >= 0
+        assert limiter.stats()["queue_depth"] == 0
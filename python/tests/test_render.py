@@ -0,0 +1,63 @@
+"""Tests for the length-budgeted output renderer."""
+
+from elfa_mcp.render import CHARS_PER_TOKEN, MIN_CONTENT_CHARS, Renderer, truncate
+
+
+def render_item(idx, text, content_limit):
+    return f"{idx}. {truncate(text, content_limit)}\n"
+
+
+class TestTruncate:
+    def test_short_text_is_unchanged(self):
+        """Test that text within the limit, or without one, is returned as-is."""
+        assert truncate("hello world", 20) == "hello world"
+        assert truncate("hello world", None) == "hello world"
+
+    def test_missing_text_is_empty(self):
+        """Test that None, as sent for mentions without content, renders as empty text."""
+        assert truncate(None, 20) == ""
+        assert truncate(None, None) == ""
+
+    def test_cuts_at_word_boundary(self):
+        """Test that long text is cut at a space and ends with an ellipsis."""
+        result = truncate("the quick brown fox jumps over the lazy dog", 20)
+        assert result == "the quick brown fox…"
+        assert len(result) <= 20
+
+
+class TestRenderer:
+    def test_unlimited_renders_everything(self):
+        """Test that without a budget every item is rendered in full."""
+        renderer = Renderer()
+        renderer.text("Header\n")
+        renderer.items(["a" * 500, "b"], render_item)
+
+        assert renderer.render() == "Header\n1. " + "a" * 500 + "\n2. b\n"
+        assert renderer.omitted == 0
+
+    def test_content_cap(self):
+        """Test that each item's content is capped to max_content_chars."""
+        renderer = Renderer(max_content_chars=100)
+        renderer.items(["word " * 100], render_item)
+
+        assert len(renderer.render()) <= len("1. \n") + 100
+
+    def test_budget_shortens_content_then_omits_items(self):
+        """Test that items share the budget and the rest are summarized."""
+        renderer = Renderer(max_tokens=100)
+        renderer.text("Header\n")
+        renderer.items(["word " * 200] * 20, render_item, "mentions")
+        output = renderer.render()
+
+        assert len(output) <= 100 * CHARS_PER_TOKEN
+        assert output.startswith("Header\n1. word")
+        assert "more mentions not shown (output limited to about 100 tokens)" in output
+        assert 0 < renderer.omitted < 20
+
+    def test_items_fitting_the_budget_are_kept_whole(self):
+        """Test that short items are not truncated when they all fit."""
+        renderer = Renderer(max_tokens=1000)
+        renderer.items(["x" * MIN_CONTENT_CHARS] * 3, render_item)
+
+        assert renderer.render().count("x" * MIN_CONTENT_CHARS) == 3
+        assert renderer.omitted == 0
@@ -0,0 +1,62 @@
+"""Tests for the retry policy."""
+
+import datetime
+from unittest.mock import MagicMock
+
+import httpx
+from elfa_mcp.retry import RetryPolicy, parse_retry_after
+
+
+def status_error(status_code, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    return httpx.HTTPStatusError("Error", request=MagicMock(), response=response)
+
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        """Test parsing a delay in seconds."""
+        assert parse_retry_after("3") == 3.0
+
+    def test_http_date(self):
+        """Test parsing an HTTP date."""
+        now = datetime.datetime(2024, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+        assert parse_retry_after("Mon, 01 Jan 2024 12:00:05 GMT", now=now) == 5.0
+
+    def test_invalid(self):
+        """Test that missing or malformed values are ignored."""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestRetryPolicy:
+    def test_retryable_errors(self):
+        """Test which errors are retried."""
+        policy = RetryPolicy()
+        assert policy.is_retryable("GET", status_error(429))
+        assert policy.is_retryable("GET", status_error(503))
+        assert policy.is_retryable("GET", httpx.ReadTimeout("timeout"))
+        assert policy.is_retryable("GET", httpx.ConnectError("refused"))
+        assert not policy.is_retryable("GET", status_error(401))
+        assert not policy.is_retryable("GET", status_error(404))
+        assert not policy.is_retryable("POST", status_error(503))
+
+    def test_backoff_grows_and_is_capped(self):
+        """Test that jittered backoff stays under an exponentially growing cap."""
+        policy = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=4.0)
+        error = status_error(500)
+        for _ in range(20):
+            assert 0 <= policy.next_delay(1, error) <= 1.0
+            assert 0 <= policy.next_delay(2, error) <= 2.0
+            assert 0 <= policy.next_delay(6, error) <= 4.0
+
+    def test_attempt_budget(self):
+        """Test that no delay is given once the attempts are used up."""
+        policy = RetryPolicy(max_attempts=2)
+        assert policy.next_delay(1, status_error(500)) is not None
+        assert policy.next_delay(2, status_error(500)) is None
+
+    def test_honors_retry_after(self):
+        """Test that Retry-After overrides the computed backoff."""
+        policy = RetryPolicy(max_retry_after=10)
+        assert policy.next_delay(1, status_error(429, {"Retry-After": "7"})) == 7.0
+        assert policy.next_delay(1, status_error(429, {"Retry-After": "60"})) is None
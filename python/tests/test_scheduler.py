@@ -0,0 +1,97 @@
+"""Tests for the priority-aware request scheduler."""
+
+import asyncio
+
+import pytest
+
+from elfa_mcp.scheduler import Priority, RequestScheduler, current_priority, request_priority
+
+
+class TestRequestScheduler:
+    @pytest.mark.asyncio
+    async def test_per_class_limits(self):
+        """Test that a class cannot exceed its own concurrency cap."""
+        scheduler = RequestScheduler(max_concurrency=4, limits={Priority.BACKGROUND: 1})
+        await scheduler.acquire(Priority.BACKGROUND)
+
+        waiter = asyncio.ensure_future(scheduler.acquire(Priority.BACKGROUND))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        # Other classes still get slots
+        await asyncio.wait_for(scheduler.acquire(Priority.INTERACTIVE), 1)
+
+        scheduler.release(Priority.BACKGROUND)
+        assert await asyncio.wait_for(waiter, 1) == Priority.BACKGROUND
+
+    @pytest.mark.asyncio
+    async def test_interactive_overtakes_queued_background(self):
+        """Test that a freed slot goes to the most urgent waiting class first."""
+        scheduler = RequestScheduler(max_concurrency=1)
+        await scheduler.acquire(Priority.INTERACTIVE)
+        order = []
+
+        async def request(priority, name):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        background = asyncio.ensure_future(request(Priority.BACKGROUND, "background"))
+        await asyncio.sleep(0)
+        pagination = asyncio.ensure_future(request(Priority.PAGINATION, "pagination"))
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(request(Priority.INTERACTIVE, "interactive"))
+        await asyncio.sleep(0)
+
+        scheduler.release(Priority.INTERACTIVE)
+        await asyncio.wait_for(asyncio.gather(background, pagination, interactive), 1)
+
+        assert order == ["interactive", "pagination", "background"]
+
+    @pytest.mark.asyncio
+    async def test_fifo_within_class(self):
+        """Test that waiters of one class are served in arrival order."""
+        scheduler = RequestScheduler(max_concurrency=1)
+        await scheduler.acquire(Priority.INTERACTIVE)
+        order = []
+
+        async def request(name):
+            async with scheduler.slot(Priority.INTERACTIVE):
+                order.append(name)
+
+        tasks = []
+        for name in ["a", "b", "c"]:
+            tasks.append(asyncio.ensure_future(request(name)))
+            await asyncio.sleep(0)
+
+        scheduler.release(Priority.INTERACTIVE)
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        assert order == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        """Test that a cancelled waiter neither keeps nor leaks a slot."""
+        scheduler = RequestScheduler(max_concurrency=1)
+        await scheduler.acquire(Priority.INTERACTIVE)
+
+        waiter = asyncio.ensure_future(scheduler.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        scheduler.release(Priority.INTERACTIVE)
+        assert scheduler.active == 0
+        assert scheduler.stats()["interactive"]["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_priority_follows_context(self):
+        """Test that requests and tasks inherit the priority of their context."""
+        assert current_priority() == Priority.INTERACTIVE
+
+        scheduler = RequestScheduler(max_concurrency=2)
+        with request_priority(Priority.BACKGROUND):
+            task = asyncio.ensure_future(scheduler.acquire())
+        assert current_priority() == Priority.INTERACTIVE
+
+        assert await task == Priority.BACKGROUND
+        assert scheduler.stats()["background"]["active"] == 1
@@ -1,15 +1,30 @@
 """Tests for the MCP server functions."""
 
+import asyncio
+import json
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from mcp.server.transport_security import TransportSecurityMiddleware
+from starlette.requests import Request
+
+from elfa_mcp import server
+from elfa_mcp.api_client import ElfaAPIError, ElfaClient, ShardedSearch
+from elfa_mcp.deadline import DeadlineExceeded
 
 from elfa_mcp.server import (
+    main,
+    mcp,
+    serve,
+    server_resources,
     get_api_key_info,
     get_smart_engagement_mentions,
     get_top_ticker_mentions,
+    get_top_mentions_for_tickers,
     search_keyword_mentions,
     get_trending_tokens,
-    get_account_stats
+    get_account_stats,
+    get_account_stats_batch
 )
 
 
@@ -19,6 +34,7 @@ class TestMcpTools:
         """Test successful API key info retrieval."""
         mock_api_client.get_api_key_status.return_value = mock_api_response(
             api_key_status_data)
+        mock_api_client.throttling_stats = ElfaClient(api_key="test-key").throttling_stats
 
         with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
             result = await get_api_key_info()
@@ -27,6 +43,28 @@ class TestMcpTools:
             assert "API Key Information" in result
             assert "Test API Key" in result
             assert "active" in result
+            assert "Throttled: 0 of 0 requests" in result
+            assert "Interactive requests: 0 in flight" in result
+
+    @pytest.mark.asyncio
+    async def test_get_api_key_info_reports_throttling(self, mock_api_client, api_key_status_data, mock_api_response):
+        """Test that rate limiter waits and queued requests are reported."""
+        client = ElfaClient(api_key="test-key")
+        client.rate_limiter.update_rate(1.0)
+        client.rate_limiter.throttled_requests = 3
+        client.rate_limiter.total_requests = 10
+        mock_api_client.get_api_key_status.return_value = mock_api_response(api_key_status_data)
+        mock_api_client.throttling_stats = client.throttling_stats
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await get_api_key_info()
+            structured = await get_api_key_info(structured=True)
+
+        assert "Rate limiter: 86400 requests/day, 0 waiting" in result
+        assert "Throttled: 3 of 10 requests" in result
+        throttling = structured.structuredContent["throttling"]
+        assert throttling["rate_limiter"]["throttled_requests"] == 3
+        assert throttling["scheduler"]["interactive"]["queued"] == 0
 
     @pytest.mark.asyncio
     async def test_get_api_key_info_failure(self, mock_api_client, mock_api_response):
@@ -70,6 +108,20 @@ class TestMcpTools:
             assert "testuser" in result
             assert "This is a test tweet about #BTC" in result
 
+    @pytest.mark.asyncio
+    async def test_get_smart_engagement_mentions_null_content(self, mock_api_client, mentions_data, mock_api_response):
+        """Test that a mention with null content is rendered with a placeholder."""
+        mentions_data[0]["content"] = None
+        mock_api_client.get_mentions.return_value = mock_api_response(
+            mentions_data,
+            metadata={"total": 1, "limit": 10, "offset": 0}
+        )
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await get_smart_engagement_mentions(limit=10, offset=0)
+
+            assert "@testuser: No content" in result
+
     @pytest.mark.asyncio
     async def test_get_top_ticker_mentions_success(self, mock_api_client, mock_api_response):
         """Test successful top ticker mentions retrieval."""
@@ -116,6 +168,272 @@ class TestMcpTools:
 
     # Add similar tests for other MCP tools...
 
+    @pytest.mark.asyncio
+    async def test_get_top_mentions_for_tickers_fans_out(self, mock_api_client, mock_api_response):
+        """Test that each ticker gets its own section from concurrent fetches."""
+        async def get_top_mentions(ticker, **kwargs):
+            if ticker == "DOGE":
+                raise Exception("upstream failure")
+            return mock_api_response({
+                "pageSize": 5, "page": 1, "total": 1,
+                "data": [{"content": f"{ticker} to the moon", "metrics": {"like_count": 1}}]
+            })
+
+        mock_api_client.get_top_mentions.side_effect = get_top_mentions
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await get_top_mentions_for_tickers(
+                tickers=["BTC", "ETH", "BTC", "DOGE"], time_window="24h")
+
+            assert mock_api_client.get_top_mentions.call_count == 3
+            assert result.index("=== BTC ===") < result.index("=== ETH ===") < result.index("=== DOGE ===")
+            assert "ETH to the moon" in result
+            assert "Error retrieving top mentions for DOGE: upstream failure" in result
+
+    @pytest.mark.asyncio
+    async def test_get_top_mentions_for_tickers_limits_batch(self, mock_api_client):
+        """Test that oversized batches are rejected before any request."""
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await get_top_mentions_for_tickers(tickers=[f"T{i}" for i in range(30)])
+
+            assert "Too many tickers" in result
+            mock_api_client.get_top_mentions.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_search_keyword_mentions_collects_pages(self, mock_api_client):
+        """Test that max_results follows pagination inside one tool call."""
+        async def mentions():
+            for idx in range(5):
+                yield {"content": f"mention {idx}", "twitter_account_info": {"username": "user"}}
+
+        mock_api_client.iter_search_mentions = MagicMock(return_value=mentions())
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await search_keyword_mentions(
+                keywords="btc", from_time="12h", to_time="now", limit=2, max_results=3)
+
+            assert "Found 3 mentions" in result
+            assert "mention 2" in result
+            assert "mention 3" not in result
+            mock_api_client.search_mentions.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_search_keyword_mentions_returns_partial_results_on_budget(self, mock_api_client):
+        """Test that pagination cut short by the time budget still returns what was collected."""
+        async def mentions():
+            yield {"content": "mention 0", "twitter_account_info": {"username": "user"}}
+            raise DeadlineExceeded("Time budget exhausted while paginating")
+
+        mock_api_client.iter_search_mentions = MagicMock(return_value=mentions())
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await search_keyword_mentions(
+                keywords="btc", from_time="12h", to_time="now", max_results=10, time_budget=5)
+
+            assert "Found 1 mentions" in result
+            assert "Stopped early" in result
+
+    @pytest.mark.asyncio
+    async def test_time_budget_cancels_slow_tools(self, mock_api_client):
+        """Test that a tool still running when its budget passes is cancelled."""
+        cancelled = asyncio.Event()
+
+        async def slow_stats(username):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        mock_api_client.get_account_smart_stats.side_effect = slow_stats
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await get_account_stats(username="elonmusk", time_budget=0.05)
+
+        assert "time budget of 0.05s exceeded" in result
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_search_keyword_mentions_shards_wide_ranges(self, mock_api_client):
+        """Test that wide ranges are searched as concurrent sub-windows."""
+        mock_api_client.search_mentions_sharded.return_value = ShardedSearch([
+            {"content": "sharded mention", "twitter_account_info": {"username": "user"}}
+        ])
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await search_keyword_mentions(
+                keywords="btc", from_time="30d", to_time="now", max_results=50)
+
+            assert "sharded mention" in result
+            assert mock_api_client.search_mentions_sharded.call_args.kwargs["shards"] == 8
+
+    @pytest.mark.asyncio
+    async def test_search_keyword_mentions_sharded_returns_partial_results_on_budget(self):
+        """Test that a sharded search cut short by the time budget returns what was collected."""
+        async def search_mentions(**kwargs):
+            if kwargs.get("cursor"):
+                raise DeadlineExceeded("Time budget exhausted while paginating")
+            page = [{"id": str(kwargs["from_time"]), "content": "sharded mention",
+                     "mentioned_at": "2024-01-01T00:00:00Z"}]
+            return {"success": True, "data": page, "metadata": {"cursor": "next"}}
+
+        client = ElfaClient(api_key="test-key")
+        client.search_mentions = AsyncMock(side_effect=search_mentions)
+
+        with patch('elfa_mcp.server.get_client', return_value=client):
+            result = await search_keyword_mentions(
+                keywords="btc", from_time="7d", to_time="now", max_results=50, time_budget=5)
+
+        assert "Found 7 mentions" in result
+        assert "Stopped early" in result
+
+    @pytest.mark.asyncio
+    async def test_get_account_stats_batch(self, mock_api_client, mock_api_response, account_stats_data):
+        """Test that accounts are normalized, de-duplicated and fetched concurrently."""
+        async def get_account_smart_stats(username):
+            if username == "ghost":
+                raise ElfaAPIError("API request failed with status code 404", status_code=404)
+            return mock_api_response(account_stats_data)
+
+        mock_api_client.get_account_smart_stats.side_effect = get_account_smart_stats
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await get_account_stats_batch(usernames=["@alice", "alice", "ghost", " bob "])
+
+            assert mock_api_client.get_account_smart_stats.call_count == 3
+            assert "Smart stats for @alice" in result
+            assert "Smart stats for @bob" in result
+            assert "Account @ghost not found." in result
+            assert "Smart Following Count: 75" in result
+
+    @pytest.mark.asyncio
+    async def test_get_trending_tokens_served_from_snapshot(self, mock_api_client, mock_api_response, trending_tokens_data):
+        """Test that trending tokens are served from the snapshot engine when running."""
+        engine = MagicMock()
+        engine.get_page.return_value = mock_api_response(trending_tokens_data)
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client), \
+                patch('elfa_mcp.server.trending_engine', engine):
+            result = await get_trending_tokens(time_window="24h", page=1, page_size=20, min_mentions=5)
+
+            engine.get_page.assert_called_once_with(time_window="24h", page=1, page_size=20, min_mentions=5)
+            mock_api_client.get_trending_tokens.assert_not_called()
+            assert "BTC" in result
+            assert "Change: 25.50%" in result
+
+    @pytest.mark.asyncio
+    async def test_get_trending_tokens_falls_back_to_api(self, mock_api_client, mock_api_response, trending_tokens_data):
+        """Test that requests the snapshot cannot serve go to the API."""
+        engine = MagicMock()
+        engine.get_page.return_value = None
+        mock_api_client.get_trending_tokens.return_value = mock_api_response(trending_tokens_data)
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client), \
+                patch('elfa_mcp.server.trending_engine', engine):
+            result = await get_trending_tokens(time_window="24h")
+
+            mock_api_client.get_trending_tokens.assert_called_once()
+            assert "ETH" in result
+
+    @pytest.mark.asyncio
+    async def test_structured_output_returns_compact_json(self, mock_api_client, mentions_data, mock_api_response):
+        """Test that structured calls return trimmed, unformatted mentions as structured content."""
+        mock_api_client.get_mentions.return_value = mock_api_response(
+            mentions_data,
+            metadata={"total": 100, "limit": 10, "offset": 0}
+        )
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client), \
+                patch('elfa_mcp.server.format_date') as mock_format_date:
+            result = await get_smart_engagement_mentions(limit=10, offset=0, structured=True)
+
+        mock_format_date.assert_not_called()
+        assert result.structuredContent == {
+            "total": 100,
+            "offset": 0,
+            "mentions": [{
+                "username": "testuser",
+                "content": "This is a test tweet about #BTC",
+                "type": "tweet",
+                "mentioned_at": "2023-03-15T12:30:45Z",
+                "metrics": {"like_count": 10, "reply_count": 5, "repost_count": 3, "view_count": 1000},
+                "url": "https://twitter.com/user/status/123456"
+            }]
+        }
+        assert json.loads(result.content[0].text) == result.structuredContent
+
+    @pytest.mark.asyncio
+    async def test_structured_output_server_setting(self, monkeypatch, mock_api_client, mock_api_response,
+                                                    trending_tokens_data):
+        """Test that ELFA_STRUCTURED_OUTPUT sets the default and a call can opt back out."""
+        monkeypatch.setenv("ELFA_STRUCTURED_OUTPUT", "true")
+        mock_api_client.get_trending_tokens.return_value = mock_api_response(trending_tokens_data)
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            structured = await get_trending_tokens(time_window="24h")
+            text = await get_trending_tokens(time_window="24h", structured=False)
+
+        assert structured.structuredContent["tokens"][0] == {
+            "token": "BTC", "current_count": 125, "previous_count": 100, "change_percent": 25.5}
+        assert structured.structuredContent["total_pages"] == 6
+        assert "Trending tokens" in text
+
+    @pytest.mark.asyncio
+    async def test_structured_batch_reports_errors_per_item(self, mock_api_client, mock_api_response,
+                                                            account_stats_data):
+        """Test that a structured batch keeps failed items next to successful ones."""
+        async def smart_stats(username):
+            if username == "ghost":
+                raise ElfaAPIError("API request failed with status code 404", status_code=404)
+            return mock_api_response(account_stats_data)
+
+        mock_api_client.get_account_smart_stats.side_effect = smart_stats
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await get_account_stats_batch(["alice", "ghost"], structured=True)
+
+        assert result.structuredContent == {"accounts": [
+            {"username": "alice", "smartFollowingCount": 75, "averageEngagement": 150,
+             "followerEngagementRatio": 2.5},
+            {"username": "ghost", "error": "Account @ghost not found."}
+        ]}
+
+    @pytest.mark.asyncio
+    async def test_structured_output_through_mcp(self, mock_api_client, mock_api_response, account_stats_data):
+        """Test that MCP clients receive the JSON as structured content."""
+        mock_api_client.get_account_smart_stats.return_value = mock_api_response(account_stats_data)
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await mcp.call_tool("get_account_stats", {"username": "alice", "structured": True})
+            text = await mcp.call_tool("get_account_stats", {"username": "alice"})
+
+        assert result.structuredContent["smartFollowingCount"] == 75
+        assert "Smart stats for @alice" in text[0].text
+
+    @pytest.mark.asyncio
+    async def test_output_stays_within_token_budget(self, monkeypatch, mock_api_client, mock_api_response):
+        """Test that long search results are shortened to the requested budget."""
+        mentions = [{
+            "content": "long post " * 300,
+            "mentioned_at": "2023-03-15T12:30:45Z",
+            "twitter_account_info": {"username": f"user{i}"},
+            "metrics": {"like_count": i}
+        } for i in range(100)]
+        mock_api_client.search_mentions.return_value = mock_api_response(
+            mentions, metadata={"total": 100, "cursor": ""})
+        monkeypatch.setenv("ELFA_MAX_CONTENT_CHARS", "0")
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client):
+            result = await search_keyword_mentions("btc", "1d", "now", max_tokens=1000)
+            unlimited = await search_keyword_mentions("btc", "1d", "now", max_tokens=0)
+
+        assert len(result) <= 4000
+        assert "Found 100 mentions" in result
+        assert "1. @user0: long post" in result
+        assert "more mentions not shown" in result
+        assert "100. @user99" in unlimited
+        assert "long post " * 300 in unlimited
+
     @pytest.mark.asyncio
     async def test_invalid_time_window_handled(self, mock_api_client):
         """Test that invalid time window is handled properly."""
@@ -127,3 +445,129 @@ class TestMcpTools:
 
             assert "Error retrieving top mentions" in result
             assert "Invalid time window format" in result
+
+
+class TestServerResources:
+    @pytest.mark.asyncio
+    async def test_top_mentions_requests_are_recorded_for_prefetch(self, mock_api_client, mock_api_response):
+        """Test that top mentions tools report their requests to the prefetcher."""
+        mock_api_client.get_top_mentions.return_value = mock_api_response({"data": [], "total": 0, "pageSize": 10})
+        prefetcher = MagicMock()
+
+        with patch('elfa_mcp.server.get_client', return_value=mock_api_client), \
+                patch('elfa_mcp.server.prefetcher', prefetcher):
+            await get_top_ticker_mentions(ticker="BTC", time_window="24h")
+            await get_top_mentions_for_tickers(tickers=["ETH", "SOL"])
+
+        prefetcher.record.assert_any_call("BTC", "24h", 1, 10, False)
+        prefetcher.record.assert_any_call("ETH", "1h", 1, 5, False)
+        prefetcher.record.assert_any_call("SOL", "1h", 1, 5, False)
+
+    @pytest.mark.asyncio
+    async def test_server_resources_closes_client(self):
+        """Test that the shared client is closed when the server exits."""
+        with patch('elfa_mcp.server.get_client', side_effect=ValueError("no key")), \
+                patch('elfa_mcp.server.close_client', new_callable=AsyncMock) as mock_close:
+            async with server_resources():
+                mock_close.assert_not_called()
+
+            mock_close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_server_resources_runs_quota_refresh(self):
+        """Test that the quota refresh runs in the background and is cancelled on exit."""
+        client = MagicMock()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def run_quota_refresh():
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        client.run_quota_refresh = run_quota_refresh
+        with patch('elfa_mcp.server.get_client', return_value=client), \
+                patch('elfa_mcp.server.close_client', new_callable=AsyncMock):
+            async with server_resources():
+                await started.wait()
+
+        assert cancelled.is_set()
+
+
+    @pytest.mark.asyncio
+    async def test_server_resources_configures_trending_snapshots(self, monkeypatch):
+        """Test that the trending snapshot engine takes its windows and floor from the environment."""
+        monkeypatch.setenv("ELFA_TRENDING_WINDOWS", "24h,7d")
+        monkeypatch.setenv("ELFA_TRENDING_MIN_MENTIONS", "10")
+        client = MagicMock(rate_limiter=None)
+        client.get_trending_tokens = AsyncMock(return_value={"success": False})
+        with patch('elfa_mcp.server.get_client', return_value=client), \
+                patch('elfa_mcp.server.close_client', new_callable=AsyncMock), \
+                patch('elfa_mcp.server.trending_engine', None):
+            async with server_resources():
+                engine = server.trending_engine
+
+        assert engine.time_windows == ["24h", "7d"]
+        assert engine.min_mentions_floor == 10
+
+class TestEntryPoint:
+    def test_main_defaults_to_stdio(self, monkeypatch):
+        """Test that the entry point runs over stdio unless told otherwise."""
+        monkeypatch.delenv("ELFA_MCP_TRANSPORT", raising=False)
+        with patch('elfa_mcp.server.anyio.run') as mock_run:
+            main([])
+
+        mock_run.assert_called_once_with(serve, "stdio", "127.0.0.1", 8000)
+
+    def test_main_reads_arguments_and_environment(self, monkeypatch):
+        """Test that the transport comes from the environment and arguments override it."""
+        monkeypatch.setenv("ELFA_MCP_TRANSPORT", "sse")
+        monkeypatch.setenv("ELFA_MCP_PORT", "9000")
+        with patch('elfa_mcp.server.anyio.run') as mock_run:
+            main([])
+            main(["--transport", "streamable-http", "--host", "0.0.0.0", "--port", "8080"])
+
+        assert mock_run.call_args_list[0].args[1:] == ("sse", "127.0.0.1", 9000)
+        assert mock_run.call_args_list[1].args[1:] == ("streamable-http", "0.0.0.0", 8080)
+
+    @pytest.mark.asyncio
+    async def test_serve_runs_network_transport_with_shared_resources(self, monkeypatch):
+        """Test that a network transport runs inside the shared resources."""
+        monkeypatch.setattr(mcp.settings, "host", mcp.settings.host)
+        monkeypatch.setattr(mcp.settings, "port", mcp.settings.port)
+        with patch('elfa_mcp.server.get_client', side_effect=ValueError("no key")), \
+                patch('elfa_mcp.server.close_client', new_callable=AsyncMock) as mock_close, \
+                patch.object(mcp, 'run_streamable_http_async', new_callable=AsyncMock) as mock_http:
+            await serve("streamable-http", "0.0.0.0", 8123)
+
+            mock_http.assert_awaited_once()
+            mock_close.assert_awaited_once()
+            assert (mcp.settings.host, mcp.settings.port) == ("0.0.0.0", 8123)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("host,allowed", [("0.0.0.0", True), ("127.0.0.1", False)])
+    async def test_serve_checks_host_header_for_listen_address(self, monkeypatch, host, allowed):
+        """Test that only a loopback server turns away clients using another Host header."""
+        monkeypatch.setattr(mcp.settings, "host", mcp.settings.host)
+        monkeypatch.setattr(mcp.settings, "transport_security", mcp.settings.transport_security)
+        with patch('elfa_mcp.server.get_client', side_effect=ValueError("no key")), \
+                patch('elfa_mcp.server.close_client', new_callable=AsyncMock), \
+                patch.object(mcp, 'run_streamable_http_async', new_callable=AsyncMock):
+            await serve("streamable-http", host)
+
+        request = Request({"type": "http", "method": "GET", "path": "/mcp",
+                           "headers": [(b"host", b"10.0.0.5:8000")]})
+        response = await TransportSecurityMiddleware(mcp.settings.transport_security).validate_request(request)
+        if allowed:
+            assert response is None
+        else:
+            assert response.status_code == 421
+
+    @pytest.mark.asyncio
+    async def test_serve_rejects_unknown_transport(self):
+        """Test that an unknown transport is refused before anything starts."""
+        with pytest.raises(ValueError):
+            await serve("carrier-pigeon")
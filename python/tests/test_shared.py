@@ -0,0 +1,69 @@
+"""Tests for the cross-process shared response cache."""
+
+import time
+
+import pytest
+
+from elfa_mcp.cache import NOT_FOUND
+from elfa_mcp.shared import SharedCache
+from elfa_mcp.store import SQLiteStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared.db")
+
+
+@pytest.fixture
+def caches(path):
+    first, second = SharedCache(SQLiteStore(path)), SharedCache(SQLiteStore(path))
+    yield first, second
+    first.close()
+    second.close()
+
+
+class TestSharedCache:
+    def test_responses_are_visible_to_other_processes(self, caches):
+        """Test that a response stored by one process is read by another with its freshness."""
+        first, second = caches
+        first.set("/v1/trending-tokens?timeWindow=24h", {"success": True}, ttl=60, max_stale_age=600)
+
+        entry = second.lookup("/v1/trending-tokens?timeWindow=24h")
+        assert entry.value == {"success": True}
+        assert entry.fresh
+        assert 59 < entry.fresh_for <= 60
+        assert 599 < entry.stale_for <= 600
+        assert second.lookup("/v1/trending-tokens?timeWindow=7d") is None
+
+    def test_stale_and_not_found_entries(self, caches):
+        """Test that expired responses are reported stale and 404 answers round-trip."""
+        first, second = caches
+        first.set("a", {"success": True}, ttl=0.01, max_stale_age=60)
+        first.set("b", NOT_FOUND, ttl=60)
+        time.sleep(0.02)
+
+        assert not second.lookup("a").fresh
+        assert second.lookup("b").value is NOT_FOUND
+
+    def test_only_one_process_holds_a_lease(self, caches):
+        """Test that a lease is exclusive until its holder releases it."""
+        first, second = caches
+        assert first.acquire_lease("k")
+        assert not second.acquire_lease("k")
+
+        second.release_lease("k")  # not the holder, so nothing changes
+        assert not second.acquire_lease("k")
+
+        first.release_lease("k")
+        assert second.acquire_lease("k")
+
+    def test_lease_lapses(self, path):
+        """Test that an unreleased lease can be taken over once it times out."""
+        first = SharedCache(SQLiteStore(path), lease_timeout=0.01)
+        second = SharedCache(SQLiteStore(path))
+        assert first.acquire_lease("k")
+        time.sleep(0.02)
+
+        assert second.acquire_lease("k")
+        first.close()
+        second.close()
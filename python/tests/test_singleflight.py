@@ -0,0 +1,103 @@
+"""Tests for request coalescing."""
+
+import asyncio
+import pytest
+
+from elfa_mcp.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that concurrent callers with the same key share one call."""
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"success": True}
+
+        tasks = [asyncio.create_task(flight.do("k", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert len(flight) == 1
+
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert all(result == {"success": True} for result in results)
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that different keys do not share calls."""
+        flight = SingleFlight()
+
+        async def fetch(value):
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", lambda: fetch(1)),
+            flight.do("b", lambda: fetch(2))
+        )
+        assert results == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_exception_is_shared(self):
+        """Test that every caller sees the shared call's exception."""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise Exception("upstream down")
+
+        results = await asyncio.gather(
+            flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        assert all(str(result) == "upstream down" for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelling_one_caller_keeps_call_alive(self):
+        """Test that a cancelled caller does not cancel the call for others."""
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", fetch))
+        second = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "done"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_last_caller_cancel_cancels_call(self):
+        """Test that the shared call is cancelled once nobody awaits it."""
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        task = asyncio.create_task(flight.do("k", fetch))
+        await started.wait()
+        task.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+        assert len(flight) == 0
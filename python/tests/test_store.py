@@ -0,0 +1,76 @@
+"""Tests for the on-disk response store."""
+
+import pytest
+
+from elfa_mcp.store import SQLiteStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.db"))
+    yield store
+    store.close()
+
+
+class TestSQLiteStore:
+    def test_set_and_get(self, store):
+        """Test storing and reading back a JSON value."""
+        store.set("k", {"success": True, "data": [1, 2]})
+        assert store.get("k") == {"success": True, "data": [1, 2]}
+        assert store.get("missing") is None
+
+    def test_expired_entry(self, store):
+        """Test that expired entries are not returned."""
+        store.set("k", 1, ttl=-1)
+        assert store.get("k") is None
+
+    def test_persists_across_connections(self, tmp_path):
+        """Test that values survive reopening the database, as after a restart."""
+        path = str(tmp_path / "cache.db")
+        first = SQLiteStore(path)
+        first.set("k", "value")
+        first.close()
+
+        second = SQLiteStore(path)
+        assert second.get("k") == "value"
+        second.close()
+
+    def test_shared_between_connections(self, tmp_path):
+        """Test that two open stores on one file see each other's writes."""
+        path = str(tmp_path / "cache.db")
+        first, second = SQLiteStore(path), SQLiteStore(path)
+        first.set("k", "value")
+        assert second.get("k") == "value"
+        first.close()
+        second.close()
+
+    def test_add_only_stores_missing_or_expired_keys(self, store):
+        """Test that add refuses to overwrite a live value."""
+        assert store.add("k", "first", ttl=60)
+        assert not store.add("k", "second")
+        assert store.get("k") == "first"
+
+        store.set("expired", "old", ttl=-1)
+        assert store.add("expired", "new")
+        assert store.get("expired") == "new"
+
+    def test_compare_and_delete(self, store):
+        """Test that an entry is only removed while it holds the expected value."""
+        store.set("k", "mine")
+        assert not store.compare_and_delete("k", "theirs")
+        assert store.compare_and_delete("k", "mine")
+        assert store.get("k") is None
+
+    def test_size_based_eviction(self, tmp_path):
+        """Test that the least recently read entries are evicted when over the size limit."""
+        store = SQLiteStore(str(tmp_path / "cache.db"), max_bytes=250)
+        store.set("a", "x" * 100)
+        store.set("b", "x" * 100)
+        store.get("a")
+        store.set("c", "x" * 100)
+
+        assert store.size() <= 250
+        assert store.get("b") is None
+        assert store.get("a") is not None
+        assert store.get("c") is not None
+        store.close()
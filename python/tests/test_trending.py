@@ -0,0 +1,109 @@
+"""Tests for the trending tokens snapshot engine."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from elfa_mcp.api_client import ElfaClient
+from elfa_mcp.trending import MAX_SNAPSHOT_PAGES, MAX_SNAPSHOT_TOKENS, SNAPSHOT_PAGE_SIZE, TrendingSnapshotEngine
+
+
+def token(name, change, count):
+    return {"token": name, "change_percent": change, "current_count": count, "previous_count": 1}
+
+
+@pytest.fixture
+def client(mock_api_response):
+    client = MagicMock()
+    client.get_trending_tokens = AsyncMock(return_value=mock_api_response({
+        "page": 1,
+        "pageSize": 50,
+        "total": 4,
+        "data": [token("ETH", 10.0, 40), token("BTC", 25.5, 125), token("PEPE", 25.5, 300), token("DOGE", -5.0, 3)]
+    }))
+    return client
+
+
+class TestTrendingSnapshotEngine:
+    @pytest.mark.asyncio
+    async def test_snapshot_is_sorted(self, client):
+        """Test that tokens are ordered by change percent, then current count."""
+        engine = TrendingSnapshotEngine(client, ["24h"])
+        await engine.refresh("24h")
+
+        response = engine.get_page("24h", page=1, page_size=10, min_mentions=1)
+        assert [t["token"] for t in response["data"]["data"]] == ["PEPE", "BTC", "ETH", "DOGE"]
+        assert response["data"]["total"] == 4
+
+    @pytest.mark.asyncio
+    async def test_pages_and_filters_locally(self, client):
+        """Test that pages and min_mentions filters are served without new requests."""
+        engine = TrendingSnapshotEngine(client, ["24h"])
+        await engine.refresh("24h")
+
+        response = engine.get_page("24h", page=2, page_size=1, min_mentions=5)
+        assert [t["token"] for t in response["data"]["data"]] == ["BTC"]
+        assert response["data"]["total"] == 3
+        assert client.get_trending_tokens.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_bypasses_response_cache(self, mock_httpx_response):
+        """Test that each poll fetches current tokens instead of the cached response."""
+        mock_get = AsyncMock(side_effect=[
+            mock_httpx_response(status_code=200, json_data={"success": True, "data": {
+                "total": 1, "data": [token(name, 10.0, 40)]}})
+            for name in ("GEN1", "GEN2")
+        ])
+
+        with patch("httpx.AsyncClient.get", mock_get):
+            engine = TrendingSnapshotEngine(ElfaClient(api_key="test-key"), ["24h"])
+            await engine.refresh("24h")
+            await engine.refresh("24h")
+
+        response = engine.get_page("24h", min_mentions=1)
+        assert [t["token"] for t in response["data"]["data"]] == ["GEN2"]
+        assert mock_get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unusable_snapshots(self, client, clock):
+        """Test that missing, stale or too permissive requests fall back to the API."""
+        engine = TrendingSnapshotEngine(client, ["24h"], interval=60, min_mentions_floor=2, clock=clock)
+        assert engine.get_page("24h") is None
+
+        await engine.refresh("24h")
+        assert engine.get_page("7d") is None
+        assert engine.get_page("24h", min_mentions=1) is None
+
+        clock.now += 181
+        assert engine.get_page("24h") is None
+
+    @pytest.mark.asyncio
+    async def test_truncated_snapshot_is_not_served(self, mock_api_response):
+        """Test that a poll stopped at the page limit falls back to the API."""
+        client = MagicMock()
+        client.get_trending_tokens = AsyncMock(return_value=mock_api_response({
+            "page": 1,
+            "pageSize": SNAPSHOT_PAGE_SIZE,
+            "total": 3000,
+            "data": [token(f"T{i}", 1.0, 10) for i in range(SNAPSHOT_PAGE_SIZE)]
+        }))
+        engine = TrendingSnapshotEngine(client, ["24h"])
+        await engine.refresh("24h")
+
+        assert client.get_trending_tokens.call_count == 1
+        assert engine.get_page("24h") is None
+
+    @pytest.mark.asyncio
+    async def test_snapshot_pages_up_to_limit(self, mock_api_response):
+        """Test that a window holding exactly MAX_SNAPSHOT_TOKENS is fetched in full and served."""
+        client = MagicMock()
+        client.get_trending_tokens = AsyncMock(return_value=mock_api_response({
+            "page": 1,
+            "pageSize": SNAPSHOT_PAGE_SIZE,
+            "total": MAX_SNAPSHOT_TOKENS,
+            "data": [token(f"T{i}", 1.0, 10) for i in range(SNAPSHOT_PAGE_SIZE)]
+        }))
+        engine = TrendingSnapshotEngine(client, ["24h"])
+        await engine.refresh("24h")
+
+        assert client.get_trending_tokens.call_count == MAX_SNAPSHOT_PAGES
+        assert engine.get_page("24h") is not None
@@ -1,13 +1,20 @@
 """Tests for utility functions."""
 
+import os
 import pytest
 import time
 from datetime import datetime, timezone
+from unittest.mock import patch
 from elfa_mcp.utils import (
     format_date,
     format_engagement_stats,
     convert_timestamp_to_unix,
-    validate_time_window
+    validate_time_window,
+    env_int,
+    env_float,
+    env_bool,
+    mention_timestamp,
+    split_time_range
 )
 
 
@@ -94,6 +101,27 @@ class TestConvertTimestampToUnix:
         with pytest.raises(ValueError):
             convert_timestamp_to_unix("invalid")
 
+    def test_convert_now(self):
+        """Test converting "now" to the current Unix timestamp."""
+        assert abs(convert_timestamp_to_unix("now") - time.time()) < 5
+
+    def test_relative_times_snap_to_buckets(self):
+        """Test that bucketed relative times are identical within a bucket."""
+        with patch("elfa_mcp.utils.time.time", return_value=1_699_999_990.5):
+            first = convert_timestamp_to_unix("7d", bucket_seconds=60)
+            now = convert_timestamp_to_unix("now", bucket_seconds=60)
+        with patch("elfa_mcp.utils.time.time", return_value=1_700_000_030.0):
+            second = convert_timestamp_to_unix("7d", bucket_seconds=60)
+
+        assert first == second
+        assert first % 60 == 0
+        assert now == 1_699_999_980
+
+    def test_iso_dates_are_not_snapped(self):
+        """Test that absolute dates keep second resolution."""
+        iso_date = "2023-01-01T00:00:30Z"
+        assert convert_timestamp_to_unix(iso_date, bucket_seconds=60) % 60 == 30
+
 
 class TestValidateTimeWindow:
     def test_valid_preset_time_windows(self):
@@ -114,3 +142,49 @@ class TestValidateTimeWindow:
         for window in invalid:
             with pytest.raises(ValueError):
                 validate_time_window(window)
+
+
+class TestMentionTimestamp:
+    def test_both_date_fields(self):
+        """Test reading the date from search and engagement mentions."""
+        expected = datetime(2023, 3, 15, 12, 30, 45, tzinfo=timezone.utc).timestamp()
+        assert mention_timestamp({"mentioned_at": "2023-03-15T12:30:45Z"}) == expected
+        assert mention_timestamp({"mentionedAt": "2023-03-15T12:30:45Z"}) == expected
+
+    def test_missing_date(self):
+        """Test that a mention without a date sorts as the oldest."""
+        assert mention_timestamp({}) == 0
+
+
+class TestSplitTimeRange:
+    def test_contiguous_ranges(self):
+        """Test that sub-ranges cover the whole range without gaps."""
+        ranges = split_time_range(0, 100, 3)
+        assert ranges == [(0, 33), (33, 67), (67, 100)]
+
+    def test_single_part(self):
+        """Test that a range too small to split is returned whole."""
+        assert split_time_range(10, 10, 4) == [(10, 10)]
+
+
+class TestEnvSettings:
+    def test_unset_returns_default(self):
+        """Test that unset variables fall back to the default."""
+        with patch.dict(os.environ, {}, clear=True):
+            assert env_int("ELFA_TEST_SETTING", 5) == 5
+            assert env_float("ELFA_TEST_SETTING", 1.5) == 1.5
+            assert env_bool("ELFA_TEST_SETTING", True) is True
+
+    def test_parses_values(self):
+        """Test parsing of set variables."""
+        with patch.dict(os.environ, {"A": "7", "B": "2.5", "C": "yes", "D": "off"}):
+            assert env_int("A", 0) == 7
+            assert env_float("B", 0.0) == 2.5
+            assert env_bool("C", False) is True
+            assert env_bool("D", True) is False
+
+    def test_invalid_number_raises_error(self):
+        """Test that a malformed number raises ValueError."""
+        with patch.dict(os.environ, {"A": "many"}):
+            with pytest.raises(ValueError):
+                env_int("A", 0)